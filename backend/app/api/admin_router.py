@@ -0,0 +1,91 @@
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from app.db.mongo import MongoDB
+from app.crud.repository import cache_stats
+from app.crud.coalesce import coalescing_stats
+from app.db.change_stream import change_stream
+from app.crud.events import events
+from app.jobs.cascade import sweep_orphans
+from app.crud.keywords import rebuild_keyword_index
+from app.generation.scheduler import scheduler_stats
+from app.search.service import search_stats
+from app.db.indexes import INDEXES, collscan_queries, index_usage, profiling_status, set_profiling
+
+router = APIRouter()
+
+
+class ProfilingIn(BaseModel):
+    level: int = Field(ge=0, le=2)
+    slowms: int = 100
+
+
+@router.get("/indexes")
+async def index_report(limit: int = Query(50, ge=1, le=500)):
+    db = MongoDB.get_db()
+    try:
+        usage = {collection: await index_usage(db, collection) for collection in INDEXES}
+        return {
+            "indexes": usage,
+            "unused": [
+                {"collection": collection, "name": stat["name"]}
+                for collection, stats in usage.items()
+                for stat in stats
+                if stat["ops"] == 0 and stat["name"] != "_id_"
+            ],
+            "profiling": await profiling_status(db),
+            "collscans": await collscan_queries(db, limit),
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build index report: {str(e)}")
+
+
+@router.put("/profiling")
+async def update_profiling(profiling: ProfilingIn):
+    try:
+        return await set_profiling(MongoDB.get_db(), profiling.level, profiling.slowms)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update profiling: {str(e)}")
+
+
+@router.get("/cache")
+async def cache_report():
+    return {
+        "change_stream": change_stream.active,
+        "event_subscribers": events.subscribers,
+        "collections": cache_stats(),
+        "coalescing": coalescing_stats(),
+    }
+
+
+@router.get("/generation")
+async def generation_report():
+    return scheduler_stats()
+
+
+@router.get("/search")
+async def search_report():
+    return search_stats()
+
+
+@router.post("/orphans/sweep")
+async def run_orphan_sweep():
+    try:
+        return {"removed": await sweep_orphans()}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to sweep orphans: {str(e)}")
+
+
+@router.post("/keywords/rebuild")
+async def run_keyword_rebuild():
+    try:
+        return {"entries": await rebuild_keyword_index()}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild keyword index: {str(e)}")
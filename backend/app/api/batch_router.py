@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+import orjson
+from fastapi import APIRouter, Request
+
+from app.api.responses import json_response
+from app.core.logging import request_id_var
+from app.models.batch import BatchIn, BatchRequest, BatchResult
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Response headers passed back for each sub-request.
+FORWARDED_HEADERS = {"etag", "location", "x-current-version", "content-type"}
+
+# Never-ending responses cannot be collected into a batch.
+STREAMING_PATHS = ("/events",)
+
+
+async def dispatch(request: Request, sub: BatchRequest, follow: bool = True) -> dict:
+    """Run one sub-request through the whole application, middleware included, without leaving the process.
+
+    A redirect (e.g. "/projects" -> "/projects/") is followed once.
+    """
+    url = urlsplit(sub.path)
+    if url.path.startswith(STREAMING_PATHS):
+        return {"status": 400, "headers": {}, "body": {"detail": f"{url.path} cannot be batched"}}
+
+    headers = {key.lower(): value for key, value in (sub.headers or {}).items()}
+    if request_id_var.get():
+        # Logged under the batch's request id.
+        headers.setdefault("x-request-id", request_id_var.get())
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub.method,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": [(key.encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()],
+    }
+    if "state" in request.scope:
+        scope["state"] = request.scope["state"]
+
+    received = False
+    response = {"status": 500, "headers": {}}
+    body = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            for key, value in message.get("headers", []):
+                name = key.decode("latin-1").lower()
+                if name in FORWARDED_HEADERS:
+                    response["headers"][name] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        logger.exception("Batched request to %s failed", url.path)
+        return {"status": 500, "headers": {}, "body": {"detail": "Internal server error"}}
+
+    if follow and response["status"] in (307, 308) and "location" in response["headers"]:
+        target = urlsplit(response["headers"]["location"])
+        path = target.path + (f"?{target.query}" if target.query else "")
+        return await dispatch(request, sub.model_copy(update={"path": path}), follow=False)
+
+    raw = b"".join(body)
+    if not raw:
+        response["body"] = None
+    elif response["headers"].get("content-type", "").startswith("application/json"):
+        response["body"] = orjson.loads(raw)
+    else:
+        response["body"] = raw.decode("utf-8", errors="replace")
+    return response
+
+
+@router.post("/", response_model=BatchResult)
+async def batch(payload: BatchIn, request: Request):
+    """Run up to MAX_BATCH_REQUESTS GET requests concurrently and return their responses in order."""
+    responses = await asyncio.gather(*(dispatch(request, sub) for sub in payload.requests))
+    return json_response({"responses": responses})
@@ -1,13 +1,30 @@
-from fastapi import APIRouter, HTTPException
-from app.models.client import ClientIn, ClientOut
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from app.models.client import CLIENT_FIELD_PRESETS, ClientIn, ClientOut, ClientPatchIn
 from app.crud.clients import (
     create_client,
     get_clients,
+    get_clients_by_ids,
+    stream_clients,
+    get_clients_changes,
     get_client_by_id,
+    get_client_version,
+    get_clients_tokens,
     update_client,
+    patch_client,
     delete_client,
+    bulk_clients,
 )
-from typing import List
+from typing import List, Literal, Optional
+from app.crud.filters import split_ids
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.crud.streaming import DEFAULT_BATCH_SIZE
+from app.api.streaming import ndjson_response, wants_stream
+from app.models.page import ChangePage, Page
+from app.models.bulk import MAX_BULK_OPERATIONS, BulkOperation, BulkResult
+from app.models.fields import resolve_fields
+from app.models.patch import patch_fields
+from app.api.responses import json_response, model_response, partial_response
+from app.api.etag import document_etag, etag_matches, expected_version, list_etag, not_modified
 
 router = APIRouter()
 
@@ -16,23 +33,61 @@ async def create(client: ClientIn):
     try:
         client_dict = client.model_dump()
         inserted_doc = await create_client(client_dict)
-        return ClientOut(**inserted_doc)
+        return model_response(ClientOut, inserted_doc)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create client: {str(e)}")
 
 
-@router.get("/", response_model=List[dict])
-async def get_all():
-    return await get_clients()
+@router.get("/", response_model=Page[dict])
+async def get_all(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ids: Optional[str] = None,
+    sort: Literal["_id", "name"] = "_id",
+    order: Literal["asc", "desc"] = "asc",
+    fields: Optional[str] = None,
+    stream: bool = False,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    selected = resolve_fields(ClientOut, CLIENT_FIELD_PRESETS, fields)
+    if not ids and wants_stream(request, stream):
+        return ndjson_response(stream_clients(batch_size, sort, order == "desc", selected))
+    etag = list_etag(await get_clients_tokens(), request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if ids:
+        return json_response(await get_clients_by_ids(split_ids(ids, MAX_PAGE_SIZE), selected), etag)
+    page = await get_clients(limit, cursor, sort, order == "desc", selected)
+    return json_response(page, etag)
+
+
+@router.get("/changes", response_model=ChangePage)
+async def changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+):
+    """Upserts and delete tombstones after the `since` token; pass the returned `since` on the next call."""
+    selected = resolve_fields(ClientOut, CLIENT_FIELD_PRESETS, fields)
+    return json_response(await get_clients_changes(since, limit, selected))
 
 
 @router.get("/{client_id}", response_model=ClientOut)
-async def get_one(client_id: str):
+async def get_one(client_id: str, request: Request, fields: Optional[str] = None):
     try:
-        client = await get_client_by_id(client_id)
-        return ClientOut(**client)
+        selected = resolve_fields(ClientOut, CLIENT_FIELD_PRESETS, fields)
+        if request.headers.get("if-none-match"):
+            etag = document_etag(client_id, await get_client_version(client_id), selected)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        client = await get_client_by_id(client_id, selected)
+        etag = document_etag(client["id"], client.get("version", 0), selected)
+        if selected is not None:
+            return partial_response(ClientOut, client, selected, etag)
+        return model_response(ClientOut, client, etag)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -43,19 +98,38 @@ async def get_one(client_id: str):
 async def update_one(client_id: str, update_data: ClientIn):
     try:
         updated = await update_client(client_id, update_data.model_dump())
-        return ClientOut(**updated)
+        return model_response(ClientOut, updated)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update client: {str(e)}")
 
 
-@router.delete("/{client_id}")
+@router.patch("/{client_id}", response_model=ClientOut)
+async def patch_one(client_id: str, patch: ClientPatchIn, request: Request):
+    try:
+        expected = expected_version(request, client_id, patch.version)
+        updated = await patch_client(
+            client_id, patch_fields(patch, ClientIn), patch.add_keywords, patch.remove_keywords, expected
+        )
+        return model_response(ClientOut, updated, document_etag(updated["id"], updated["version"]))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update client: {str(e)}")
+
+
+@router.delete("/{client_id}", status_code=202)
 async def delete_one(client_id: str):
     try:
-        await delete_client(client_id)
-        return {"detail": "Client deleted"}
+        job_id = await delete_client(client_id)
+        return {"detail": "Client deleted", "job_id": job_id}
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete client: {str(e)}")
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk(operations: List[BulkOperation] = Body(..., max_length=MAX_BULK_OPERATIONS)):
+    return json_response(await bulk_clients(operations))
@@ -0,0 +1,54 @@
+import hashlib
+import re
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+
+
+def document_etag(doc_id: str, version: int, fields: Optional[Tuple[str, ...]] = None) -> str:
+    return f'"{doc_id}-{version}-{_digest(*(fields or ("full",)))}"'
+
+
+def list_etag(tokens: dict, request: Request) -> str:
+    """ETag of a list response: the change tokens of the collections it reads plus its query string."""
+    return f'"{_digest(*sorted(tokens.items()), str(request.query_params))}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip() for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def expected_version(request: Request, doc_id: str, version: Optional[int] = None) -> Optional[int]:
+    """The version a conditional write must find: the body's `version`, else the one in an `If-Match` ETag.
+
+    Any ETag of the document carries its version, so a `fields=` ETag works
+    too. `If-Match: *` (or no header) only requires the document to exist.
+    """
+    if version is not None:
+        return version
+    header = request.headers.get("if-match")
+    if not header or header.strip() == "*":
+        return None
+    pattern = re.compile(rf'^(?:W/)?"{re.escape(doc_id)}-(\d+)-[0-9a-f]+"$')
+    for candidate in header.split(","):
+        match = pattern.match(candidate.strip())
+        if match:
+            return int(match.group(1))
+    raise HTTPException(status_code=412, detail="If-Match does not match this document")
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.crud.events import events
+from app.crud.repository import REPOSITORIES
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = 15
+
+
+async def event_stream(request: Request, queue: asyncio.Queue):
+    # Sent first so proxies flush headers and the browser reports the stream as open.
+    yield b": connected\n\n"
+    while not await request.is_disconnected():
+        try:
+            event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            yield b": keep-alive\n\n"
+            continue
+        if event is None:
+            # The worker is draining; the browser's EventSource reconnects on its own.
+            return
+        yield b"id: %d\nevent: %s\ndata: %s\n\n" % (
+            event["event_id"], event.get("collection", "reset").encode(), orjson.dumps(event)
+        )
+
+
+@router.get("/")
+async def subscribe(request: Request, collections: Optional[str] = None, client_id: Optional[str] = None):
+    """Server-Sent Events for creates, updates and deletes, optionally limited to some collections and one client."""
+    names = [name.strip() for name in collections.split(",") if name.strip()] if collections else None
+    unknown = sorted(set(names or ()) - set(REPOSITORIES))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(unknown)}")
+
+    async def stream():
+        with events.subscribe(names, client_id) as queue:
+            async for chunk in event_stream(request, queue):
+                yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
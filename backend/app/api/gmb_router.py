@@ -1,7 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from app.models.gmb import GmbIn, GmbOut, GmbUpdateOut, GmbUpdateIn
-from app.crud.gmb import  create_gmb, get_gmb, get_gmb_by_id, update_gmb, delete_gmb
-from typing import List
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from app.models.gmb import GMB_FIELD_PRESETS, GmbIn, GmbOut, GmbUpdateOut, GmbUpdateIn, GmbPatchIn
+from app.crud.gmb import  create_gmb, get_gmb, get_gmb_by_ids, stream_gmb, get_gmb_changes, get_gmb_by_id, get_gmb_version, get_gmb_tokens, update_gmb, patch_gmb, delete_gmb, bulk_gmb
+from typing import List, Literal, Optional
+from app.crud.filters import build_filter, split_ids
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.crud.streaming import DEFAULT_BATCH_SIZE
+from app.api.streaming import ndjson_response, wants_stream
+from app.models.page import ChangePage, Page
+from app.models.bulk import MAX_BULK_OPERATIONS, BulkOperation, BulkResult
+from app.models.fields import resolve_fields
+from app.models.patch import patch_fields
+from app.api.responses import json_response, model_response, partial_response
+from app.api.etag import document_etag, etag_matches, expected_version, list_etag, not_modified
 
 router = APIRouter()
 
@@ -10,21 +20,64 @@ async def create(client: GmbIn):
     try:
         gmb_dict = client.model_dump()
         inserted_doc = await create_gmb(gmb_dict)
-        return  GmbOut(**inserted_doc)
+        return model_response(GmbOut, inserted_doc)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create Gmb: {str(e)}")
 
-@router.get("/", response_model=List[dict])
-async def get_all():
-    return await get_gmb()
+@router.get("/", response_model=Page[dict])
+async def get_all(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ids: Optional[str] = None,
+    sort: Literal["_id", "name"] = "_id",
+    order: Literal["asc", "desc"] = "asc",
+    client_id: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    expand: Optional[Literal["client_name"]] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    selected = resolve_fields(GmbOut, GMB_FIELD_PRESETS, fields)
+    query = build_filter(date_from, date_to, client_id=client_id, status=status)
+    if not ids and wants_stream(request, stream):
+        return ndjson_response(stream_gmb(query, expand == "client_name", batch_size, sort, order == "desc", selected))
+    etag = list_etag(await get_gmb_tokens(expand == "client_name"), request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if ids:
+        return json_response(await get_gmb_by_ids(split_ids(ids, MAX_PAGE_SIZE), query, expand == "client_name", selected), etag)
+    page = await get_gmb(query, expand == "client_name", limit, cursor, sort, order == "desc", selected)
+    return json_response(page, etag)
+
+@router.get("/changes", response_model=ChangePage)
+async def changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+):
+    """Upserts and delete tombstones after the `since` token; pass the returned `since` on the next call."""
+    selected = resolve_fields(GmbOut, GMB_FIELD_PRESETS, fields)
+    return json_response(await get_gmb_changes(since, limit, selected))
 
 @router.get("/{gmb_id}", response_model=GmbOut)
-async def get_one(gmb_id: str):
+async def get_one(gmb_id: str, request: Request, fields: Optional[str] = None):
     try:
-        gmb = await get_gmb_by_id(gmb_id)
-        return GmbOut(**gmb)
+        selected = resolve_fields(GmbOut, GMB_FIELD_PRESETS, fields)
+        if request.headers.get("if-none-match"):
+            etag = document_etag(gmb_id, await get_gmb_version(gmb_id), selected)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        gmb = await get_gmb_by_id(gmb_id, selected)
+        etag = document_etag(gmb["id"], gmb.get("version", 0), selected)
+        if selected is not None:
+            return partial_response(GmbOut, gmb, selected, etag)
+        return model_response(GmbOut, gmb, etag)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -34,12 +87,24 @@ async def get_one(gmb_id: str):
 async def update_one(gmb_id: str, update_data: GmbUpdateIn):
     try:
         updated = await update_gmb(gmb_id, update_data.model_dump())
-        return GmbUpdateOut(**updated)
+        return model_response(GmbUpdateOut, updated)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update Gmb: {str(e)}")
 
+@router.patch("/{gmb_id}", response_model=GmbOut)
+async def patch_one(gmb_id: str, patch: GmbPatchIn, request: Request):
+    try:
+        expected = expected_version(request, gmb_id, patch.version)
+        updated = await patch_gmb(gmb_id, patch_fields(patch, GmbIn), expected)
+        return model_response(GmbOut, updated, document_etag(updated["id"], updated["version"]))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update Gmb: {str(e)}")
+
+
 @router.delete("/{gmb_id}")
 async def delete_one(gmb_id: str):
     try:
@@ -48,4 +113,8 @@ async def delete_one(gmb_id: str):
     except HTTPException as e:
         raise e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete Gmb: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to delete Gmb: {str(e)}")
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk(operations: List[BulkOperation] = Body(..., max_length=MAX_BULK_OPERATIONS)):
+    return json_response(await bulk_gmb(operations))
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from app.api.responses import json_response
+from app.core.drain import is_draining
+from app.db.mongo import MongoDB
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process serves requests. Database state is reported but never fails the probe."""
+    return json_response({"status": "ok", "mongo": await MongoDB.health()})
+
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness: connected, warmed up, not draining, and the server answers a ping in time."""
+    if is_draining():
+        return json_response({"status": "draining"}, status_code=503)
+    mongo = await MongoDB.health()
+    return json_response({"status": "ready" if mongo["ok"] else "unavailable", "mongo": mongo}, status_code=200 if mongo["ok"] else 503)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, HTTPException
+from app.jobs.cascade import get_job
+
+router = APIRouter()
+
+
+@router.get("/{job_id}")
+async def get_one(job_id: str):
+    try:
+        job = await get_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get job: {str(e)}")
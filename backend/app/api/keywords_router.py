@@ -0,0 +1,52 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.responses import model_response
+from app.crud.clients import get_client_version
+from app.crud.keywords import shared_keywords, top_keywords, unused_keywords
+from app.models.keyword import KeywordCount, SharedKeyword, UnusedKeywords
+
+router = APIRouter()
+
+# Keyword analytics for one client, answered from the keyword index (see app.crud.keywords).
+
+
+@router.get("/{client_id}/keywords", response_model=List[KeywordCount])
+async def get_top_keywords(client_id: str, limit: int = Query(50, ge=1, le=1000)):
+    """The client's most used project keywords."""
+    try:
+        await get_client_version(client_id)
+        return model_response(List[KeywordCount], await top_keywords(client_id, limit))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get keywords: {str(e)}")
+
+
+@router.get("/{client_id}/keywords/shared", response_model=List[SharedKeyword])
+async def get_shared_keywords(
+    client_id: str,
+    min_projects: int = Query(2, ge=2),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Keywords several of the client's projects compete for (cannibalization), with those projects."""
+    try:
+        await get_client_version(client_id)
+        return model_response(List[SharedKeyword], await shared_keywords(client_id, min_projects, limit))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get shared keywords: {str(e)}")
+
+
+@router.get("/{client_id}/keywords/unused", response_model=UnusedKeywords)
+async def get_unused_keywords(client_id: str):
+    """The client's keywords that none of its projects target yet."""
+    try:
+        await get_client_version(client_id)
+        return model_response(UnusedKeywords, {"keywords": await unused_keywords(client_id)})
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get unused keywords: {str(e)}")
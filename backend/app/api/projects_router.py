@@ -1,7 +1,18 @@
-from fastapi import APIRouter, HTTPException
-from app.models.project import ProjectIn, ProjectOut, ProjectUpdateIn, ProjectUpdateOut
-from app.crud.projects import create_project, get_projects, get_project_by_id, update_project, delete_project
-from typing import List
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from app.models.project import PROJECT_FIELD_PRESETS, ProjectIn, ProjectOut, ProjectUpdateIn, ProjectUpdateOut, ProjectPatchIn
+from app.crud.projects import create_project, get_projects, get_projects_by_ids, stream_projects, get_projects_changes, get_project_by_id, get_project_version, get_projects_tokens, update_project, patch_project, delete_project, bulk_projects, queue_project
+from typing import List, Literal, Optional
+from app.crud.filters import build_filter, split_ids
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.crud.streaming import DEFAULT_BATCH_SIZE
+from app.api.streaming import ndjson_response, wants_stream
+from app.models.page import ChangePage, Page
+from app.models.bulk import MAX_BULK_OPERATIONS, BulkOperation, BulkResult
+from app.models.fields import resolve_fields
+from app.models.patch import patch_fields
+from app.api.responses import json_response, model_response, partial_response
+from app.api.etag import document_etag, etag_matches, expected_version, list_etag, not_modified
+from app.generation.scheduler import notify_scheduler
 
 router = APIRouter()
 
@@ -10,21 +21,65 @@ async def create(client: ProjectIn):
     try:
         project_dict = client.model_dump()
         inserted_doc = await create_project(project_dict)
-        return  ProjectOut(**inserted_doc)
+        return model_response(ProjectOut, inserted_doc)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
 
-@router.get("/", response_model=List[dict])
-async def get_all():
-    return await get_projects()
+@router.get("/", response_model=Page[dict])
+async def get_all(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ids: Optional[str] = None,
+    sort: Literal["_id", "name"] = "_id",
+    order: Literal["asc", "desc"] = "asc",
+    client_id: Optional[str] = None,
+    status: Optional[str] = None,
+    project_type: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    expand: Optional[Literal["client_name"]] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    selected = resolve_fields(ProjectOut, PROJECT_FIELD_PRESETS, fields)
+    query = build_filter(date_from, date_to, client_id=client_id, status=status, project_type=project_type)
+    if not ids and wants_stream(request, stream):
+        return ndjson_response(stream_projects(query, expand == "client_name", batch_size, sort, order == "desc", selected))
+    etag = list_etag(await get_projects_tokens(expand == "client_name"), request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if ids:
+        return json_response(await get_projects_by_ids(split_ids(ids, MAX_PAGE_SIZE), query, expand == "client_name", selected), etag)
+    page = await get_projects(query, expand == "client_name", limit, cursor, sort, order == "desc", selected)
+    return json_response(page, etag)
+
+@router.get("/changes", response_model=ChangePage)
+async def changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+):
+    """Upserts and delete tombstones after the `since` token; pass the returned `since` on the next call."""
+    selected = resolve_fields(ProjectOut, PROJECT_FIELD_PRESETS, fields)
+    return json_response(await get_projects_changes(since, limit, selected))
 
 @router.get("/{project_id}", response_model=ProjectOut)
-async def get_one(project_id: str):
+async def get_one(project_id: str, request: Request, fields: Optional[str] = None):
     try:
-        project = await get_project_by_id(project_id)
-        return ProjectOut(**project)
+        selected = resolve_fields(ProjectOut, PROJECT_FIELD_PRESETS, fields)
+        if request.headers.get("if-none-match"):
+            etag = document_etag(project_id, await get_project_version(project_id), selected)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        project = await get_project_by_id(project_id, selected)
+        etag = document_etag(project["id"], project.get("version", 0), selected)
+        if selected is not None:
+            return partial_response(ProjectOut, project, selected, etag)
+        return model_response(ProjectOut, project, etag)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -34,12 +89,26 @@ async def get_one(project_id: str):
 async def update_one(project_id: str, update_data: ProjectUpdateIn):
     try:
         updated = await update_project(project_id, update_data.model_dump())
-        return ProjectUpdateOut(**updated)
+        return model_response(ProjectUpdateOut, updated)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update project: {str(e)}")
+
+@router.patch("/{project_id}", response_model=ProjectOut)
+async def patch_one(project_id: str, patch: ProjectPatchIn, request: Request):
+    try:
+        expected = expected_version(request, project_id, patch.version)
+        updated = await patch_project(
+            project_id, patch_fields(patch, ProjectIn), patch.add_keywords, patch.remove_keywords, expected
+        )
+        return model_response(ProjectOut, updated, document_etag(updated["id"], updated["version"]))
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update project: {str(e)}")
 
+
 @router.delete("/{project_id}")
 async def delete_one(project_id: str):
     try:
@@ -48,4 +117,19 @@ async def delete_one(project_id: str):
     except HTTPException as e:
         raise e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete project: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to delete project: {str(e)}")
+
+@router.post("/{project_id}/generate", status_code=202)
+async def generate(project_id: str):
+    try:
+        project = await queue_project(project_id)
+        notify_scheduler()
+        return {"detail": "Project queued for generation", "status": project["status"]}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue project: {str(e)}")
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk(operations: List[BulkOperation] = Body(..., max_length=MAX_BULK_OPERATIONS)):
+    return json_response(await bulk_projects(operations))
@@ -0,0 +1,42 @@
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Type
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.api.etag import set_etag
+from app.models.fields import partial_model
+
+# Routes return these responses directly, which skips FastAPI's response_model
+# pass: a document is validated at most once and encoded by orjson.
+
+
+class JSONBytesResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def json_response(content: Any, etag: Optional[str] = None, status_code: int = 200) -> JSONBytesResponse:
+    """Encode already-trusted data (e.g. documents read back from Mongo) without validating it again."""
+    response = JSONBytesResponse(content, status_code=status_code)
+    if etag:
+        set_etag(response, etag)
+    return response
+
+
+def model_response(model: Type[BaseModel], doc: dict, etag: Optional[str] = None, status_code: int = 200) -> JSONBytesResponse:
+    """Validate `doc` once against `model` and encode the result."""
+    model_adapter = adapter(model)
+    content = model_adapter.dump_python(model_adapter.validate_python(doc), mode="json")
+    return json_response(content, etag, status_code)
+
+
+def partial_response(model: Type[BaseModel], doc: dict, fields: Tuple[str, ...], etag: Optional[str] = None) -> JSONBytesResponse:
+    """Validate `doc` against the subset of `model` it was projected to."""
+    return model_response(partial_model(model, fields), doc, etag)
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.responses import model_response
+from app.models.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, MAX_SEARCH_OFFSET, SearchResults
+from app.search.service import SEARCH_COLLECTIONS, search
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResults)
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    collections: Optional[str] = None,
+    client_id: Optional[str] = None,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+):
+    """Ranked full-text search over clients and projects; page on with `offset=next_offset`."""
+    names = [name.strip() for name in collections.split(",") if name.strip()] if collections else list(SEARCH_COLLECTIONS)
+    unknown = sorted(set(names) - set(SEARCH_COLLECTIONS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(unknown)}")
+    try:
+        return model_response(SearchResults, await search(q, names, client_id, limit, offset))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search: {str(e)}")
@@ -0,0 +1,12 @@
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_stream(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(chunks) -> StreamingResponse:
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE)
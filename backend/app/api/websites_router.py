@@ -1,13 +1,30 @@
-from fastapi import APIRouter, HTTPException
-from app.models.website import WebsiteIn, WebsiteOut
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from app.models.website import WEBSITE_FIELD_PRESETS, WebsiteIn, WebsiteOut, WebsitePatchIn
 from app.crud.websites import (
     create_website,
     get_websites,
+    get_websites_by_ids,
+    stream_websites,
+    get_websites_changes,
     get_website_by_id,
+    get_website_version,
+    get_websites_tokens,
     update_website,
+    patch_website,
     delete_website,
+    bulk_websites,
 )
-from typing import List
+from typing import List, Literal, Optional
+from app.crud.filters import split_ids
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.crud.streaming import DEFAULT_BATCH_SIZE
+from app.api.streaming import ndjson_response, wants_stream
+from app.models.page import ChangePage, Page
+from app.models.bulk import MAX_BULK_OPERATIONS, BulkOperation, BulkResult
+from app.models.fields import resolve_fields
+from app.models.patch import patch_fields
+from app.api.responses import json_response, model_response, partial_response
+from app.api.etag import document_etag, etag_matches, expected_version, list_etag, not_modified
 
 router = APIRouter()
 
@@ -16,24 +33,61 @@ async def create(website: WebsiteIn):
     try:
         website_dict = website.model_dump()
         inserted_doc = await create_website(website_dict)
-        return WebsiteOut(**inserted_doc)
+        return model_response(WebsiteOut, inserted_doc)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create website: {str(e)}")
 
 
-@router.get("/", response_model=List[WebsiteOut])
-async def get_all():
-    websites = await get_websites()
-    return [WebsiteOut(**website) for website in websites]
+@router.get("/", response_model=Page[dict])
+async def get_all(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ids: Optional[str] = None,
+    sort: Literal["_id", "domain"] = "_id",
+    order: Literal["asc", "desc"] = "asc",
+    fields: Optional[str] = None,
+    stream: bool = False,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    selected = resolve_fields(WebsiteOut, WEBSITE_FIELD_PRESETS, fields)
+    if not ids and wants_stream(request, stream):
+        return ndjson_response(stream_websites(batch_size, sort, order == "desc", selected))
+    etag = list_etag(await get_websites_tokens(), request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if ids:
+        return json_response(await get_websites_by_ids(split_ids(ids, MAX_PAGE_SIZE), selected), etag)
+    page = await get_websites(limit, cursor, sort, order == "desc", selected)
+    return json_response(page, etag)
+
+
+@router.get("/changes", response_model=ChangePage)
+async def changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+):
+    """Upserts and delete tombstones after the `since` token; pass the returned `since` on the next call."""
+    selected = resolve_fields(WebsiteOut, WEBSITE_FIELD_PRESETS, fields)
+    return json_response(await get_websites_changes(since, limit, selected))
 
 
 @router.get("/{website_id}", response_model=WebsiteOut)
-async def get_one(website_id: str):
+async def get_one(website_id: str, request: Request, fields: Optional[str] = None):
     try:
-        website = await get_website_by_id(website_id)
-        return WebsiteOut(**website)
+        selected = resolve_fields(WebsiteOut, WEBSITE_FIELD_PRESETS, fields)
+        if request.headers.get("if-none-match"):
+            etag = document_etag(website_id, await get_website_version(website_id), selected)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        website = await get_website_by_id(website_id, selected)
+        etag = document_etag(website["id"], website.get("version", 0), selected)
+        if selected is not None:
+            return partial_response(WebsiteOut, website, selected, etag)
+        return model_response(WebsiteOut, website, etag)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -44,19 +98,36 @@ async def get_one(website_id: str):
 async def update_one(website_id: str, update_data: WebsiteIn):
     try:
         updated = await update_website(website_id, update_data.model_dump())
-        return WebsiteOut(**updated)
+        return model_response(WebsiteOut, updated)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update website: {str(e)}")
 
 
-@router.delete("/{website_id}")
+@router.patch("/{website_id}", response_model=WebsiteOut)
+async def patch_one(website_id: str, patch: WebsitePatchIn, request: Request):
+    try:
+        expected = expected_version(request, website_id, patch.version)
+        updated = await patch_website(website_id, patch_fields(patch, WebsiteIn), expected)
+        return model_response(WebsiteOut, updated, document_etag(updated["id"], updated["version"]))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update website: {str(e)}")
+
+
+@router.delete("/{website_id}", status_code=202)
 async def delete_one(website_id: str):
     try:
-        await delete_website(website_id)
-        return {"detail": "Website deleted"}
+        job_id = await delete_website(website_id)
+        return {"detail": "Website deleted", "job_id": job_id}
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete website: {str(e)}")
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk(operations: List[BulkOperation] = Body(..., max_length=MAX_BULK_OPERATIONS)):
+    return json_response(await bulk_websites(operations))
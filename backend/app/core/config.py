@@ -1,10 +1,129 @@
-from pydantic import BaseSettings
+from typing import Literal, Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ProviderSettings(BaseSettings):
+    """One generation provider, read from <NAME>_API_KEY, <NAME>_BASE_URL, <NAME>_MODEL, <NAME>_CONCURRENCY and <NAME>_RPM.
+
+    Setting the API key enables the provider; the base URL and model fall
+    back to the provider's own defaults in `app.generation.providers`.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    api_key: Optional[str] = None
+    base_url: Optional[str] = None
+    model: Optional[str] = None
+    concurrency: int = 2
+    rpm: float = 60
+
+
+def provider_settings(name: str):
+    return Field(default_factory=lambda: ProviderSettings(_env_prefix=f"{name.upper()}_"))
+
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
     mongo_uri: str = "mongodb://localhost:27017"
+    mongo_db: str = "clients_db"
     debug: bool = True
 
-    class Config:
-        env_file = ".env"
+    # Connection pool, passed to the driver as-is (e.g. MONGO_MAX_POOL_SIZE=200).
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 10
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_wait_queue_timeout_ms: Optional[int] = None
+    mongo_connect_timeout_ms: int = 5000
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_socket_timeout_ms: Optional[int] = None
+    # Comma-separated, in order of preference: "zstd,snappy,zlib". zstd and snappy need their Python packages.
+    mongo_compressors: Optional[str] = None
+
+    # Startup: ping attempts before giving up, and connections opened before serving.
+    mongo_connect_retries: int = 5
+    mongo_connect_retry_delay: float = 2.0
+    mongo_warm_connections: Optional[int] = None
+
+    # Server (python -m app.server). A fixed default rather than the CPU count, which in a container is
+    # the host's; each worker has its own Mongo pool, so the server opens up to
+    # WORKERS * MONGO_MAX_POOL_SIZE connections.
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 2
+    # How long shutdown waits for in-flight requests, then for running generations.
+    shutdown_grace_seconds: float = 30
+
+    # LOG_LEVEL=DEBUG|INFO|WARNING|..., LOG_FORMAT=json|text; LOG_ACCESS keeps uvicorn's access log as well.
+    log_level: str = "INFO"
+    log_format: str = "json"
+    log_access: bool = False
+
+    # /readyz fails when a ping takes longer than this.
+    readiness_timeout_ms: int = 2000
+
+    # /search backend: "mongo" (text indexes) or "memory" (an inverted index built in each worker).
+    search_backend: Literal["mongo", "memory"] = "mongo"
+
+    # /{collection}/changes: how long a write may take between taking its sequence number and landing,
+    # clock differences between workers included, and how long delete tombstones are kept (a `since`
+    # token older than that gets 410).
+    changes_settle_seconds: float = 5
+    tombstone_retention_days: int = 30
+
+    # Standalone servers (no change streams): how often a worker with SSE subscribers (or the memory
+    # search backend) polls the changes feeds for other workers' writes, to push events and
+    # invalidate its caches; workers without them leave that to CACHE_TTL_SECONDS.
+    events_poll_seconds: float = 1
+
+    # Identical reads running at the same time share one Mongo query (READ_COALESCING=false to compare).
+    read_coalescing: bool = True
+
+    # Per-repository read cache (app.crud.cache), in each worker.
+    cache_max_entries: int = 10000
+    cache_ttl_seconds: float = 60
+
+    # The generation scheduler, cascade job resumption and the orphan sweep run in one worker, the
+    # holder of a lease renewed every third of this; another worker takes over within it.
+    background_lease_seconds: float = 30
+
+    # Cascade deletes: documents deleted per batch, how often the orphan sweep runs, and how long a
+    # running job's claim lasts after its last batch before another worker takes it over.
+    cascade_batch_size: int = 500
+    orphan_sweep_interval_seconds: float = 3600
+    cascade_job_lease_seconds: float = 60
+
+    # Generation scheduler (app.generation): worker tasks per process, queue poll interval, claim
+    # lease, attempts per project, the provider used when a project names none, the on-disk
+    # response cache and the compiled prompt cache.
+    generation_workers: int = 4
+    generation_poll_seconds: float = 5
+    generation_lease_seconds: float = 600
+    generation_max_attempts: int = 4
+    generation_default_provider: str = "chatgpt"
+    generation_cache_dir: str = "generation_cache"
+    generation_cache_max_mb: float = 256
+    prompt_cache_size: int = 1000
+
+    chatgpt: ProviderSettings = provider_settings("chatgpt")
+    deepseek: ProviderSettings = provider_settings("deepseek")
+
+    def mongo_client_options(self) -> dict:
+        options = {
+            "maxPoolSize": self.mongo_max_pool_size,
+            "minPoolSize": self.mongo_min_pool_size,
+            "maxIdleTimeMS": self.mongo_max_idle_time_ms,
+            "waitQueueTimeoutMS": self.mongo_wait_queue_timeout_ms,
+            "connectTimeoutMS": self.mongo_connect_timeout_ms,
+            "serverSelectionTimeoutMS": self.mongo_server_selection_timeout_ms,
+            "socketTimeoutMS": self.mongo_socket_timeout_ms,
+            "compressors": self.mongo_compressors,
+            # Dates read back as UTC-aware datetimes, like the ones the app writes.
+            "tz_aware": True,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
 
 settings = Settings()
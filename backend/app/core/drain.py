@@ -0,0 +1,60 @@
+import logging
+import signal
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+_draining = False
+_callbacks: List[Callable[[], None]] = []
+
+
+def is_draining() -> bool:
+    return _draining
+
+
+def on_drain(callback: Callable[[], None]):
+    """Run `callback` (synchronously, on the event loop thread) when the process starts draining."""
+    if callback not in _callbacks:
+        _callbacks.append(callback)
+
+
+def begin_drain():
+    global _draining
+    if _draining:
+        return
+    _draining = True
+    logger.info("Draining: no longer ready, closing long-lived streams")
+    for callback in _callbacks:
+        try:
+            callback()
+        except Exception:
+            logger.exception("Drain callback failed")
+
+
+def install_drain_handlers():
+    """Start draining as soon as SIGTERM/SIGINT arrives, before the server's own shutdown runs.
+
+    Called from the lifespan, when uvicorn has already installed its signal
+    handlers; those are wrapped, not replaced, so uvicorn still stops
+    accepting connections and waits for in-flight requests as usual.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+        if not callable(previous) or getattr(previous, "drains", False):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            begin_drain()
+            previous(signum, frame)
+
+        handler.drains = True
+        signal.signal(sig, handler)
+
+
+def reset():
+    """Forget a previous drain (a new app in the same process, e.g. in tests)."""
+    global _draining
+    _draining = False
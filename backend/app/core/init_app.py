@@ -1,14 +1,88 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.clients_router import router as clients_router
 from app.api.projects_router import router as projects_router
 from app.api.websites_router import router as websites_router
 from app.api.gmb_router import router as gmb_router
+from app.api.admin_router import router as admin_router
+from app.api.jobs_router import router as jobs_router
+from app.api.events_router import router as events_router
+from app.api.metrics_router import router as metrics_router
+from app.api.health_router import router as health_router
+from app.api.search_router import router as search_router
+from app.api.keywords_router import router as keywords_router
+from app.api.batch_router import router as batch_router
 from app.db.mongo import MongoDB
-from app.core.logging import setup_logging
+from app.db.change_stream import change_stream
+from app.crud.coalesce import coalescing_stats
+from app.crud.repository import REPOSITORIES, cache_stats, invalidate_from_change
+from app.crud.changes import backfill_change_seqs
+from app.crud.events import EVENT_FIELDS, events, on_local_write, publish_change
+from app.crud.keywords import build_keyword_index
+from app.jobs.cascade import spawn, stop_jobs
+from app.jobs.leader import start_leading, stop_leading
+from app.search.service import DOCUMENT_FIELDS, memory_enabled, search_index, start_search, stop_search
+from app.generation.scheduler import generation_cache_stats, pause_scheduler
+from app.core.metrics import MetricsMiddleware, mark_worker_exited, register_cache_stats
+from app.core import drain
+from app.core.config import settings
+from app.core.logging import RequestLoggingMiddleware, setup_logging, stop_logging
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-process startup and shutdown; with several workers each one runs this and gets its own Motor client."""
+    try:
+        drain.reset()
+        await MongoDB.connect()
+        logger.info("MongoDB connection established")
+        change_stream.subscribe(invalidate_from_change)
+        change_stream.subscribe(publish_change)
+        document_fields = EVENT_FIELDS
+        if memory_enabled():
+            change_stream.subscribe(search_index.apply_change)
+            on_local_write(search_index.apply_write)
+            document_fields = tuple(sorted(set(EVENT_FIELDS) | set(DOCUMENT_FIELDS)))
+        # Polling (standalone servers only) feeds the SSE subscribers and the in-memory search index;
+        # without either, this worker's caches fall back on their TTL for other workers' writes.
+        change_stream.start(
+            MongoDB.get_db(), list(REPOSITORIES), document_fields, lambda: events.subscribers > 0 or memory_enabled()
+        )
+        start_search()
+        spawn(build_keyword_index())
+        spawn(backfill_change_seqs(REPOSITORIES.values()))
+        start_leading()
+        drain.on_drain(events.close_all)
+        drain.on_drain(pause_scheduler)
+        drain.install_drain_handlers()
+    except Exception as e:
+        logger.critical("Startup failed: %s", e, exc_info=True)
+        raise
+
+    yield
+
+    # The server has stopped accepting requests and waited for in-flight ones by now.
+    try:
+        drain.begin_drain()
+        await stop_leading()
+        await stop_jobs()
+        await stop_search()
+        await change_stream.stop()
+        await MongoDB.close()
+    except Exception as e:
+        logger.error("Error during shutdown: %s", e, exc_info=True)
+    finally:
+        mark_worker_exited()
+        stop_logging()
+
 
 def create_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -18,42 +92,36 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_middleware(MetricsMiddleware)
+    register_cache_stats("app_cache", lambda: {**cache_stats(), **generation_cache_stats()})
+    register_cache_stats("app_read_coalescing", coalescing_stats)
+
     @app.middleware("http")
     async def add_cors_headers(request: Request, call_next):
         response = await call_next(request)
         response.headers["Access-Control-Allow-Origin"] = "*"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
+        response.headers["Access-Control-Allow-Headers"] = "Content-Type, If-Match"
 
         response.headers["Content-Security-Policy"] = "upgrade-insecure-requests"
 
         return response
 
     app.include_router(clients_router, prefix="/clients", tags=["Clients"])
+    app.include_router(keywords_router, prefix="/clients", tags=["Keywords"])
     app.include_router(projects_router, prefix="/projects", tags=["Projects"])
     app.include_router(gmb_router, prefix="/gmb", tags=["Gmb"])
     app.include_router(websites_router, prefix="/websites", tags=["Websites"])
+    app.include_router(jobs_router, prefix="/jobs", tags=["Jobs"])
+    app.include_router(events_router, prefix="/events", tags=["Events"])
+    app.include_router(search_router, prefix="/search", tags=["Search"])
+    app.include_router(batch_router, prefix="/batch", tags=["Batch"])
+    app.include_router(admin_router, prefix="/admin", tags=["Admin"])
+    app.include_router(metrics_router)
+    app.include_router(health_router, tags=["Health"])
 
-
-
-
-    @app.on_event("startup")
-    async def startup_db():
-        try:
-            await MongoDB.connect()
-            print("MongoDB connection established successfully.")
-        except Exception as e:
-            print(f"Critical error during MongoDB connection: {e}")
-            raise
-
-    @app.on_event("shutdown")
-    async def shutdown_db():
-        try:
-            await MongoDB.close()
-            print("MongoDB connection closed.")
-        except Exception as e:
-            print(f"Error during MongoDB shutdown: {e}")
-
-    setup_logging()
+    setup_logging(settings.log_level, settings.log_format, settings.log_access)
+    # Added last so it wraps every other middleware and the request id covers their logs too.
+    app.add_middleware(RequestLoggingMiddleware)
 
     return app
\ No newline at end of file
@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+from starlette.routing import Match
+
+# Set (by app.server) when several workers serve the app: samples are then shared through files in
+# this directory and every worker's /metrics reports the sum over all of them.
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the end of the response body.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being served.",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "Server round trip of each MongoDB command, as reported by the driver.",
+    ["command", "collection"],
+    buckets=LATENCY_BUCKETS,
+)
+MONGO_COMMANDS = Counter(
+    "mongodb_commands_total",
+    "MongoDB commands by outcome.",
+    ["command", "collection", "outcome"],
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    buckets=LATENCY_BUCKETS,
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongodb_pool_checkout_failures_total",
+    "Connection checkouts that failed, by reason.",
+    ["reason"],
+)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongodb_pool_connections_checked_out",
+    "Connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+
+
+def route_name(app, scope) -> str:
+    """The matched route template (e.g. `/projects/{project_id}`), so ids do not explode label cardinality."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and in-flight counts per route.
+
+    Durations run until the last body chunk is sent, so streamed responses
+    (NDJSON, SSE) are timed in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_name(scope["app"], scope)
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(method, route, status).observe(time.perf_counter() - start)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Time every command by name and collection. Driver callbacks may come from any thread."""
+
+    def __init__(self):
+        self._pending: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return event.connection_id, event.request_id, event.operation_id
+
+    def started(self, event):
+        target = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+        with self._lock:
+            self._pending[self._key(event)] = (event.command_name, target if isinstance(target, str) else "")
+
+    def _finish(self, event, outcome: str):
+        with self._lock:
+            labels = self._pending.pop(self._key(event), (event.command_name, ""))
+        MONGO_COMMAND_DURATION.labels(*labels).observe(event.duration_micros / 1_000_000)
+        MONGO_COMMANDS.labels(*labels, outcome).inc()
+
+    def succeeded(self, event):
+        self._finish(event, "success")
+
+    def failed(self, event):
+        self._finish(event, "failure")
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Pool histograms plus plain counts of open, checked-out and waiting connections for the health probes."""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.cleared = 0
+
+    def connection_check_out_started(self, event):
+        self.waiting += 1
+
+    def connection_checked_out(self, event):
+        self.waiting -= 1
+        self.checked_out += 1
+        MONGO_POOL_CHECKOUT_WAIT.observe(event.duration)
+        MONGO_POOL_CHECKED_OUT.inc()
+
+    def connection_check_out_failed(self, event):
+        self.waiting -= 1
+        MONGO_POOL_CHECKOUT_WAIT.observe(event.duration)
+        MONGO_POOL_CHECKOUT_FAILURES.labels(event.reason).inc()
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+        MONGO_POOL_CHECKED_OUT.dec()
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def pool_cleared(self, event):
+        self.cleared += 1
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+
+    def stats(self) -> dict:
+        return {"open": self.open, "checked_out": self.checked_out, "waiting": self.waiting, "cleared": self.cleared}
+
+
+command_metrics = CommandMetrics()
+pool_metrics = PoolMetrics()
+
+
+def mongo_listeners() -> list:
+    return [command_metrics, pool_metrics]
+
+
+class CacheCollector:
+    """Expose the numeric fields of `stats()` ({cache name: {field: value}}) as gauges at scrape time."""
+
+    def __init__(self, prefix: str, stats: Callable[[], Dict[str, dict]]):
+        self.prefix = prefix
+        self.stats = stats
+
+    def collect(self):
+        families = {}
+        for name, stats in self.stats().items():
+            for field, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value == float("inf"):
+                    continue
+                if field not in families:
+                    families[field] = GaugeMetricFamily(f"{self.prefix}_{field}", f"Cache {field}.", labels=["cache"])
+                families[field].add_metric([name], value)
+        yield from families.values()
+
+
+_collectors = {}
+
+
+def register_cache_stats(prefix: str, stats: Callable[[], Dict[str, dict]]):
+    """Register a `CacheCollector` once per prefix; later calls replace the stats source."""
+    if prefix in _collectors:
+        _collectors[prefix].stats = stats
+        return
+    _collectors[prefix] = CacheCollector(prefix, stats)
+    REGISTRY.register(_collectors[prefix])
+
+
+def render_metrics() -> tuple:
+    if not MULTIPROC_DIR:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # Cache stats live in each worker's memory, so these describe only the worker that answered.
+    for collector in _collectors.values():
+        registry.register(collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_exited():
+    """Drop this worker's live gauges from the shared multiprocess samples."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,155 @@
+import asyncio
+import base64
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app.core.config import settings
+from app.crud.versioning import change_seqs
+from app.db.locks import acquire_lease
+from app.db.mongo import MongoDB
+
+logger = logging.getLogger(__name__)
+
+# One document per deleted document: {collection, doc_id, seq, deleted_at}, expired by a TTL index.
+TOMBSTONES = "tombstones"
+
+BACKFILL_BATCH = 1000
+
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def stamp(seq: int, at: datetime) -> dict:
+    """Fields every write sets: its change sequence number and the server time."""
+    return {"seq": seq, "updated_at": at}
+
+
+def encode_token(seq: int, issued: float) -> str:
+    raw = json.dumps({"s": seq, "t": int(issued)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload.get("s"), int) or not isinstance(payload.get("t"), int):
+            raise ValueError("malformed token")
+        return payload
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid since token")
+
+
+async def record_deletes(collection: str, seqs: Dict[str, int], at: datetime):
+    """Leave a tombstone for each deleted document id, with the sequence number of its delete."""
+    if seqs:
+        await MongoDB.get_db()[TOMBSTONES].insert_many([
+            {"collection": collection, "doc_id": doc_id, "seq": seq, "deleted_at": at} for doc_id, seq in seqs.items()
+        ])
+
+
+async def latest_seq(name: str) -> int:
+    """Sequence number of the last change to collection `name`, write or delete; 0 if there was none.
+    Two index-only reads of the `seq` indexes."""
+    db = MongoDB.get_db()
+    latest = await asyncio.gather(
+        db[name].find({}, {"_id": 0, "seq": 1}).sort("seq", DESCENDING).limit(1).to_list(length=1),
+        db[TOMBSTONES].find({"collection": name}, {"_id": 0, "seq": 1}).sort("seq", DESCENDING).limit(1).to_list(length=1),
+    )
+    return max((found[0].get("seq") or 0 for found in latest if found), default=0)
+
+
+async def collection_tokens(*collections: str) -> dict:
+    """Change token of each collection for list ETags: its latest sequence number. Every write
+    stamps a new one and every delete leaves one on its tombstone, so any change moves it."""
+    return dict(zip(collections, await asyncio.gather(*(latest_seq(name) for name in collections))))
+
+
+async def read_changes(collection, name: str, since: Optional[str], limit: int, projection: Optional[dict] = None) -> dict:
+    """Writes to `collection` after the `since` token, in sequence order: upserts with the current
+    document, deletes as tombstones.
+
+    Sequence numbers are taken before the write lands, and by workers whose
+    clocks may differ a little, so a lower one may still show up after a
+    higher one was read. The returned token therefore
+    only moves past changes older than `changes_settle_seconds`; newer ones
+    are returned again on the next call, and consumers apply them idempotently.
+    """
+    issued = time.time()
+    position = 0
+    if since:
+        token = decode_token(since)
+        position = token["s"]
+        # Tombstones of deletes after the token was issued may already have expired.
+        if issued - token["t"] > settings.tombstone_retention_days * 86400 - settings.changes_settle_seconds:
+            raise HTTPException(status_code=410, detail="Since token expired; fetch the full collection again")
+
+    after = {"seq": {"$gt": position}}
+    docs = await collection.find(after, projection).sort("seq", ASCENDING).limit(limit + 1).to_list(length=limit + 1)
+    tombstones = await MongoDB.get_db()[TOMBSTONES].find(
+        {"collection": name, **after}, {"_id": 0, "doc_id": 1, "seq": 1, "deleted_at": 1}
+    ).sort("seq", ASCENDING).limit(limit + 1).to_list(length=limit + 1)
+
+    changes = [
+        {"op": "upsert", "id": str(doc["_id"]), "seq": doc["seq"], "at": doc.get("updated_at"), "doc": doc}
+        for doc in docs
+    ]
+    changes += [
+        {"op": "delete", "id": tombstone["doc_id"], "seq": tombstone["seq"], "at": tombstone["deleted_at"]}
+        for tombstone in tombstones
+    ]
+    changes.sort(key=lambda change: change["seq"])
+    full = len(changes) > limit
+    changes = changes[:limit]
+
+    settled = datetime.fromtimestamp(issued - settings.changes_settle_seconds, timezone.utc)
+    start = position
+    for change in changes:
+        if change["at"] is not None and change["at"] > settled:
+            break
+        position = change["seq"]
+    for change in changes:
+        if change["op"] == "upsert":
+            change["doc"]["id"] = str(change["doc"].pop("_id"))
+    return {"items": changes, "since": encode_token(position, issued), "more": full and position > start}
+
+
+async def backfill_seqs(collection) -> int:
+    """Give documents written before change sequences existed one, so the feed reports them once."""
+    total = 0
+    while True:
+        ids = [doc["_id"] async for doc in collection.find({"seq": {"$exists": False}}, {"_id": 1}).limit(BACKFILL_BATCH)]
+        if not ids:
+            return total
+        seqs, at = change_seqs(len(ids)), now()
+        await collection.bulk_write([
+            UpdateOne(
+                {"_id": oid, "seq": {"$exists": False}},
+                {"$set": {**stamp(seq, at), "created_at": oid.generation_time}},
+            )
+            for seq, oid in zip(seqs, ids)
+        ], ordered=False)
+        total += len(ids)
+
+
+async def backfill_change_seqs(repositories: Iterable):
+    """`backfill_seqs` on every repository's collection, once, on whichever worker takes the lease."""
+    try:
+        if not await acquire_lease("change_seq_backfill", 600):
+            return
+        for repository in repositories:
+            count = await backfill_seqs(repository.collection)
+            if count:
+                repository.cache.clear()
+                logger.info("Change sequence backfilled on %s: %s documents", repository.name, count)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Change sequence backfill failed")
@@ -1,118 +1,95 @@
-from fastapi import HTTPException
-from pydantic import HttpUrl
+from typing import List, Optional, Tuple
 
-from app.db.mongo import MongoDB
-from bson import ObjectId
+from app.crud.keywords import drop_client, index_client, reindex_clients
+from app.crud.pagination import DEFAULT_PAGE_SIZE
+from app.crud.repository import Repository
+from app.crud.streaming import DEFAULT_BATCH_SIZE
+from app.jobs.cascade import create_cascade_job
+from app.models.bulk import BulkOperation
+from app.models.client import ClientIn, ClientUpdateIn
 
+clients = Repository("clients", "client")
 
-def serialize_for_mongo(data: dict) -> dict:
-    serialized = {}
-    for key, value in data.items():
-        if isinstance(value, HttpUrl):
-            serialized[key] = str(value)
-        else:
-            serialized[key] = value
-    return serialized
 
 async def create_client(client_dict: dict):
-    db = MongoDB.get_db()
-    try:
-        if not isinstance(client_dict, dict):
-            raise ValueError("client_dict must be a dictionary")
-
-        sanitized_data = serialize_for_mongo(client_dict)
-
-        result = await db["clients"].insert_one(sanitized_data)
-        inserted_doc = await db["clients"].find_one({"_id": result.inserted_id})
-        if not inserted_doc:
-            raise ValueError("Failed to retrieve inserted document")
-
-        inserted_doc["id"] = str(inserted_doc["_id"])
-        del inserted_doc["_id"]
-        return inserted_doc
-
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create client: {str(e)}")
-
-
-async def get_clients():
-    db = MongoDB.get_db()
-    try:
-        clients = []
-        async for client in db["clients"].find():
-            client["id"] = str(client["_id"])
-            del client["_id"]
-            clients.append(client)
-        return clients
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch clients: {str(e)}")
-
-
-async def get_client_by_id(client_id: str):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(client_id):
-            raise HTTPException(status_code=400, detail="Invalid client ID format")
-
-        client = await db["clients"].find_one({"_id": ObjectId(client_id)})
-        if not client:
-            raise HTTPException(status_code=404, detail="Client not found")
-
-        client["id"] = str(client["_id"])
-        del client["_id"]
-        return client
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve client: {str(e)}")
+    client = await clients.create(client_dict)
+    await index_client(None, client)
+    return client
 
 
-async def update_client(client_id: str, update_data: dict):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(client_id):
-            raise HTTPException(status_code=400, detail="Invalid client ID format")
+async def get_clients(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "_id",
+    descending: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    return await clients.list({}, limit, cursor, sort, descending, fields)
 
-        if not isinstance(update_data, dict):
-            raise HTTPException(status_code=400, detail="Invalid update data")
 
-        sanitized_data = update_data.copy()
-        if "link" in sanitized_data and isinstance(sanitized_data["link"], HttpUrl):
-            sanitized_data["link"] = str(sanitized_data["link"])
+def stream_clients(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sort: str = "_id",
+    descending: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    return clients.stream({}, batch_size, fields, sort, descending)
 
-        result = await db["clients"].update_one(
-            {"_id": ObjectId(client_id)},
-            {"$set": sanitized_data}
-        )
 
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Client not found")
+async def get_clients_changes(since: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, fields: Optional[Tuple[str, ...]] = None):
+    return await clients.changes(since, limit, fields)
 
-        updated_client = await db["clients"].find_one({"_id": ObjectId(client_id)})
-        updated_client["id"] = str(updated_client["_id"])
-        del updated_client["_id"]
-        return updated_client
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update client: {str(e)}")
 
+async def get_clients_by_ids(client_ids: List[str], fields: Optional[Tuple[str, ...]] = None):
+    return await clients.get_many(client_ids, fields)
+
+
+async def get_client_by_id(client_id: str, fields: Optional[Tuple[str, ...]] = None):
+    return await clients.get(client_id, fields)
+
+
+async def get_client_version(client_id: str):
+    return await clients.version(client_id)
 
-async def delete_client(client_id: str):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(client_id):
-            raise HTTPException(status_code=400, detail="Invalid client ID format")
 
-        result = await db["clients"].delete_one({"_id": ObjectId(client_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Client not found")
+async def get_clients_tokens():
+    return await clients.tokens()
 
-        await db["projects"].delete_many({"client_id": client_id})
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete client: {str(e)}")
+async def update_client(client_id: str, update_data: dict):
+    before, client = await clients.update_tracked(client_id, update_data)
+    await index_client(before, client)
+    return client
+
+
+async def patch_client(
+    client_id: str,
+    fields: dict,
+    add_keywords: Optional[List[str]] = None,
+    remove_keywords: Optional[List[str]] = None,
+    expected_version: Optional[int] = None,
+):
+    before, client = await clients.patch_tracked(
+        client_id, fields, {"keywords": add_keywords}, {"keywords": remove_keywords}, expected_version
+    )
+    await index_client(before, client)
+    return client
+
+
+async def delete_client(client_id: str):
+    """Delete the client now; its dependent documents are removed by a background job whose id is returned."""
+    await clients.delete(client_id)
+    await drop_client(client_id)
+    return await create_cascade_job("clients", [client_id])
+
+
+async def bulk_clients(operations: List[BulkOperation]):
+    result = await clients.bulk(operations, ClientIn, ClientUpdateIn)
+    written = [item["id"] for item in result["results"] if item["op"] != "delete" and item["status"] < 400]
+    await reindex_clients(written)
+    deleted = [item["id"] for item in result["results"] if item["op"] == "delete" and item["status"] == 200]
+    for client_id in deleted:
+        await drop_client(client_id)
+    if deleted:
+        result["job_id"] = await create_cascade_job("clients", deleted)
+    return result
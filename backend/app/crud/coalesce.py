@@ -0,0 +1,74 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+
+class SingleFlight:
+    """Run identical concurrent reads once and hand every caller the result.
+
+    Keys are `(collection, ...)` tuples. The first caller for a key starts the
+    read in a task of its own; callers arriving while it runs await that task
+    instead of sending the same query. Each awaits it through
+    `asyncio.shield`, so a caller that goes away (a client disconnecting)
+    does not cancel the read for the others.
+
+    `forget` runs after every write: reads already in flight keep their
+    callers, but later callers start a fresh read, so no one is served data
+    from before a write that completed before they asked.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[Hashable, ...], asyncio.Future] = {}
+        self.reads: Dict[str, int] = {}
+        self.collapsed: Dict[str, int] = {}
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.read_coalescing
+
+    async def do(self, key: Tuple[Hashable, ...], read: Callable[[], Awaitable], share: Optional[Callable] = None):
+        """`await read()`, or the result of an identical read already running; each caller gets `share(result)`."""
+        collection = key[0]
+        if not self.enabled():
+            self.reads[collection] = self.reads.get(collection, 0) + 1
+            return await read()
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(read())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._land(key, done))
+            self.reads[collection] = self.reads.get(collection, 0) + 1
+        else:
+            self.collapsed[collection] = self.collapsed.get(collection, 0) + 1
+        result = await asyncio.shield(flight)
+        return share(result) if share is not None else result
+
+    def _land(self, key, flight: asyncio.Future):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Retrieved here so a failure whose callers all went away is not reported as unhandled.
+        if not flight.cancelled():
+            flight.exception()
+
+    def forget(self):
+        self._flights.clear()
+
+    def stats(self) -> Dict[str, dict]:
+        stats = {}
+        for collection in sorted(set(self.reads) | set(self.collapsed)):
+            reads, collapsed = self.reads.get(collection, 0), self.collapsed.get(collection, 0)
+            stats[collection] = {
+                "reads": reads,
+                "collapsed": collapsed,
+                "collapsed_ratio": collapsed / (reads + collapsed) if reads + collapsed else 0.0,
+            }
+        return stats
+
+
+reads = SingleFlight()
+
+
+def coalescing_stats() -> Dict[str, dict]:
+    return reads.stats()
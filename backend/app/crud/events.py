@@ -0,0 +1,114 @@
+import asyncio
+import itertools
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Optional
+
+from app.db.change_stream import change_stream
+
+# Document fields copied into events; enough for a dashboard to update a row in place.
+EVENT_FIELDS = ("client_id", "status", "version")
+
+OPERATIONS = {"insert": "create", "update": "update", "replace": "update", "delete": "delete"}
+
+
+class Subscription:
+    def __init__(self, collections: Optional[Iterable[str]], client_id: Optional[str], maxsize: int):
+        self.collections = set(collections) if collections else None
+        self.client_id = client_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def wants(self, event: dict) -> bool:
+        if self.collections is not None and event["collection"] not in self.collections:
+            return False
+        # Deletes do not know the document's client, so every client filter gets them.
+        return self.client_id is None or event.get("client_id") in (None, self.client_id)
+
+
+class EventBus:
+    """Fan document write events out to in-process subscribers (the SSE route).
+
+    Events come from the change stream (or, on a standalone server, from
+    polling the changes feeds), which covers writes made by every worker;
+    only when neither runs do the repositories publish their own writes.
+    A subscriber that falls `maxsize` events behind gets a single `reset`
+    event in place of its backlog and should re-fetch. `close_all` ends
+    every stream the same way, followed by `None`.
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self._subscriptions = set()
+        self._ids = itertools.count(1)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    @contextmanager
+    def subscribe(self, collections: Optional[Iterable[str]] = None, client_id: Optional[str] = None):
+        subscription = Subscription(collections, client_id, self.maxsize)
+        self._subscriptions.add(subscription)
+        # On a standalone server the changes feeds are polled only while someone is listening.
+        change_stream.wake()
+        try:
+            yield subscription.queue
+        finally:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, collection: str, op: str, doc_id: Optional[str], doc: Optional[dict] = None):
+        if not self._subscriptions:
+            return
+        event = {"event_id": next(self._ids), "collection": collection, "op": op, "id": doc_id}
+        for field in EVENT_FIELDS:
+            if doc and doc.get(field) is not None:
+                event[field] = doc[field]
+        for subscription in self._subscriptions:
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._reset(subscription, event["event_id"])
+
+    @staticmethod
+    def _reset(subscription: Subscription, event_id: int):
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait({"event_id": event_id, "op": "reset"})
+
+    def close_all(self):
+        """Tell every subscriber to re-fetch, then end its stream (used when the process drains)."""
+        event_id = next(self._ids)
+        for subscription in self._subscriptions:
+            self._reset(subscription, event_id)
+            subscription.queue.put_nowait(None)
+
+
+events = EventBus()
+
+
+def publish_change(change: dict):
+    """Change stream handler: turn a change event into a bus event."""
+    events.publish(
+        change["ns"]["coll"],
+        OPERATIONS[change["operationType"]],
+        str(change["documentKey"]["_id"]),
+        change.get("fullDocument"),
+    )
+
+
+_write_handlers: List[Callable[[str, str, Optional[str], Optional[dict]], None]] = []
+
+
+def on_local_write(handler: Callable[[str, str, Optional[str], Optional[dict]], None]):
+    """Also hand every write `publish_local` publishes to `handler`, with the same arguments."""
+    if handler not in _write_handlers:
+        _write_handlers.append(handler)
+
+
+def publish_local(collection: str, op: str, doc_id: Optional[str], doc: Optional[dict] = None):
+    """Publish a write made by this process, unless the change stream will report it."""
+    if not change_stream.active:
+        events.publish(collection, op, doc_id, doc)
+        for handler in _write_handlers:
+            handler(collection, op, doc_id, doc)
@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Union
+
+from fastapi import HTTPException
+
+
+def build_filter(date_from: Optional[str] = None, date_to: Optional[str] = None, **equals) -> dict:
+    """Build a Mongo filter from exact-match fields and an inclusive `date` range.
+
+    `date` is stored as an ISO-8601 string, so range bounds compare lexically.
+    A date-only `date_to` covers the whole day: it becomes `$lt` the next
+    day, which every timestamp on that day sorts below. A bound that is not
+    ISO-8601 is a 400.
+    """
+    query = {key: value for key, value in equals.items() if value is not None}
+    date_range = {}
+    if date_from:
+        parse_date_bound("date_from", date_from)
+        date_range["$gte"] = date_from
+    if date_to:
+        if isinstance(parse_date_bound("date_to", date_to), datetime):
+            date_range["$lte"] = date_to
+        else:
+            date_range["$lt"] = (date.fromisoformat(date_to) + timedelta(days=1)).isoformat()
+    if date_range:
+        query["date"] = date_range
+    return query
+
+
+def parse_date_bound(name: str, value: str) -> Union[date, datetime]:
+    """`value` as a date when it is date-only (YYYY-MM-DD), else as a datetime."""
+    try:
+        if len(value) == 10:
+            return date.fromisoformat(value)
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO-8601 date or date-time")
+
+
+def split_ids(ids: str, limit: int) -> List[str]:
+    """`ids=a,b,c` as a list of ids; 400 when it holds more than `limit`."""
+    values = [value.strip() for value in ids.split(",") if value.strip()]
+    if len(values) > limit:
+        raise HTTPException(status_code=400, detail=f"At most {limit} ids per request")
+    return values
+
+
+def client_name_lookup() -> list:
+    """Stages that join `client_name` from `clients` onto documents with a `client_id`."""
+    return [
+        {"$lookup": {
+            "from": "clients",
+            "let": {"client_oid": {"$convert": {"input": "$client_id", "to": "objectId", "onError": None, "onNull": None}}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$client_oid"]}}},
+                {"$project": {"_id": 0, "name": 1}},
+            ],
+            "as": "_client",
+        }},
+        {"$addFields": {"client_name": {"$arrayElemAt": ["$_client.name", 0]}}},
+        {"$project": {"_client": 0}},
+    ]
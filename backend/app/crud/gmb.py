@@ -1,116 +1,90 @@
-from fastapi import HTTPException
-from pydantic import HttpUrl
+from typing import List, Optional, Tuple
 
-from app.db.mongo import MongoDB
-from bson import ObjectId
+from app.crud.filters import client_name_lookup
+from app.crud.pagination import DEFAULT_PAGE_SIZE
+from app.crud.repository import Repository
+from app.crud.streaming import DEFAULT_BATCH_SIZE
+from app.models.bulk import BulkOperation
+from app.models.gmb import GmbIn, GmbUpdateIn
 
+gmbs = Repository("gmb", "gmb")
 
-def serialize_for_mongo(data: dict) -> dict:
-    serialized = {}
-    for key, value in data.items():
-        if isinstance(value, HttpUrl):
-            serialized[key] = str(value)
-        else:
-            serialized[key] = value
-    return serialized
 
 async def create_gmb(gmb_dict: dict):
-    db = MongoDB.get_db()
-    try:
-        if not isinstance(gmb_dict, dict):
-            raise ValueError("gmb_dict must be a dictionary")
-
-        sanitized_data = serialize_for_mongo(gmb_dict)
-
-        result = await db["gmb"].insert_one(sanitized_data)
-        inserted_doc = await db["gmb"].find_one({"_id": result.inserted_id})
-        if not inserted_doc:
-            raise ValueError("Failed to retrieve inserted document")
-
-        inserted_doc["id"] = str(inserted_doc["_id"])
-        del inserted_doc["_id"]
-        return inserted_doc
-
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create client: {str(e)}")
-
-
-async def get_gmb():
-    db = MongoDB.get_db()
-    try:
-        gmbs = []
-        async for gmb in db["gmb"].find():
-            gmb["id"] = str(gmb["_id"])
-            del gmb["_id"]
-            gmbs.append(gmb)
-        return gmbs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch gmbs: {str(e)}")
-
-
-async def get_gmb_by_id(gmb_id: str):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(gmb_id):
-            raise HTTPException(status_code=400, detail="Invalid gmb ID format")
-
-        gmb = await db["gmb"].find_one({"_id": ObjectId(gmb_id)})
-        if not gmb:
-            raise HTTPException(status_code=404, detail="Gmb not found")
-
-        gmb["id"] = str(gmb["_id"])
-        del gmb["_id"]
-        return gmb
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve gmb: {str(e)}")
+    return await gmbs.create(gmb_dict)
+
+
+async def get_gmb(
+    query: Optional[dict] = None,
+    expand_client_name: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "_id",
+    descending: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    if expand_client_name:
+        return await gmbs.list(
+            query, limit, cursor, sort, descending, fields, client_name_lookup(), required=("client_id",)
+        )
+    return await gmbs.list(query, limit, cursor, sort, descending, fields)
+
+
+def stream_gmb(
+    query: Optional[dict] = None,
+    expand_client_name: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sort: str = "_id",
+    descending: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    if expand_client_name:
+        return gmbs.stream(
+            query, batch_size, fields, sort, descending, client_name_lookup(), required=("client_id",)
+        )
+    return gmbs.stream(query, batch_size, fields, sort, descending)
 
 
-async def update_gmb(gmb_id: str, update_data: dict):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(gmb_id):
-            raise HTTPException(status_code=400, detail="Invalid gmb ID format")
+async def get_gmb_changes(since: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, fields: Optional[Tuple[str, ...]] = None):
+    return await gmbs.changes(since, limit, fields)
 
-        if not isinstance(update_data, dict):
-            raise HTTPException(status_code=400, detail="Invalid update data")
 
-        sanitized_data = update_data.copy()
-        if "link" in sanitized_data and isinstance(sanitized_data["link"], HttpUrl):
-            sanitized_data["link"] = str(sanitized_data["link"])
+async def get_gmb_by_ids(
+    gmb_ids: List[str],
+    query: Optional[dict] = None,
+    expand_client_name: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    if expand_client_name:
+        return await gmbs.get_many(gmb_ids, fields, query, client_name_lookup(), required=("client_id",))
+    return await gmbs.get_many(gmb_ids, fields, query)
 
-        result = await db["gmb"].update_one(
-            {"_id": ObjectId(gmb_id)},
-            {"$set": sanitized_data}
-        )
 
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="gmb not found")
+async def get_gmb_by_id(gmb_id: str, fields: Optional[Tuple[str, ...]] = None):
+    return await gmbs.get(gmb_id, fields)
+
+
+async def get_gmb_version(gmb_id: str):
+    return await gmbs.version(gmb_id)
+
 
-        updated_gmb = await db["gmb"].find_one({"_id": ObjectId(gmb_id)})
-        updated_gmb["id"] = str(updated_gmb["_id"])
-        del updated_gmb["_id"]
-        return updated_gmb
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update gmb: {str(e)}")
+async def get_gmb_tokens(expand_client_name: bool = False):
+    if expand_client_name:
+        return await gmbs.tokens("clients")
+    return await gmbs.tokens()
+
+
+async def update_gmb(gmb_id: str, update_data: dict):
+    return await gmbs.update(gmb_id, update_data)
+
+
+async def patch_gmb(gmb_id: str, fields: dict, expected_version: Optional[int] = None):
+    return await gmbs.patch(gmb_id, fields, expected_version=expected_version)
 
 
 async def delete_gmb(gmb_id: str):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(gmb_id):
-            raise HTTPException(status_code=400, detail="Invalid gmb ID format")
-
-        result = await db["gmb"].delete_one({"_id": ObjectId(gmb_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="gmb not found")
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete gmb: {str(e)}")
+    await gmbs.delete(gmb_id)
+
+
+async def bulk_gmb(operations: List[BulkOperation]):
+    return await gmbs.bulk(operations, GmbIn, GmbUpdateIn)
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.db.locks import acquire_lease
+from app.db.mongo import MongoDB
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_INDEX = "keyword_index"
+
+DUPLICATE_KEY = 11000
+INSERT_BATCH = 1000
+
+Pair = Tuple[str, str]
+
+
+def normalize(keyword) -> str:
+    return " ".join(str(keyword).lower().split())
+
+
+def keyword_set(doc: Optional[dict]) -> Set[str]:
+    if not doc:
+        return set()
+    return {key for key in (normalize(keyword) for keyword in doc.get("keywords") or []) if key}
+
+
+def project_pairs(doc: Optional[dict]) -> Set[Pair]:
+    """(client_id, keyword) for every keyword of a project."""
+    if not doc or not doc.get("client_id"):
+        return set()
+    return {(doc["client_id"], keyword) for keyword in keyword_set(doc)}
+
+
+def collection():
+    return MongoDB.get_db()[KEYWORD_INDEX]
+
+
+async def _upsert(operations: List[UpdateOne]):
+    """Unordered upserts; one whose insert lost a race with another writer is run once more, now as an update."""
+    if not operations:
+        return
+    try:
+        await collection().bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error["code"] != DUPLICATE_KEY for error in errors):
+            raise
+        retry = [operations[error["index"]] for error in errors]
+        try:
+            await collection().bulk_write(retry, ordered=False)
+        except BulkWriteError as again:
+            # A duplicate now means the entry already lists what was being added.
+            if any(error["code"] != DUPLICATE_KEY for error in again.details.get("writeErrors", [])):
+                raise
+
+
+def _drop_empty(pairs: Iterable[Pair]) -> List[DeleteOne]:
+    return [
+        DeleteOne({"client_id": client_id, "keyword": keyword, "project_count": 0, "client": False})
+        for client_id, keyword in pairs
+    ]
+
+
+async def index_project(before: Optional[dict], after: Optional[dict]):
+    """Move a project between keyword entries after it was created (`before` None), updated or deleted (`after` None).
+
+    Entries are keyed by (client_id, normalized keyword) and hold the ids of
+    the client's projects that use the keyword, their count and whether the
+    client's own keyword list has it. Only the keywords that changed are
+    written: one round trip for additions, one for removals.
+    """
+    old, new = project_pairs(before), project_pairs(after)
+    removed, added = old - new, new - old
+    if added:
+        project_id = str(after.get("id") or after.get("_id"))
+        # The filter fails when the id is already listed: then the upsert hits the unique key and is a no-op.
+        await _upsert([
+            UpdateOne(
+                {"client_id": client_id, "keyword": keyword, "projects": {"$ne": project_id}},
+                {"$push": {"projects": project_id}, "$inc": {"project_count": 1}, "$setOnInsert": {"client": False}},
+                upsert=True,
+            )
+            for client_id, keyword in added
+        ])
+    if removed:
+        project_id = str(before.get("id") or before.get("_id"))
+        await collection().bulk_write([
+            *(
+                UpdateOne(
+                    {"client_id": client_id, "keyword": keyword, "projects": project_id},
+                    {"$pull": {"projects": project_id}, "$inc": {"project_count": -1}},
+                )
+                for client_id, keyword in removed
+            ),
+            *_drop_empty(removed),
+        ])
+
+
+async def index_client(before: Optional[dict], after: Optional[dict]):
+    """Flag the client's own keywords after a create or update; see `drop_client` for deletes."""
+    client_id = str((after or before).get("id") or (after or before).get("_id"))
+    old, new = keyword_set(before), keyword_set(after)
+    await _upsert([
+        UpdateOne(
+            {"client_id": client_id, "keyword": keyword},
+            {"$set": {"client": True}, "$setOnInsert": {"projects": [], "project_count": 0}},
+            upsert=True,
+        )
+        for keyword in new - old
+    ])
+    removed = [(client_id, keyword) for keyword in old - new]
+    if removed:
+        await collection().bulk_write([
+            *(UpdateOne({"client_id": client_id, "keyword": keyword}, {"$set": {"client": False}}) for _, keyword in removed),
+            *_drop_empty(removed),
+        ])
+
+
+async def drop_client(client_id: str):
+    await collection().delete_many({"client_id": client_id})
+
+
+def _entries(projects: Iterable[dict], clients: Iterable[dict]) -> List[dict]:
+    entries: Dict[Pair, dict] = defaultdict(lambda: {"projects": [], "client": False})
+    for project in projects:
+        for pair in project_pairs(project):
+            entries[pair]["projects"].append(str(project["_id"]))
+    for client in clients:
+        for keyword in keyword_set(client):
+            entries[(str(client["_id"]), keyword)]["client"] = True
+    return [
+        {"client_id": client_id, "keyword": keyword, **entry, "project_count": len(entry["projects"])}
+        for (client_id, keyword), entry in entries.items()
+    ]
+
+
+async def reindex_clients(client_ids: Iterable[Optional[str]]):
+    """Recompute every entry of these clients from their documents (after bulk writes and cascades)."""
+    db = MongoDB.get_db()
+    for client_id in {client_id for client_id in client_ids if client_id}:
+        projects = await db["projects"].find({"client_id": client_id}, {"client_id": 1, "keywords": 1}).to_list(length=None)
+        clients = []
+        if ObjectId.is_valid(client_id):
+            clients = await db["clients"].find({"_id": ObjectId(client_id)}, {"keywords": 1}).to_list(length=None)
+        await collection().delete_many({"client_id": client_id})
+        entries = _entries(projects, clients)
+        if entries:
+            await collection().insert_many(entries, ordered=False)
+
+
+async def rebuild_keyword_index() -> int:
+    """Rebuild the whole index from the projects and clients collections; returns the number of entries."""
+    db = MongoDB.get_db()
+    projects = db["projects"].find({}, {"client_id": 1, "keywords": 1})
+    clients = db["clients"].find({}, {"keywords": 1})
+    entries = _entries([doc async for doc in projects], [doc async for doc in clients])
+    await collection().delete_many({})
+    for start in range(0, len(entries), INSERT_BATCH):
+        await collection().insert_many(entries[start:start + INSERT_BATCH], ordered=False)
+    logger.info("Keyword index rebuilt: %s entries", len(entries))
+    return len(entries)
+
+
+async def ensure_keyword_index():
+    """Build the index on first start against existing data."""
+    db = MongoDB.get_db()
+    if await collection().estimated_document_count() == 0 and (
+        await db["projects"].estimated_document_count() or await db["clients"].estimated_document_count()
+    ):
+        await rebuild_keyword_index()
+
+
+async def build_keyword_index():
+    """`ensure_keyword_index` at startup; the lease keeps the other workers from doing it too."""
+    try:
+        if await acquire_lease("keyword_index_build", 600):
+            await ensure_keyword_index()
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Keyword index build failed")
+
+
+async def top_keywords(client_id: str, limit: int) -> List[dict]:
+    cursor = collection().find(
+        {"client_id": client_id, "project_count": {"$gt": 0}},
+        {"_id": 0, "keyword": 1, "project_count": 1, "client": 1},
+    ).sort([("project_count", -1), ("keyword", 1)]).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def shared_keywords(client_id: str, min_projects: int, limit: int) -> List[dict]:
+    """Keywords used by at least `min_projects` of the client's projects, with those projects' names."""
+    entries = await collection().find(
+        {"client_id": client_id, "project_count": {"$gte": min_projects}},
+        {"_id": 0, "keyword": 1, "project_count": 1, "projects": 1},
+    ).sort([("project_count", -1), ("keyword", 1)]).limit(limit).to_list(length=limit)
+    ids = {project_id for entry in entries for project_id in entry["projects"] if ObjectId.is_valid(project_id)}
+    names = {}
+    if ids:
+        async for project in MongoDB.get_db()["projects"].find({"_id": {"$in": [ObjectId(i) for i in ids]}}, {"name": 1}):
+            names[str(project["_id"])] = project.get("name")
+    for entry in entries:
+        entry["projects"] = [{"id": project_id, "name": names.get(project_id)} for project_id in entry["projects"]]
+    return entries
+
+
+async def unused_keywords(client_id: str) -> List[str]:
+    """The client's own keywords that none of its projects use."""
+    cursor = collection().find(
+        {"client_id": client_id, "project_count": 0, "client": True}, {"_id": 0, "keyword": 1}
+    ).sort([("project_count", -1), ("keyword", 1)])
+    return [entry["keyword"] async for entry in cursor]
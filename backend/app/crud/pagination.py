@@ -0,0 +1,104 @@
+import base64
+import json
+from typing import Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort_key: str, value, last_id: ObjectId) -> str:
+    payload = {"k": sort_key, "v": value, "id": str(last_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload.get("k") != sort_key or not ObjectId.is_valid(payload.get("id")):
+            raise ValueError("cursor does not match sort order")
+        payload["id"] = ObjectId(payload["id"])
+        return payload
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_query(query: dict, sort_key: str, direction: int, cursor: Optional[str]) -> dict:
+    """Extend `query` so it only matches documents after the cursor position."""
+    if not cursor:
+        return query
+
+    position = decode_cursor(cursor, sort_key)
+    op = "$gt" if direction == ASCENDING else "$lt"
+    if sort_key == "_id":
+        after = {"_id": {op: position["id"]}}
+    elif position["v"] is None:
+        # Mongo sorts null (and missing) values before every other value, and `$gt: null` matches
+        # nothing: after a null come the other nulls by _id, then (ascending) every non-null value.
+        after = {sort_key: None, "_id": {op: position["id"]}}
+        if direction == ASCENDING:
+            after = {"$or": [after, {sort_key: {"$ne": None}}]}
+    else:
+        after = {"$or": [
+            {sort_key: {op: position["v"]}},
+            {sort_key: position["v"], "_id": {op: position["id"]}},
+        ]}
+        if direction == DESCENDING:
+            # Descending, the nulls come after every value.
+            after["$or"].append({sort_key: None})
+    return {"$and": [query, after]} if query else after
+
+
+async def paginate(
+    collection,
+    query: Optional[dict] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort_key: str = "_id",
+    descending: bool = False,
+    pipeline: Optional[list] = None,
+    projection: Optional[dict] = None,
+) -> dict:
+    """Return one page of `collection` ordered by `sort_key` then `_id`.
+
+    Pages are fetched with a range query on the sort key instead of `skip`, so
+    the cost of a page does not grow with its position in the collection.
+    Extra aggregation stages in `pipeline` (e.g. a `$lookup`) run only on the
+    documents of the page. `projection` limits the fields read from Mongo; the
+    sort key is always kept so the next cursor can be built.
+    """
+    direction = DESCENDING if descending else ASCENDING
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    sort = [("_id", direction)] if sort_key == "_id" else [(sort_key, direction), ("_id", direction)]
+
+    if projection and sort_key != "_id":
+        projection = {**projection, sort_key: 1}
+
+    find_query = keyset_query(query or {}, sort_key, direction, cursor)
+    # Fetch one extra document to know whether another page exists.
+    if pipeline:
+        stages = [{"$match": find_query}, {"$sort": dict(sort)}, {"$limit": limit + 1}]
+        if projection:
+            stages.append({"$project": projection})
+        stages.extend(pipeline)
+        docs = await collection.aggregate(stages).to_list(length=limit + 1)
+    else:
+        docs = await collection.find(find_query, projection).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(sort_key, last.get(sort_key) if sort_key != "_id" else None, last["_id"])
+
+    items = []
+    for doc in docs:
+        doc["id"] = str(doc["_id"])
+        del doc["_id"]
+        items.append(doc)
+    return {"items": items, "next_cursor": next_cursor}
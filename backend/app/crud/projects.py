@@ -1,91 +1,145 @@
-from fastapi import HTTPException
-from app.db.mongo import MongoDB
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
 from bson import ObjectId
 
+from app.crud.filters import client_name_lookup
+from app.crud.keywords import index_project, reindex_clients
+from app.crud.pagination import DEFAULT_PAGE_SIZE
+from app.crud.repository import Repository
+from app.crud.streaming import DEFAULT_BATCH_SIZE
+from app.models.bulk import BulkOperation
+from app.models.project import ProjectIn, ProjectUpdateIn
+
+projects = Repository("projects", "project")
+
+
 async def create_project(project_dict: dict):
-    db = MongoDB.get_db()
-    try:
-        # Validate input type
-        if not isinstance(project_dict, dict):
-            raise ValueError("project_dict must be a dictionary")
-        # Insert the document
-        result = await db["projects"].insert_one(project_dict)
-        # Fetch the inserted document
-        inserted_doc = await db["projects"].find_one({"_id": result.inserted_id})
-        if not inserted_doc:
-            raise ValueError("Failed to retrieve inserted document")
-        # Convert ObjectId to string
-        inserted_doc["id"] = str(inserted_doc["_id"])
-        # Remove _id to avoid duplication in ProjectOut
-        del inserted_doc["_id"]
-        return inserted_doc
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
-
-
-async def get_projects():
-    db = MongoDB.get_db()
-    try:
-        clients = []
-        async for client in db["projects"].find():
-            client["id"] = str(client["_id"])
-            del client["_id"]
-            clients.append(client)
-        return clients
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch projects: {str(e)}")
-
-
-async def get_project_by_id(project_id: str):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(project_id):
-            raise HTTPException(status_code=400, detail="Invalid project ID format")
-
-        project = await db["projects"].find_one({"_id": ObjectId(project_id)})
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
-
-        project["id"] = str(project["_id"])
-        del project["_id"]
-        return project
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve project: {str(e)}")
+    project = await projects.create(project_dict)
+    await index_project(None, project)
+    return project
 
 
-async def update_project(project_id: str, update_data: dict):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(project_id):
-            raise HTTPException(status_code=400, detail="Invalid project ID format")
-        if not isinstance(update_data, dict):
-            raise HTTPException(status_code=400, detail="Invalid update data")
-
-        result = await db["projects"].update_one(
-            {"_id": ObjectId(project_id)},
-            {"$set": update_data}
+async def get_projects(
+    query: Optional[dict] = None,
+    expand_client_name: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "_id",
+    descending: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    if expand_client_name:
+        return await projects.list(
+            query, limit, cursor, sort, descending, fields, client_name_lookup(), required=("client_id",)
+        )
+    return await projects.list(query, limit, cursor, sort, descending, fields)
+
+
+def stream_projects(
+    query: Optional[dict] = None,
+    expand_client_name: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sort: str = "_id",
+    descending: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    if expand_client_name:
+        return projects.stream(
+            query, batch_size, fields, sort, descending, client_name_lookup(), required=("client_id",)
         )
+    return projects.stream(query, batch_size, fields, sort, descending)
+
+
+async def get_projects_changes(since: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, fields: Optional[Tuple[str, ...]] = None):
+    return await projects.changes(since, limit, fields)
+
+
+async def get_projects_by_ids(
+    project_ids: List[str],
+    query: Optional[dict] = None,
+    expand_client_name: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    if expand_client_name:
+        return await projects.get_many(project_ids, fields, query, client_name_lookup(), required=("client_id",))
+    return await projects.get_many(project_ids, fields, query)
+
+
+async def get_project_by_id(project_id: str, fields: Optional[Tuple[str, ...]] = None):
+    return await projects.get(project_id, fields)
+
+
+async def get_project_version(project_id: str):
+    return await projects.version(project_id)
 
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Project not found")
 
-        updated_project = await db["projects"].find_one({"_id": ObjectId(project_id)})
-        updated_project["id"] = str(updated_project["_id"])
-        del updated_project["_id"]
-        return updated_project
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update project: {str(e)}")
+async def get_projects_tokens(expand_client_name: bool = False):
+    if expand_client_name:
+        return await projects.tokens("clients")
+    return await projects.tokens()
+
+
+async def update_project(project_id: str, update_data: dict):
+    before, project = await projects.update_tracked(project_id, update_data)
+    await index_project(before, project)
+    return project
+
+
+async def patch_project(
+    project_id: str,
+    fields: dict,
+    add_keywords: Optional[List[str]] = None,
+    remove_keywords: Optional[List[str]] = None,
+    expected_version: Optional[int] = None,
+):
+    before, project = await projects.patch_tracked(
+        project_id, fields, {"keywords": add_keywords}, {"keywords": remove_keywords}, expected_version
+    )
+    await index_project(before, project)
+    return project
+
 
 async def delete_project(project_id: str):
-    db = MongoDB.get_db()
-    if not ObjectId.is_valid(project_id):
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    result = await db["projects"].delete_one({"_id": ObjectId(project_id)})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Project not found")
\ No newline at end of file
+    await index_project(await projects.delete(project_id), None)
+
+
+async def bulk_projects(operations: List[BulkOperation]):
+    # Clients whose keyword entries the batch can change: those of the targets now, and of the data written.
+    targets = [ObjectId(op.id) for op in operations if op.op != "create" and op.id and ObjectId.is_valid(op.id)]
+    client_ids = {(op.data or {}).get("client_id") for op in operations}
+    if targets:
+        async for doc in projects.collection.find({"_id": {"$in": targets}}, {"client_id": 1}):
+            client_ids.add(doc.get("client_id"))
+    result = await projects.bulk(operations, ProjectIn, ProjectUpdateIn)
+    await reindex_clients(client_ids)
+    return result
+
+
+async def queue_project(project_id: str):
+    """Queue a project for generation; a run already in progress loses its claim and its result is dropped."""
+    return await projects.update(project_id, {"status": "queued", "errors": None, "attempts": 0, "claim_token": None})
+
+
+async def claim_project(providers: List[str], default_provider: str, lease_seconds: float, claim_token: str):
+    """Atomically move the oldest claimable project to "processing" for one of `providers`.
+
+    A project is claimable when queued, or when its previous claim has been
+    processing for longer than `lease_seconds` (the worker died).
+    """
+    now = datetime.now(timezone.utc)
+    provider_filter = [{"provider": {"$in": providers}}]
+    if default_provider in providers:
+        provider_filter.append({"provider": None})
+    query = {"$and": [
+        {"$or": [
+            {"status": "queued"},
+            {"status": "processing", "claimed_at": {"$lt": now - timedelta(seconds=lease_seconds)}},
+        ]},
+        {"$or": provider_filter},
+    ]}
+    return await projects.claim(query, {"status": "processing", "claimed_at": now, "claim_token": claim_token})
+
+
+async def update_claimed_project(project_id: str, claim_token: str, update_data: dict):
+    return await projects.update(project_id, update_data, match={"claim_token": claim_token})
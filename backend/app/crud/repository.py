@@ -0,0 +1,614 @@
+import asyncio
+from typing import List, Optional, Tuple, Type
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pydantic import BaseModel, HttpUrl, ValidationError
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, ClientBulkWriteException, WriteError
+
+from app.crud.cache import cache_from_settings
+from app.crud.changes import collection_tokens, now, read_changes, record_deletes, stamp
+from app.crud.coalesce import reads
+from app.crud.events import publish_local
+from app.crud.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.crud.streaming import DEFAULT_BATCH_SIZE, stream_ndjson
+from app.crud.versioning import change_seqs
+from app.db.mongo import MongoDB
+from app.models.bulk import BulkOperation
+from app.models.fields import projection
+
+
+def serialize_for_mongo(data: dict) -> dict:
+    serialized = {}
+    for key, value in data.items():
+        if isinstance(value, HttpUrl):
+            serialized[key] = str(value)
+        else:
+            serialized[key] = value
+    return serialized
+
+
+def validation_errors(e: ValidationError) -> list:
+    return [{"loc": list(err["loc"]), "msg": err["msg"]} for err in e.errors()]
+
+
+def to_out(doc: dict) -> dict:
+    doc["id"] = str(doc["_id"])
+    del doc["_id"]
+    return doc
+
+
+def share(doc: Optional[dict]) -> Optional[dict]:
+    """A coalesced caller's own copy of a document, so routers can change it."""
+    return dict(doc) if doc is not None else None
+
+
+def share_page(page: dict) -> dict:
+    return {**page, "items": [dict(item) for item in page["items"]]}
+
+
+def select(doc: dict, fields: Optional[Tuple[str, ...]]) -> dict:
+    if fields is None:
+        return dict(doc)
+    return {key: doc[key] for key in (*fields, "id", "version") if key in doc}
+
+
+def _merge_values(field: str, add: list, remove: list) -> dict:
+    """Pipeline-update expression for array `field` doing `$pull` of `remove` then `$addToSet` of `add`:
+    existing order is kept and new values are appended once each."""
+    kept = {
+        "$filter": {
+            "input": {"$ifNull": [f"${field}", []]},
+            "as": "value",
+            "cond": {"$not": [{"$in": ["$$value", {"$literal": remove}]}]},
+        }
+    }
+    added = {
+        "$filter": {
+            "input": {"$literal": list(dict.fromkeys(add))},
+            "as": "value",
+            "cond": {"$not": [{"$in": ["$$value", "$$kept"]}]},
+        }
+    }
+    return {"$let": {"vars": {"kept": kept}, "in": {"$concatArrays": ["$$kept", added]}}}
+
+
+def _merged(values: Optional[list], add: list, remove: list) -> list:
+    """The array `_merge_values` (or `$pull` then `$addToSet`) leaves, worked out from the one before."""
+    kept = [value for value in values or [] if value not in remove]
+    return kept + [value for value in dict.fromkeys(add) if value not in kept]
+
+
+# Every Repository by collection name, so change-stream events can reach its cache.
+REPOSITORIES = {}
+
+
+def invalidate_from_change(change: dict):
+    reads.forget()
+    repository = REPOSITORIES.get(change["ns"]["coll"])
+    if repository is not None and change["operationType"] != "insert":
+        repository.cache.invalidate(str(change["documentKey"]["_id"]))
+
+
+def cache_stats() -> dict:
+    return {name: repository.cache.stats() for name, repository in REPOSITORIES.items()}
+
+
+class Repository:
+    """Async CRUD over one Mongo collection, shared by every `app/crud` module.
+
+    Each write is a single round trip: creates answer from the inserted
+    document itself and updates use `find_one_and_update`. By-id
+    reads go through a per-process TTL cache that writes here invalidate;
+    writes from other workers reach it through `app.db.change_stream`. Reads
+    that do reach Mongo are coalesced (`app.crud.coalesce`): identical ones
+    running at the same time share one query.
+
+    Documents carry a `version` incremented on every update. Every write also
+    stamps the server time (`created_at`, `updated_at`) and a change sequence
+    number (`seq`, from `app.crud.versioning`), and deletes leave a tombstone,
+    which `changes` reads back as a feed. Versions feed the document ETags,
+    the latest sequence number of a collection its list ETags.
+    Writes are also published to `app.crud.events` when no change stream does it.
+    """
+
+    def __init__(self, collection: str, label: str):
+        self.name = collection
+        self.label = label
+        self.cache = cache_from_settings()
+        REPOSITORIES[collection] = self
+
+    @property
+    def collection(self):
+        return MongoDB.get_db()[self.name]
+
+    def _changed(self):
+        """After a write: stop sharing reads that started before it."""
+        reads.forget()
+
+    def object_id(self, doc_id: str) -> ObjectId:
+        if not ObjectId.is_valid(doc_id):
+            raise HTTPException(status_code=400, detail=f"Invalid {self.label} ID format")
+        return ObjectId(doc_id)
+
+    async def create(self, data: dict) -> dict:
+        collection = self.collection
+        try:
+            if not isinstance(data, dict):
+                raise ValueError(f"{self.label} data must be a dictionary")
+
+            doc = serialize_for_mongo(data)
+            doc["version"] = 1
+            at = now()
+            doc.update(stamp(change_seqs()[0], at), created_at=at)
+            result = await collection.insert_one(doc)
+            doc["_id"] = result.inserted_id
+            self._changed()
+            publish_local(self.name, "create", str(doc["_id"]), doc)
+            return to_out(doc)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to create {self.label}: {str(e)}")
+
+    async def list(
+        self,
+        query: Optional[dict] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        sort: str = "_id",
+        descending: bool = False,
+        fields: Optional[Tuple[str, ...]] = None,
+        pipeline: Optional[list] = None,
+        required: Tuple[str, ...] = (),
+    ) -> dict:
+        """One keyset page. `required` fields are kept in a projection because `pipeline` reads them."""
+        collection = self.collection
+        try:
+            key = (self.name, "list", repr((query, limit, cursor, sort, descending, fields, pipeline, required)))
+            return await reads.do(key, lambda: paginate(
+                collection, query, limit, cursor, sort, descending, pipeline, projection(fields, *required)
+            ), share_page)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch {self.name}: {str(e)}")
+
+    async def changes(self, since: Optional[str], limit: int, fields: Optional[Tuple[str, ...]] = None) -> dict:
+        collection = self.collection
+        try:
+            return await read_changes(collection, self.name, since, limit, projection(fields, "seq", "updated_at"))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch {self.name} changes: {str(e)}")
+
+    def stream(
+        self,
+        query: Optional[dict] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        fields: Optional[Tuple[str, ...]] = None,
+        sort: str = "_id",
+        descending: bool = False,
+        pipeline: Optional[list] = None,
+        required: Tuple[str, ...] = (),
+    ):
+        """Every matching document as NDJSON, in `list` order; `required` as for `list`."""
+        return stream_ndjson(
+            self.collection, query, batch_size, projection(fields, *required), sort, descending, pipeline
+        )
+
+    async def get(self, doc_id: str, fields: Optional[Tuple[str, ...]] = None) -> dict:
+        collection = self.collection
+        try:
+            oid = self.object_id(doc_id)
+            key = str(oid)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return select(cached, fields)
+
+            doc = await reads.do((self.name, "get", key, fields), lambda: self._read(oid, fields), share)
+            if doc is None:
+                raise HTTPException(status_code=404, detail=f"{self.label.capitalize()} not found")
+            return doc
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to retrieve {self.label}: {str(e)}")
+
+    async def _read(self, oid: ObjectId, fields: Optional[Tuple[str, ...]]) -> Optional[dict]:
+        token = self.cache.token()
+        doc = await self.collection.find_one({"_id": oid}, projection(fields, "version"))
+        if doc is None:
+            return None
+        doc = to_out(doc)
+        if fields is None:
+            self.cache.set(str(oid), dict(doc), token)
+        return doc
+
+    async def get_many(
+        self,
+        doc_ids: List[str],
+        fields: Optional[Tuple[str, ...]] = None,
+        query: Optional[dict] = None,
+        pipeline: Optional[list] = None,
+        required: Tuple[str, ...] = (),
+    ) -> dict:
+        """Documents by id, in the order asked, with one `$in` read for those not in the cache.
+
+        `query` further filters them and `pipeline` runs on the matches (both
+        bypass the cache). Ids that do not exist, or do not match, are
+        returned as `missing`.
+        """
+        collection = self.collection
+        try:
+            keys = list(dict.fromkeys(str(self.object_id(doc_id)) for doc_id in doc_ids))
+            found = {}
+            if not query and not pipeline:
+                for key in keys:
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        found[key] = select(cached, fields)
+
+            unread = [ObjectId(key) for key in keys if key not in found]
+            if unread:
+                token = self.cache.token()
+                match = {**(query or {}), "_id": {"$in": unread}}
+                fields_projection = projection(fields, "version", *required)
+                if pipeline:
+                    stages = [{"$match": match}, *([{"$project": fields_projection}] if fields_projection else []), *pipeline]
+                    cursor = collection.aggregate(stages)
+                else:
+                    cursor = collection.find(match, fields_projection)
+                async for doc in cursor:
+                    doc = to_out(doc)
+                    if fields is None and not pipeline:
+                        self.cache.set(doc["id"], dict(doc), token)
+                    found[doc["id"]] = doc
+            return {
+                "items": [found[key] for key in keys if key in found],
+                "missing": [key for key in keys if key not in found],
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to retrieve {self.name}: {str(e)}")
+
+    async def version(self, doc_id: str) -> int:
+        """The document's version, from the cache or a version-only projection."""
+        collection = self.collection
+        try:
+            oid = self.object_id(doc_id)
+            cached = self.cache.get(str(oid))
+            if cached is None:
+                cached = await reads.do((self.name, "version", str(oid)), lambda: collection.find_one({"_id": oid}, {"version": 1}))
+            if cached is None:
+                raise HTTPException(status_code=404, detail=f"{self.label.capitalize()} not found")
+            return cached.get("version", 0)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to retrieve {self.label}: {str(e)}")
+
+    async def tokens(self, *related: str) -> dict:
+        return await reads.do((self.name, "tokens", related), lambda: collection_tokens(self.name, *related), share)
+
+    async def update(self, doc_id: str, update_data: dict, match: Optional[dict] = None) -> dict:
+        """`$set` `update_data`; with `match`, only if the document also matches it (404 otherwise)."""
+        return (await self.update_tracked(doc_id, update_data, match))[1]
+
+    async def update_tracked(self, doc_id: str, update_data: dict, match: Optional[dict] = None) -> Tuple[dict, dict]:
+        """`update`, returning the document as the write found it as well: `(before, after)`.
+
+        The write returns the document from before it applied, and the one
+        after is worked out from it, so both belong to this very write.
+        """
+        collection = self.collection
+        try:
+            oid = self.object_id(doc_id)
+            if not isinstance(update_data, dict):
+                raise HTTPException(status_code=400, detail="Invalid update data")
+
+            fields = {**serialize_for_mongo(update_data), **stamp(change_seqs()[0], now())}
+            before = await collection.find_one_and_update(
+                {**(match or {}), "_id": oid},
+                {"$set": fields, "$inc": {"version": 1}},
+                return_document=ReturnDocument.BEFORE,
+            )
+            self.cache.invalidate(str(oid))
+            if before is None:
+                raise HTTPException(status_code=404, detail=f"{self.label.capitalize()} not found")
+            doc = {**before, **fields, "version": (before.get("version") or 0) + 1}
+            self._changed()
+            publish_local(self.name, "update", str(oid), doc)
+            return to_out(before), to_out(doc)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to update {self.label}: {str(e)}")
+
+    async def patch(
+        self,
+        doc_id: str,
+        set_fields: dict,
+        add: Optional[dict] = None,
+        remove: Optional[dict] = None,
+        expected_version: Optional[int] = None,
+    ) -> dict:
+        """Partial update: `$set` only `set_fields`, `$addToSet`/`$pull` the values in `add`/`remove` (array field -> values).
+
+        With `expected_version` the write applies only if the document is still
+        at that version, otherwise 412. Mongo refuses `$addToSet` and `$pull`
+        on the same field in one update, so when both are given the whole patch
+        becomes one pipeline update (see `_merge_values`) that applies fully or
+        not at all.
+        """
+        return (await self.patch_tracked(doc_id, set_fields, add, remove, expected_version))[1]
+
+    async def patch_tracked(
+        self,
+        doc_id: str,
+        set_fields: dict,
+        add: Optional[dict] = None,
+        remove: Optional[dict] = None,
+        expected_version: Optional[int] = None,
+    ) -> Tuple[dict, dict]:
+        """`patch`, returning the document as the write found it as well: `(before, after)`; see `update_tracked`."""
+        collection = self.collection
+        try:
+            oid = self.object_id(doc_id)
+            add = {field: values for field, values in (add or {}).items() if values}
+            remove = {field: values for field, values in (remove or {}).items() if values}
+            both = set(add) & set(remove)
+            for field in both:
+                if set(add[field]) & set(remove[field]):
+                    raise HTTPException(status_code=400, detail=f"Values both added to and removed from {field}")
+
+            if not set_fields and not add and not remove:
+                doc = await self.get(doc_id)
+                if expected_version is not None and doc.get("version", 0) != expected_version:
+                    raise self._version_conflict(doc.get("version", 0))
+                return doc, dict(doc)
+
+            fields = {**serialize_for_mongo(set_fields), **stamp(change_seqs()[0], now())}
+            if both:
+                # Aggregation expressions: literal values are wrapped so a leading "$" is not read as a field path.
+                merged = {field: {"$literal": value} for field, value in fields.items()}
+                for field in set(add) | set(remove):
+                    merged[field] = _merge_values(field, add.get(field, []), remove.get(field, []))
+                merged["version"] = {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+                update = [{"$set": merged}]
+            else:
+                update = {"$set": fields, "$inc": {"version": 1}}
+                if remove:
+                    update["$pull"] = {field: {"$in": values} for field, values in remove.items()}
+                if add:
+                    update["$addToSet"] = {field: {"$each": values} for field, values in add.items()}
+
+            match = {"_id": oid}
+            if expected_version is not None:
+                match["version"] = expected_version if expected_version else {"$in": [0, None]}
+            before = await collection.find_one_and_update(match, update, return_document=ReturnDocument.BEFORE)
+            self.cache.invalidate(str(oid))
+            if before is None:
+                current = await collection.find_one({"_id": oid}, {"version": 1})
+                if current is None:
+                    raise HTTPException(status_code=404, detail=f"{self.label.capitalize()} not found")
+                raise self._version_conflict(current.get("version", 0))
+
+            doc = {**before, **fields, "version": (before.get("version") or 0) + 1}
+            for field in set(add) | set(remove):
+                doc[field] = _merged(before.get(field), add.get(field, []), remove.get(field, []))
+            self._changed()
+            publish_local(self.name, "update", str(oid), doc)
+            return to_out(before), to_out(doc)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to update {self.label}: {str(e)}")
+
+    def _version_conflict(self, current: int) -> HTTPException:
+        return HTTPException(
+            status_code=412,
+            detail=f"{self.label.capitalize()} was modified (now at version {current})",
+            headers={"X-Current-Version": str(current)},
+        )
+
+    async def claim(self, query: dict, update_data: dict, sort: Optional[list] = None) -> Optional[dict]:
+        """Atomically `$set` `update_data` on the first document matching `query` and return it."""
+        doc = await self.collection.find_one_and_update(
+            query,
+            {"$set": {**update_data, **stamp(change_seqs()[0], now())}, "$inc": {"version": 1}},
+            sort=sort or [("_id", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return None
+        self.cache.invalidate(str(doc["_id"]))
+        self._changed()
+        publish_local(self.name, "update", str(doc["_id"]), doc)
+        return to_out(doc)
+
+    async def delete(self, doc_id: str) -> dict:
+        """Delete the document and return it as it was deleted."""
+        collection = self.collection
+        try:
+            oid = self.object_id(doc_id)
+            seq, at = change_seqs()[0], now()
+            doc = await collection.find_one_and_delete({"_id": oid})
+            self.cache.invalidate(str(oid))
+            if doc is None:
+                raise HTTPException(status_code=404, detail=f"{self.label.capitalize()} not found")
+            await record_deletes(self.name, {str(oid): seq}, at)
+            self._changed()
+            publish_local(self.name, "delete", str(oid))
+            return to_out(doc)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to delete {self.label}: {str(e)}")
+
+    async def delete_many(self, query: dict) -> int:
+        """Delete every matching document. Batched deletes pass their ids (`{"_id": {"$in": ids}}`);
+        for any other query the ids are read first, and only those documents are deleted."""
+        collection = self.collection
+        ids = query.get("_id", {}).get("$in") if isinstance(query.get("_id"), dict) else None
+        if ids is None:
+            ids = [doc["_id"] async for doc in collection.find(query, {"_id": 1})]
+        if not ids:
+            return 0
+        seqs, at = change_seqs(len(ids)), now()
+        result = await collection.delete_many({"_id": {"$in": ids}})
+        for doc_id in ids:
+            self.cache.invalidate(str(doc_id))
+        if result.deleted_count:
+            # An id that was already gone gets a tombstone too; consumers ignore deletes of unknown ids.
+            await record_deletes(self.name, {str(doc_id): seq for seq, doc_id in zip(seqs, ids)}, at)
+            self._changed()
+            for doc_id in ids:
+                publish_local(self.name, "delete", str(doc_id))
+        return result.deleted_count
+
+    async def bulk(
+        self,
+        operations: List[BulkOperation],
+        create_model: Type[BaseModel],
+        update_model: Type[BaseModel],
+    ) -> dict:
+        """Apply a batch of create/update/delete operations with unordered bulk writes.
+
+        Every operation is validated on its own; one bad item does not stop
+        the rest. Updates `$set` only the fields they send. Creates go through
+        one `insert_many`, updates and deletes through `_write_each`, whose
+        per-operation results tell which targets did not exist.
+        """
+        collection = self.collection
+        results = [None] * len(operations)
+        inserts, writes = [], []
+        at = now()
+
+        def fail(index, op, status, error, doc_id=None):
+            results[index] = {"index": index, "op": op, "status": status, "id": doc_id, "error": error}
+
+        for index, operation in enumerate(operations):
+            try:
+                if operation.op == "create":
+                    data = create_model.model_validate(operation.data or {}).model_dump()
+                    inserts.append((index, {**serialize_for_mongo(data), "version": 1}))
+                    continue
+                if not operation.id or not ObjectId.is_valid(operation.id):
+                    fail(index, operation.op, 400, f"Invalid {self.label} ID format", operation.id)
+                elif operation.op == "update":
+                    # Only the fields sent: an update of `status` alone must not set the others to None.
+                    data = update_model.model_validate(operation.data or {}).model_dump(exclude_unset=True)
+                    nulled = sorted(key for key, value in data.items() if value is None and create_model.model_fields[key].is_required())
+                    if nulled:
+                        fail(index, operation.op, 422, f"Fields cannot be null: {', '.join(nulled)}", operation.id)
+                        continue
+                    writes.append((index, ObjectId(operation.id), serialize_for_mongo(data)))
+                else:
+                    writes.append((index, ObjectId(operation.id), None))
+            except ValidationError as e:
+                fail(index, operation.op, 422, validation_errors(e), operation.id)
+
+        try:
+            # Sequence numbers for the whole batch: inserts first, then updates and deletes.
+            batch = iter(change_seqs(len(inserts) + len(writes)))
+            for _, doc in inserts:
+                doc.update(stamp(next(batch), at), created_at=at)
+            seqs = {index: next(batch) for index, _, _ in writes}
+            writes = [
+                (index, oid, None if data is None else {**data, **stamp(seqs[index], at)}) for index, oid, data in writes
+            ]
+
+            if inserts:
+                failed = {}
+                try:
+                    await collection.insert_many([doc for _, doc in inserts], ordered=False)
+                except BulkWriteError as e:
+                    failed = {err["index"]: err["errmsg"] for err in e.details.get("writeErrors", [])}
+                for position, (index, doc) in enumerate(inserts):
+                    if position in failed:
+                        fail(index, "create", 400, failed[position])
+                    else:
+                        results[index] = {"index": index, "op": "create", "status": 201, "id": str(doc["_id"])}
+
+            if writes:
+                outcomes = await self._write_each([(oid, data) for _, oid, data in writes])
+                for _, oid, _ in writes:
+                    self.cache.invalidate(str(oid))
+                deleted = []
+                for (index, oid, _), outcome in zip(writes, outcomes):
+                    op = operations[index].op
+                    if outcome is False:
+                        fail(index, op, 404, f"{self.label.capitalize()} not found", str(oid))
+                    elif outcome is not True:
+                        fail(index, op, 400, outcome, str(oid))
+                    else:
+                        results[index] = {"index": index, "op": op, "status": 200, "id": str(oid)}
+                        if op == "delete":
+                            deleted.append(index)
+                await record_deletes(self.name, {results[index]["id"]: seqs[index] for index in deleted}, at)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to run bulk {self.name} operations: {str(e)}")
+
+        if inserts or writes:
+            self._changed()
+            created = dict(inserts)
+            for result in results:
+                if result["status"] < 400:
+                    publish_local(self.name, result["op"], result["id"], created.get(result["index"]))
+
+        summary = {"created": 0, "updated": 0, "deleted": 0, "failed": 0, "results": results}
+        for result in results:
+            if result["status"] >= 400:
+                summary["failed"] += 1
+            else:
+                summary[{"create": "created", "update": "updated", "delete": "deleted"}[result["op"]]] += 1
+        return summary
+
+    async def _write_each(self, writes: List[Tuple[ObjectId, Optional[dict]]]) -> list:
+        """Unordered `$set` (with a version bump) of each `(id, fields)`, or delete where `fields` is None.
+
+        Returns, per write, True when it found its document, False when there
+        was none, or the error message. On MongoDB 8.0+ the writes are one
+        client-level bulk write with per-operation results; on older servers
+        they run as concurrent single-document writes, each reporting its own
+        matched or deleted count.
+        """
+        collection = self.collection
+        if MongoDB.supports_client_bulk_write():
+            namespace = f"{collection.database.name}.{self.name}"
+            requests = [
+                DeleteOne({"_id": oid}, namespace=namespace) if fields is None
+                else UpdateOne({"_id": oid}, {"$set": fields, "$inc": {"version": 1}}, namespace=namespace)
+                for oid, fields in writes
+            ]
+            errors = {}
+            try:
+                result = await collection.database.client.bulk_write(requests, ordered=False, verbose_results=True)
+            except ClientBulkWriteException as e:
+                if e.error:
+                    raise
+                result = e.partial_result
+                errors = {err["idx"]: err["errmsg"] for err in e.write_errors}
+            if result is None:
+                # Nothing was acknowledged; report every write without an error of its own as not applied.
+                return [errors.get(position, "Bulk write was not acknowledged") for position in range(len(writes))]
+            return [
+                errors[position] if position in errors
+                else result.delete_results[position].deleted_count > 0 if fields is None
+                else result.update_results[position].matched_count > 0
+                for position, (_, fields) in enumerate(writes)
+            ]
+
+        async def write(oid: ObjectId, fields: Optional[dict]):
+            try:
+                if fields is None:
+                    return (await collection.delete_one({"_id": oid})).deleted_count > 0
+                return (await collection.update_one({"_id": oid}, {"$set": fields, "$inc": {"version": 1}})).matched_count > 0
+            except WriteError as e:
+                return str(e)
+
+        return await asyncio.gather(*(write(oid, fields) for oid, fields in writes))
@@ -0,0 +1,47 @@
+from typing import AsyncIterator, Optional
+
+import orjson
+from pymongo import ASCENDING, DESCENDING
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _encode(doc: dict) -> bytes:
+    doc["id"] = str(doc.pop("_id"))
+    return orjson.dumps(doc, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+
+async def stream_ndjson(
+    collection,
+    query: Optional[dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    projection: Optional[dict] = None,
+    sort_key: str = "_id",
+    descending: bool = False,
+    pipeline: Optional[list] = None,
+) -> AsyncIterator[bytes]:
+    """Yield the matching documents as NDJSON, one chunk per driver batch.
+
+    Documents are encoded as they arrive from the cursor and never collected,
+    so memory stays bounded by `batch_size` whatever the collection size.
+    They come in the order `paginate` pages through them (`sort_key`, then
+    `_id`), and extra aggregation stages in `pipeline` run on each of them.
+    """
+    direction = DESCENDING if descending else ASCENDING
+    sort = [("_id", direction)] if sort_key == "_id" else [(sort_key, direction), ("_id", direction)]
+    if pipeline:
+        stages = [{"$match": query or {}}, {"$sort": dict(sort)}]
+        if projection:
+            stages.append({"$project": projection})
+        stages.extend(pipeline)
+        cursor = collection.aggregate(stages, batchSize=batch_size)
+    else:
+        cursor = collection.find(query or {}, projection).sort(sort).batch_size(batch_size)
+    lines = []
+    async for doc in cursor:
+        lines.append(_encode(doc))
+        if len(lines) >= batch_size:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
@@ -1,118 +1,75 @@
-from fastapi import HTTPException
-from pydantic import HttpUrl
-from app.db.mongo import MongoDB
-from bson import ObjectId
+from typing import List, Optional, Tuple
 
+from app.crud.pagination import DEFAULT_PAGE_SIZE
+from app.crud.repository import Repository
+from app.crud.streaming import DEFAULT_BATCH_SIZE
+from app.jobs.cascade import create_cascade_job
+from app.models.bulk import BulkOperation
+from app.models.website import WebsiteIn, WebsiteUpdateIn
 
-def serialize_for_mongo(data: dict) -> dict:
-    serialized = {}
-    for key, value in data.items():
-        if isinstance(value, HttpUrl):
-            serialized[key] = str(value)
-        else:
-            serialized[key] = value
-    return serialized
+websites = Repository("websites", "website")
 
 
 async def create_website(website_dict: dict):
-    db = MongoDB.get_db()
-    try:
-        if not isinstance(website_dict, dict):
-            raise ValueError("website_dict must be a dictionary")
-
-        sanitized_data = serialize_for_mongo(website_dict)
-
-        result = await db["websites"].insert_one(sanitized_data)
-        inserted_doc = await db["websites"].find_one({"_id": result.inserted_id})
-        if not inserted_doc:
-            raise ValueError("Failed to retrieve inserted document")
-
-        inserted_doc["id"] = str(inserted_doc["_id"])
-        del inserted_doc["_id"]
-        return inserted_doc
-
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create website: {str(e)}")
-
-
-async def get_websites():
-    db = MongoDB.get_db()
-    try:
-        websites = []
-        async for website in db["websites"].find():
-            website["id"] = str(website["_id"])
-            del website["_id"]
-            websites.append(website)
-        return websites
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch websites: {str(e)}")
-
-
-async def get_website_by_id(website_id: str):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(website_id):
-            raise HTTPException(status_code=400, detail="Invalid website ID format")
-
-        website = await db["websites"].find_one({"_id": ObjectId(website_id)})
-        if not website:
-            raise HTTPException(status_code=404, detail="Website not found")
-
-        website["id"] = str(website["_id"])
-        del website["_id"]
-        return website
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve website: {str(e)}")
+    return await websites.create(website_dict)
 
 
-async def update_website(website_id: str, update_data: dict):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(website_id):
-            raise HTTPException(status_code=400, detail="Invalid website ID format")
+async def get_websites(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    sort: str = "_id",
+    descending: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    return await websites.list({}, limit, cursor, sort, descending, fields)
 
-        if not isinstance(update_data, dict):
-            raise HTTPException(status_code=400, detail="Invalid update data")
 
-        sanitized_data = update_data.copy()
-        if "domain" in sanitized_data and isinstance(sanitized_data["domain"], HttpUrl):
-            sanitized_data["domain"] = str(sanitized_data["domain"])
+def stream_websites(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sort: str = "_id",
+    descending: bool = False,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    return websites.stream({}, batch_size, fields, sort, descending)
 
-        result = await db["websites"].update_one(
-            {"_id": ObjectId(website_id)},
-            {"$set": sanitized_data}
-        )
 
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Website not found")
+async def get_websites_changes(since: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, fields: Optional[Tuple[str, ...]] = None):
+    return await websites.changes(since, limit, fields)
 
-        updated_website = await db["websites"].find_one({"_id": ObjectId(website_id)})
-        updated_website["id"] = str(updated_website["_id"])
-        del updated_website["_id"]
-        return updated_website
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update website: {str(e)}")
 
+async def get_websites_by_ids(website_ids: List[str], fields: Optional[Tuple[str, ...]] = None):
+    return await websites.get_many(website_ids, fields)
 
-async def delete_website(website_id: str):
-    db = MongoDB.get_db()
-    try:
-        if not ObjectId.is_valid(website_id):
-            raise HTTPException(status_code=400, detail="Invalid website ID format")
 
-        result = await db["websites"].delete_one({"_id": ObjectId(website_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Website not found")
+async def get_website_by_id(website_id: str, fields: Optional[Tuple[str, ...]] = None):
+    return await websites.get(website_id, fields)
+
+
+async def get_website_version(website_id: str):
+    return await websites.version(website_id)
+
+
+async def get_websites_tokens():
+    return await websites.tokens()
+
+
+async def update_website(website_id: str, update_data: dict):
+    return await websites.update(website_id, update_data)
+
+
+async def patch_website(website_id: str, fields: dict, expected_version: Optional[int] = None):
+    return await websites.patch(website_id, fields, expected_version=expected_version)
+
+
+async def delete_website(website_id: str):
+    """Delete the website now; its dependent documents are removed by a background job whose id is returned."""
+    await websites.delete(website_id)
+    return await create_cascade_job("websites", [website_id])
 
-        await db["projects"].delete_many({"website_id": website_id})
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete website: {str(e)}")
\ No newline at end of file
+async def bulk_websites(operations: List[BulkOperation]):
+    result = await websites.bulk(operations, WebsiteIn, WebsiteUpdateIn)
+    deleted = [item["id"] for item in result["results"] if item["op"] == "delete" and item["status"] == 200]
+    if deleted:
+        result["job_id"] = await create_cascade_job("websites", deleted)
+    return result
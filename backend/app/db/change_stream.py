@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.config import settings
+from app.crud.changes import decode_token, encode_token, read_changes
+from app.crud.versioning import SEQ_TAGS
+
+logger = logging.getLogger(__name__)
+
+POLL_BATCH = 1000
+
+# Raised by servers that are not part of a replica set.
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40324}
+
+
+class ChangeStreamWatcher:
+    """Follow the database change stream and hand every event to the subscribed handlers.
+
+    This is how one worker learns about writes made by the others. Change
+    streams need a replica set (a single-node one is enough, e.g.
+    `mongod --replSet rs0` + `rs.initiate()`). On a standalone server the
+    watcher polls the `/{collection}/changes` feeds instead, every
+    `events_poll_seconds`, and hands their entries to the same handlers as
+    change events: every worker still sees every worker's writes, its own
+    included, only later. It polls only while `poll_when()` is true (for
+    instance, while the worker has SSE subscribers) and sleeps until `wake`
+    otherwise; in the meantime its read caches rely on their TTL.
+    """
+
+    def __init__(self):
+        self._handlers: List[Callable[[dict], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wanted = asyncio.Event()
+        # When polling was asked for again, so it starts from the writes after that.
+        self._woken_at: Optional[float] = None
+        self.active = False
+
+    def subscribe(self, handler: Callable[[dict], None]):
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def start(
+        self,
+        db,
+        collections: List[str],
+        document_fields: Tuple[str, ...] = (),
+        poll_when: Callable[[], bool] = lambda: True,
+    ):
+        """Watch `collections`; events carry `fullDocument` limited to `document_fields`, if any."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(db, collections, document_fields, poll_when))
+
+    def wake(self):
+        """`poll_when()` may have become true: resume polling if it was paused."""
+        if self._woken_at is None:
+            self._woken_at = time.time()
+        self._wanted.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.active = False
+
+    async def _run(self, db, collections: List[str], document_fields: Tuple[str, ...], poll_when: Callable[[], bool]):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": collections},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+        }}]
+        options = {}
+        if document_fields:
+            pipeline.append({"$project": {
+                "operationType": 1, "ns": 1, "documentKey": 1,
+                **{f"fullDocument.{field}": 1 for field in document_fields},
+            }})
+            options["full_document"] = "updateLookup"
+        resume_token = None
+        while True:
+            try:
+                async with db.watch(pipeline, resume_after=resume_token, **options) as stream:
+                    self.active = True
+                    logger.info("Following change stream on %s", ", ".join(collections))
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._dispatch(change)
+            except OperationFailure as e:
+                self.active = False
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    logger.warning("Change streams unavailable (%s); polling the changes feeds instead", e)
+                    await self._poll(db, collections, document_fields, poll_when)
+                    return
+                logger.warning("Change stream interrupted: %s", e)
+                resume_token = None if e.has_error_label("NonResumableChangeStreamError") else resume_token
+                await asyncio.sleep(1)
+            except PyMongoError as e:
+                self.active = False
+                logger.warning("Change stream interrupted: %s", e)
+                await asyncio.sleep(1)
+
+    async def _poll(self, db, collections: List[str], document_fields: Tuple[str, ...], poll_when: Callable[[], bool]):
+        """Replay the changes feeds as change events, starting from the writes after now.
+
+        A feed's `since` token only moves past settled entries, so newer ones
+        come back on the next poll; the changes already handed on are
+        remembered until the token passes them. While `poll_when()` is false
+        the loop waits for `wake` and then starts over from the writes after
+        the wake, by their sequence numbers' clock; the repositories publish
+        this worker's own writes meanwhile.
+        """
+        fields = {"created_at": 1, "updated_at": 1, "seq": 1, **{field: 1 for field in document_fields}}
+        positions: Optional[Dict[str, int]] = None
+        delivered: Dict[str, Set[Tuple[str, int]]] = {}
+        while True:
+            if not poll_when():
+                self.active = False
+                positions = None
+                self._woken_at = None
+                self._wanted.clear()
+                await self._wanted.wait()
+                continue
+            if positions is None:
+                # Below every sequence number taken from that millisecond on.
+                start = int((self._woken_at or time.time()) * 1000) * SEQ_TAGS - 1
+                positions = {name: start for name in collections}
+                delivered = {name: set() for name in collections}
+                self.active = True
+            for name in collections:
+                try:
+                    more = True
+                    while more:
+                        page = await read_changes(db[name], name, encode_token(positions[name], time.time()), POLL_BATCH, fields)
+                        for item in page["items"]:
+                            if (item["id"], item["seq"]) not in delivered[name]:
+                                delivered[name].add((item["id"], item["seq"]))
+                                self._dispatch(feed_change(name, item))
+                        positions[name] = decode_token(page["since"])["s"]
+                        delivered[name] = {change for change in delivered[name] if change[1] > positions[name]}
+                        more = page["more"]
+                except PyMongoError as e:
+                    logger.warning("Polling the %s changes feed failed: %s", name, e)
+            await asyncio.sleep(settings.events_poll_seconds)
+
+    def _dispatch(self, change: dict):
+        for handler in self._handlers:
+            try:
+                handler(change)
+            except Exception:
+                logger.exception("Change stream handler failed")
+
+
+def feed_change(collection: str, item: dict) -> dict:
+    """A changes-feed entry in the shape of a change stream event."""
+    doc_id = ObjectId(item["id"]) if ObjectId.is_valid(item["id"]) else item["id"]
+    change = {"ns": {"coll": collection}, "documentKey": {"_id": doc_id}}
+    if item["op"] == "delete":
+        return {**change, "operationType": "delete"}
+    doc = item["doc"]
+    created = doc.get("created_at") is not None and doc.get("created_at") == doc.get("updated_at")
+    return {**change, "operationType": "insert" if created else "update", "fullDocument": doc}
+
+
+change_stream = ChangeStreamWatcher()
@@ -0,0 +1,136 @@
+import logging
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Fields `/search` matches, with their relative weights. Mongo allows one text
+# index per collection; the in-process search index uses the same weights.
+SEARCH_WEIGHTS = {
+    "clients": {"name": 10, "keywords": 5, "services": 2, "about_descriptions": 1},
+    "projects": {"name": 10, "keywords": 5, "focus": 2, "about": 1},
+}
+
+
+def text_index(collection: str) -> IndexModel:
+    weights = SEARCH_WEIGHTS[collection]
+    return IndexModel([(field, TEXT) for field in weights], weights=weights, name="search")
+
+
+# Every list filter/sort the API issues is backed by one of these. Compound
+# indexes end in `_id` so keyset pagination within a filter stays an index scan.
+INDEXES = {
+    "clients": [
+        IndexModel([("name", ASCENDING), ("_id", ASCENDING)], name="name_id"),
+        IndexModel([("status", ASCENDING)], name="status"),
+        IndexModel([("keywords", ASCENDING)], name="keywords"),
+        IndexModel([("date", DESCENDING)], name="date"),
+        IndexModel([("last_update_date", DESCENDING)], name="last_update_date"),
+        IndexModel([("seq", ASCENDING)], name="seq"),
+        text_index("clients"),
+    ],
+    "projects": [
+        IndexModel([("client_id", ASCENDING), ("_id", ASCENDING)], name="client_id_id"),
+        IndexModel([("website_id", ASCENDING)], name="website_id"),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="status_id"),
+        IndexModel([("project_type", ASCENDING)], name="project_type"),
+        IndexModel([("name", ASCENDING), ("_id", ASCENDING)], name="name_id"),
+        IndexModel([("keywords", ASCENDING)], name="keywords"),
+        IndexModel([("date", DESCENDING)], name="date"),
+        IndexModel([("last_update_date", DESCENDING)], name="last_update_date"),
+        IndexModel([("seq", ASCENDING)], name="seq"),
+        text_index("projects"),
+    ],
+    "gmb": [
+        IndexModel([("client_id", ASCENDING), ("_id", ASCENDING)], name="client_id_id"),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="status_id"),
+        IndexModel([("name", ASCENDING), ("_id", ASCENDING)], name="name_id"),
+        IndexModel([("date", DESCENDING)], name="date"),
+        IndexModel([("last_update_date", DESCENDING)], name="last_update_date"),
+        IndexModel([("seq", ASCENDING)], name="seq"),
+    ],
+    "websites": [
+        IndexModel([("domain", ASCENDING), ("_id", ASCENDING)], name="domain_id"),
+        IndexModel([("status", ASCENDING)], name="status"),
+        IndexModel([("seq", ASCENDING)], name="seq"),
+    ],
+    # Delete tombstones for the /{collection}/changes feeds. Changing TOMBSTONE_RETENTION_DAYS
+    # later needs a collMod (or dropping this index): createIndexes keeps the existing TTL.
+    "tombstones": [
+        IndexModel([("collection", ASCENDING), ("seq", ASCENDING)], name="collection_seq"),
+        IndexModel(
+            [("deleted_at", ASCENDING)], name="deleted_at_ttl", expireAfterSeconds=settings.tombstone_retention_days * 86400
+        ),
+    ],
+    # app.generation.limits: provider concurrency slots and request token buckets.
+    "generation_limits": [IndexModel([("until", ASCENDING)], name="until_ttl", expireAfterSeconds=0)],
+    # Maintained by app.crud.keywords: one entry per (client, normalized keyword).
+    "keyword_index": [
+        IndexModel([("client_id", ASCENDING), ("keyword", ASCENDING)], name="client_id_keyword", unique=True),
+        IndexModel(
+            [("client_id", ASCENDING), ("project_count", DESCENDING), ("keyword", ASCENDING)],
+            name="client_id_project_count_keyword",
+        ),
+    ],
+}
+
+
+async def ensure_indexes(db):
+    """Create the declared indexes. `createIndexes` is a no-op for indexes that already exist."""
+    for collection, models in INDEXES.items():
+        names = await db[collection].create_indexes(models)
+        logger.info("Indexes ensured on %s: %s", collection, ", ".join(names))
+
+
+async def index_usage(db, collection: str) -> list:
+    stats = await db[collection].aggregate([{"$indexStats": {}}]).to_list(length=None)
+    return [
+        {
+            "name": stat["name"],
+            "key": dict(stat["key"]),
+            "ops": stat["accesses"]["ops"],
+            "since": stat["accesses"]["since"],
+        }
+        for stat in stats
+    ]
+
+
+async def collscan_queries(db, limit: int = 50) -> list:
+    """Summarise profiled operations that ran as a collection scan, grouped by filter shape.
+
+    Only populated while the database profiler is enabled (see `set_profiling`).
+    """
+    namespaces = [f"{db.name}.{collection}" for collection in INDEXES]
+    pipeline = [
+        {"$match": {"planSummary": "COLLSCAN", "ns": {"$in": namespaces}}},
+        {"$group": {
+            "_id": {
+                "ns": "$ns",
+                "op": "$op",
+                "filter_keys": {"$map": {
+                    "input": {"$objectToArray": {"$ifNull": ["$command.filter", {"$ifNull": ["$command.q", {}]}]}},
+                    "in": "$$this.k",
+                }},
+            },
+            "count": {"$sum": 1},
+            "docs_examined": {"$sum": "$docsExamined"},
+            "max_millis": {"$max": "$millis"},
+            "last_seen": {"$max": "$ts"},
+        }},
+        {"$sort": {"count": -1}},
+        {"$limit": limit},
+    ]
+    results = await db["system.profile"].aggregate(pipeline).to_list(length=limit)
+    return [{**result.pop("_id"), **result} for result in results]
+
+
+async def profiling_status(db) -> dict:
+    status = await db.command("profile", -1)
+    return {"level": status.get("was", 0), "slowms": status.get("slowms")}
+
+
+async def set_profiling(db, level: int, slowms: int) -> dict:
+    await db.command("profile", level, slowms=slowms)
+    return await profiling_status(db)
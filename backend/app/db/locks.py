@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.db.mongo import MongoDB
+
+# One document per named lease: {_id: name, until}.
+LOCKS = "locks"
+
+
+async def acquire_lease(name: str, seconds: float, holder: Optional[str] = None) -> bool:
+    """Take a named lease for `seconds` so only one worker runs a periodic task.
+
+    With a `holder`, the lease records it and that holder can also renew a
+    lease it still has.
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        free = {"until": {"$lt": now}}
+        # Matches only an expired lease (or, with a holder, its own); otherwise the upsert collides with the live one.
+        await MongoDB.get_db()[LOCKS].update_one(
+            {"_id": name, **(free if holder is None else {"$or": [free, {"holder": holder}]})},
+            {"$set": {"until": now + timedelta(seconds=seconds), "holder": holder}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        # Another worker holds an unexpired lease.
+        return False
+
+
+async def release_lease(name: str, holder: str):
+    """Give up `holder`'s lease before it expires, so another worker can take it at once."""
+    await MongoDB.get_db()[LOCKS].delete_one({"_id": name, "holder": holder})
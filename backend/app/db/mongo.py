@@ -1,41 +1,101 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from os import getenv
 import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.metrics import mongo_listeners, pool_metrics
+from app.db.indexes import ensure_indexes
+
+logger = logging.getLogger(__name__)
 
 class MongoDB:
+    """Process-wide Motor client.
+
+    The client constructor is lazy, so `connect` pings the server (retrying)
+    to force server selection and the handshake, then opens
+    `mongo_warm_connections` pooled connections before the app takes traffic.
+    """
     _client = None
     _db = None
+    ready = False
+    # From the server's `hello` at connect; MongoDB 8.0 (wire version 25) added client-level bulk writes.
+    max_wire_version = 0
 
     @classmethod
     async def connect(cls):
         if cls._client is None:
-            mongo_uri = getenv("MONGO_URI")
-            if not mongo_uri:
-                raise ValueError("MONGO_URI environment variable is not set")
-            retries = 5
+            retries = settings.mongo_connect_retries
             for attempt in range(retries):
+                client = AsyncIOMotorClient(
+                    settings.mongo_uri, event_listeners=mongo_listeners(), **settings.mongo_client_options()
+                )
                 try:
-                    cls._client = AsyncIOMotorClient(mongo_uri)
-                    cls._db = cls._client["clients_db"]
-                    print("Successfully connected to MongoDB")
-                    return
+                    hello = await client.admin.command("hello")
+                    break
                 except Exception as e:
-                    print(f"Error connecting to MongoDB (attempt {attempt + 1}/{retries}): {type(e).__name__}: {str(e)}")
+                    client.close()
+                    logger.warning("Error connecting to MongoDB (attempt %s/%s): %s: %s", attempt + 1, retries, type(e).__name__, e)
                     if attempt < retries - 1:
-                        await asyncio.sleep(2)
-            raise Exception("Failed to connect to MongoDB after multiple attempts")
+                        await asyncio.sleep(settings.mongo_connect_retry_delay * 2 ** attempt)
+            else:
+                raise Exception("Failed to connect to MongoDB after multiple attempts")
+            cls.max_wire_version = hello.get("maxWireVersion", 0)
+            cls._client = client
+            cls._db = client[settings.mongo_db]
+            try:
+                # Once, after the connection is up: an index that cannot be built is not a connection
+                # problem, and retrying would only repeat it.
+                await ensure_indexes(cls._db)
+                await cls.warm_up()
+            except Exception:
+                await cls.close()
+                raise
+            logger.info("Successfully connected to MongoDB")
+        cls.ready = True
+
+    @classmethod
+    async def warm_up(cls):
+        """Open connections up front; concurrent pings each check out a different one."""
+        count = settings.mongo_warm_connections
+        if count is None:
+            count = settings.mongo_min_pool_size
+        count = min(count, settings.mongo_max_pool_size)
+        if count > 0:
+            await asyncio.gather(*(cls._client.admin.command("ping") for _ in range(count)))
+
+    @classmethod
+    async def health(cls) -> dict:
+        """Ping with `readiness_timeout_ms` and report the pool; `ok` is what /readyz answers with."""
+        report = {"ok": False, "connected": cls.ready, "pool": {**pool_metrics.stats(), "max_size": settings.mongo_max_pool_size}}
+        if not cls.ready or cls._client is None:
+            return report
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(cls._client.admin.command("ping"), settings.readiness_timeout_ms / 1000)
+        except Exception as e:
+            report["error"] = f"{type(e).__name__}: {str(e)}"
+            return report
+        report["ping_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        report["ok"] = True
+        return report
 
     @classmethod
     async def close(cls):
+        cls.ready = False
         if cls._client:
             cls._client.close()
             cls._client = None
             cls._db = None
-            print("MongoDB connection closed")
+            logger.info("MongoDB connection closed")
+
+    @classmethod
+    def supports_client_bulk_write(cls) -> bool:
+        return cls.max_wire_version >= 25
 
     @classmethod
     def get_db(cls):
         if cls._db is None:
-            print("Error: MongoDB connection is not established")
+            logger.error("MongoDB connection is not established")
             raise Exception("MongoDB connection is not established")
-        return cls._db
\ No newline at end of file
+        return cls._db
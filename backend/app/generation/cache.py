@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.generation.providers import Generation
+
+
+def generation_key(provider: str, model: str, prompt: str, params: Optional[dict] = None) -> str:
+    """Content address of one generation request."""
+    raw = json.dumps(
+        {"provider": provider, "model": model, "prompt": prompt, "params": params or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class GenerationCache:
+    """On-disk cache of provider responses keyed by `generation_key`.
+
+    Each entry is one JSON file under `directory`, shared by every worker
+    process: a lookup reads the file for its key, whichever process wrote it.
+    Reads touch the file, so its modification time is its last use. The size
+    limit is enforced from the directory itself: a scan removes the least
+    recently used files until the total is under `max_bytes`. Each process
+    scans at startup and again after writing another `PRUNE_FRACTION` of
+    `max_bytes`, so N workers overshoot by at most N such slices between
+    scans. File I/O runs in a thread so the event loop is not blocked.
+    """
+
+    PRUNE_FRACTION = 0.05
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # As of this process's last scan, plus what it wrote since.
+        self._files = 0
+        self._bytes = 0
+        self._unscanned = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            self._files, self._bytes, self.evictions = self._prune()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _prune(self) -> Tuple[int, int, int]:
+        """Scan the directory and remove least recently used files over `max_bytes`; returns (files, bytes, removed)."""
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        # Removed by another process's scan.
+                        continue
+                    found.append((stat.st_mtime, path, stat.st_size))
+        total = sum(size for _, _, size in found)
+        removed = 0
+        for _, path, size in sorted(found):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            removed += 1
+        return len(found) - removed, total, removed
+
+    def _read(self, key: str) -> Optional[Generation]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = json.loads(f.read())
+            os.utime(path)
+            return Generation(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write(self, key: str, generation: Generation) -> int:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        raw = json.dumps(asdict(generation), ensure_ascii=False).encode()
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+        return len(raw)
+
+    async def get(self, key: str) -> Optional[Generation]:
+        generation = await asyncio.to_thread(self._read, key) if self.enabled else None
+        if generation is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return generation
+
+    async def set(self, key: str, generation: Generation):
+        if not self.enabled:
+            return
+        size = await asyncio.to_thread(self._write, key, generation)
+        self._files += 1
+        self._bytes += size
+        self._unscanned += size
+        self.writes += 1
+        if self._unscanned >= self.max_bytes * self.PRUNE_FRACTION:
+            self._unscanned = 0
+            self._files, self._bytes, removed = await asyncio.to_thread(self._prune)
+            self.evictions += removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "entries": self._files,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+def generation_cache_from_settings() -> GenerationCache:
+    return GenerationCache(settings.generation_cache_dir, int(settings.generation_cache_max_mb * 1024 * 1024))
@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.db.mongo import MongoDB
+
+# Provider slot and token bucket documents, removed by a TTL index once `until` has passed.
+LIMITS = "generation_limits"
+
+# Waiting for a slot another process holds: the first retry, doubled up to the cap, and never past
+# the earliest slot lease's expiry. A slot released in this process wakes its waiters at once.
+BACKOFF_START_SECONDS = 0.05
+BACKOFF_MAX_SECONDS = 5
+
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ProviderLimiter:
+    """Concurrency cap plus requests-per-minute limit for one provider, shared by every process through Mongo.
+
+    A running call holds one of `concurrency` slot documents, taken the way
+    `app.db.locks.acquire_lease` takes a lease; a slot left by a process
+    that died frees itself after `hold_seconds`. Requests draw from a token
+    bucket of `burst` tokens (the concurrency by default) refilled at the
+    configured rate; the bucket is one document, refilled and drawn from in
+    a single update pipeline, so in any minute at most `burst` plus the rate
+    go through. Both limits apply to the whole deployment, not to each
+    worker: N workers do not make N times the configured rate.
+    """
+
+    def __init__(
+        self, name: str, concurrency: int, requests_per_minute: float, hold_seconds: float = 150, burst: Optional[int] = None
+    ):
+        self.name = name
+        self.concurrency = max(concurrency, 1)
+        # At least one request a minute, so a fractional rate cannot block forever.
+        self.requests_per_minute = max(requests_per_minute, 1)
+        self.hold_seconds = hold_seconds
+        self.burst = max(burst or self.concurrency, 1)
+        self._released = asyncio.Event()
+
+    @asynccontextmanager
+    async def slot(self):
+        held = await self._take_slot()
+        try:
+            await self._take_request()
+            yield
+        finally:
+            await MongoDB.get_db()[LIMITS].delete_one(held)
+            # Wake this process's waiters; the next release gets a fresh event.
+            self._released.set()
+            self._released = asyncio.Event()
+
+    def _slot_ids(self) -> list:
+        return [f"{self.name}:slot:{number}" for number in range(self.concurrency)]
+
+    async def _take_slot(self) -> dict:
+        collection = MongoDB.get_db()[LIMITS]
+        holder = uuid.uuid4().hex
+        delay = BACKOFF_START_SECONDS
+        while True:
+            released = self._released
+            for slot in self._slot_ids():
+                try:
+                    # Matches only a free (expired) slot; otherwise the upsert collides with the held one.
+                    await collection.update_one(
+                        {"_id": slot, "until": {"$lt": now()}},
+                        {"$set": {"holder": holder, "until": now() + timedelta(seconds=self.hold_seconds)}},
+                        upsert=True,
+                    )
+                    return {"_id": slot, "holder": holder}
+                except DuplicateKeyError:
+                    continue
+            earliest = await collection.find_one(
+                {"_id": {"$in": self._slot_ids()}}, {"until": 1}, sort=[("until", ASCENDING)]
+            )
+            wait = delay
+            if earliest is not None:
+                wait = min(wait, max((earliest["until"] - now()).total_seconds(), 0))
+            try:
+                await asyncio.wait_for(released.wait(), wait)
+            except asyncio.TimeoutError:
+                delay = min(delay * 2, BACKOFF_MAX_SECONDS)
+
+    async def _take_request(self):
+        """Take a token from the bucket, waiting as long as the refill of the missing fraction takes."""
+        collection = MongoDB.get_db()[LIMITS]
+        rate = self.requests_per_minute / 60
+        full_after = timedelta(seconds=self.burst / rate)
+        while True:
+            at = now()
+            # Refill for the time since the last refill (never negative, should another process's clock
+            # be ahead), capped at `burst`, then take a token if a whole one is there.
+            bucket = await collection.find_one_and_update(
+                {"_id": f"{self.name}:bucket"},
+                [
+                    {"$set": {
+                        "tokens": {"$min": [self.burst, {"$add": [
+                            {"$ifNull": ["$tokens", self.burst]},
+                            {"$multiply": [
+                                {"$divide": [{"$max": [0, {"$subtract": [at, {"$ifNull": ["$last_refill", at]}]}]}, 1000]},
+                                rate,
+                            ]},
+                        ]}]},
+                        "last_refill": {"$max": [at, {"$ifNull": ["$last_refill", at]}]},
+                    }},
+                    {"$set": {
+                        "taken": {"$gte": ["$tokens", 1]},
+                        "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                        # An idle bucket is full again by then; the TTL index removes it, which reads as full.
+                        "until": at + full_after,
+                    }},
+                ],
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            if bucket["taken"]:
+                return
+            await asyncio.sleep((1 - bucket["tokens"]) / rate)
@@ -0,0 +1,58 @@
+import json
+import re
+
+from app.core.config import settings
+from app.crud.cache import TTLCache
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+# Project fields that feed the prompt; edits to any other field reuse the compiled prompt.
+PROJECT_PROMPT_FIELDS = ("name", "project_type", "focus", "about", "length", "keywords")
+
+compiled_prompts = TTLCache(maxsize=settings.prompt_cache_size, ttl=float("inf"))
+
+
+def prompt_values(client: dict, project: dict) -> dict:
+    """Values for the placeholders a client prompt must contain (see `validatePrompt` in the frontend)."""
+    is_blog = "blog" in (project.get("project_type") or "").lower()
+    return {
+        "article_topic": project.get("name", ""),
+        "focus": project.get("focus", ""),
+        "about_client": client.get("about_descriptions", ""),
+        "about_page": project.get("about", ""),
+        "copy_tone": client.get("tone_for_blogs" if is_blog else "tone_for_articles", ""),
+        "article_json": json.dumps({
+            "title": project.get("name", ""),
+            "type": project.get("project_type", ""),
+            "length": project.get("length"),
+            "keywords": project.get("keywords") or [],
+        }, ensure_ascii=False),
+        "content_json": json.dumps({
+            "client": client.get("name", ""),
+            "services": client.get("services", ""),
+            "information": client.get("client_related_information", ""),
+            "keywords": client.get("keywords") or [],
+        }, ensure_ascii=False),
+    }
+
+
+def build_prompt(client: dict, project: dict, provider: str) -> str:
+    """Fill the client's prompt template for `provider`; unknown `{...}` spans are left as written."""
+    template = client.get(f"{provider}_prompt") or client.get("chatgpt_prompt") or ""
+    values = prompt_values(client, project)
+    return PLACEHOLDER.sub(lambda match: str(values.get(match.group(1), match.group(0))), template)
+
+
+def compile_prompt(client: dict, project: dict, provider: str) -> str:
+    """`build_prompt`, memoized per client version and the project's prompt inputs."""
+    key = (
+        client.get("id"),
+        client.get("version"),
+        provider,
+        tuple(tuple(value) if isinstance(value, list) else value for value in map(project.get, PROJECT_PROMPT_FIELDS)),
+    )
+    prompt = compiled_prompts.get(key)
+    if prompt is None:
+        prompt = build_prompt(client, project, provider)
+        compiled_prompts.set(key, prompt)
+    return prompt
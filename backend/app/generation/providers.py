@@ -0,0 +1,113 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+class ProviderError(Exception):
+    """A generation call failed. `retryable` tells the scheduler whether trying again can help."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass
+class Generation:
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class Provider(ABC):
+    """Base class for text generation backends; subclasses implement `generate`.
+
+    `timeout` bounds one `generate` call; the scheduler holds a concurrency
+    slot for about that long at most.
+    """
+
+    def __init__(
+        self, name: str, model: str, concurrency: int = 2, requests_per_minute: float = 60, timeout: float = 120
+    ):
+        self.name = name
+        self.model = model
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.timeout = timeout
+
+    @abstractmethod
+    async def generate(self, prompt: str, params: Optional[dict] = None) -> Generation:
+        """Generate text for `prompt`; raise `ProviderError` on failure."""
+
+    async def close(self):
+        pass
+
+
+class OpenAICompatibleProvider(Provider):
+    """Chat-completions API as served by OpenAI, DeepSeek, or a local stub server."""
+
+    def __init__(self, name: str, base_url: str, api_key: str, model: str, timeout: float = 120, **limits):
+        super().__init__(name, model, timeout=timeout, **limits)
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+        )
+
+    async def generate(self, prompt: str, params: Optional[dict] = None) -> Generation:
+        body = {"model": self.model, "messages": [{"role": "user", "content": prompt}], **(params or {})}
+        try:
+            response = await self._client.post("/chat/completions", json=body)
+        except httpx.TransportError as e:
+            raise ProviderError(f"{self.name}: {type(e).__name__}: {e}", retryable=True)
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise ProviderError(f"{self.name}: HTTP {response.status_code}", retryable=True)
+        if response.status_code >= 400:
+            raise ProviderError(f"{self.name}: HTTP {response.status_code}: {response.text[:500]}")
+
+        try:
+            data = response.json()
+            text = data["choices"][0]["message"]["content"]
+            usage = data.get("usage") or {}
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+            raise ProviderError(f"{self.name}: unexpected response shape")
+        return Generation(
+            text=text,
+            model=data.get("model", self.model),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+    async def close(self):
+        await self._client.aclose()
+
+
+# name -> (default base URL, default model). Any provider is enabled by setting <NAME>_API_KEY;
+# <NAME>_BASE_URL points it at another OpenAI-compatible server, such as a local stub. Each one
+# has a `ProviderSettings` field of the same name in `app.core.config.Settings`.
+KNOWN_PROVIDERS = {
+    "chatgpt": ("https://api.openai.com/v1", "gpt-4o-mini"),
+    "deepseek": ("https://api.deepseek.com/v1", "deepseek-chat"),
+}
+
+
+def providers_from_settings() -> Dict[str, Provider]:
+    providers = {}
+    for name, (base_url, model) in KNOWN_PROVIDERS.items():
+        configured = getattr(settings, name)
+        if not configured.api_key:
+            continue
+        providers[name] = OpenAICompatibleProvider(
+            name,
+            configured.base_url or base_url,
+            configured.api_key,
+            configured.model or model,
+            concurrency=configured.concurrency,
+            requests_per_minute=configured.rpm,
+        )
+    return providers
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.crud.clients import get_client_by_id
+from app.crud.projects import claim_project, update_claimed_project
+from app.generation.cache import GenerationCache, generation_cache_from_settings, generation_key
+from app.generation.limits import ProviderLimiter
+from app.generation.prompt import compile_prompt, compiled_prompts
+from app.generation.providers import Generation, Provider, ProviderError, providers_from_settings
+
+logger = logging.getLogger(__name__)
+
+# How long past its provider timeout a call may keep its concurrency slot.
+SLOT_MARGIN_SECONDS = 30
+
+
+class GenerationScheduler:
+    """Run queued projects through their provider on a pool of in-process workers.
+
+    Workers claim projects atomically in Mongo, so several app processes can
+    share one queue. Each provider has its own concurrency cap and request
+    rate, counted in Mongo across all of those processes; retryable provider
+    errors are retried with jittered exponential backoff before the project
+    is marked "failed", and any other error fails it at once. Responses are
+    stored in a content-addressed `GenerationCache`, so an identical request
+    is answered from disk without calling the provider.
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Provider],
+        workers: int = 4,
+        poll_interval: float = 5,
+        lease_seconds: float = 600,
+        max_attempts: int = 4,
+        backoff_base: float = 2,
+        cache: Optional[GenerationCache] = None,
+    ):
+        self.providers = providers
+        self.cache = cache
+        self.limiters = {
+            name: ProviderLimiter(name, provider.concurrency, provider.requests_per_minute, provider.timeout + SLOT_MARGIN_SECONDS)
+            for name, provider in providers.items()
+        }
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.stats = {"claimed": 0, "finished": 0, "failed": 0, "retries": 0, "lost_claims": 0, "cached": 0}
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+        self._stopping = False
+
+    @classmethod
+    def from_settings(cls) -> "GenerationScheduler":
+        return cls(
+            providers_from_settings(),
+            workers=settings.generation_workers,
+            poll_interval=settings.generation_poll_seconds,
+            lease_seconds=settings.generation_lease_seconds,
+            max_attempts=settings.generation_max_attempts,
+            cache=generation_cache_from_settings(),
+        )
+
+    def start(self):
+        if not self.providers:
+            logger.info("No generation provider configured; scheduler not started")
+            return
+        for number in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._work(number)))
+        logger.info("Generation scheduler started: %s workers, providers %s", self.workers, ", ".join(self.providers))
+
+    def pause(self):
+        """Stop claiming new projects; generations already running carry on."""
+        self._stopping = True
+        self.notify()
+
+    async def stop(self, grace: float = 0):
+        """Let running generations finish for up to `grace` seconds, then cancel them.
+
+        A cancelled project keeps its claim until the lease expires and is
+        then picked up again by another worker.
+        """
+        self.pause()
+        if self._tasks and grace > 0:
+            await asyncio.wait(self._tasks, timeout=grace)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for provider in self.providers.values():
+            await provider.close()
+
+    def notify(self):
+        """Wake idle workers now instead of at their next poll."""
+        self._wakeup.set()
+
+    async def _work(self, number: int):
+        while not self._stopping:
+            try:
+                claim_token = uuid.uuid4().hex
+                project = await claim_project(list(self.providers), settings.generation_default_provider, self.lease_seconds, claim_token)
+                if project is None:
+                    if self._stopping:
+                        return
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                self.stats["claimed"] += 1
+                try:
+                    await self._run(project, claim_token)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Not a ProviderError (a bug, a malformed result): fail the project now rather than
+                    # leave it "processing" until its lease expires and it is run into the same error again.
+                    logger.exception("Generation of project %s failed", project["id"])
+                    await self._fail(project, claim_token, f"{type(e).__name__}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Generation worker %s failed", number)
+                await asyncio.sleep(self.poll_interval)
+
+    async def _run(self, project: dict, claim_token: str):
+        provider_name = project.get("provider") or settings.generation_default_provider
+        provider = self.providers[provider_name]
+        try:
+            client = await get_client_by_id(project["client_id"])
+        except HTTPException as e:
+            await self._fail(project, claim_token, f"Client {project['client_id']}: {e.detail}")
+            return
+
+        prompt = compile_prompt(client, project, provider_name)
+        key = generation_key(provider_name, provider.model, prompt)
+        if self.cache is not None:
+            generation = await self.cache.get(key)
+            if generation is not None:
+                self.stats["cached"] += 1
+                await self._finish(project, claim_token, generation, 0)
+                return
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self.limiters[provider_name].slot():
+                    generation = await provider.generate(prompt)
+                if self.cache is not None:
+                    await self.cache.set(key, generation)
+                await self._finish(project, claim_token, generation, attempt)
+                return
+            except ProviderError as e:
+                if not e.retryable or attempt == self.max_attempts:
+                    await self._fail(project, claim_token, str(e), attempt)
+                    return
+                self.stats["retries"] += 1
+                delay = self.backoff_base * 2 ** (attempt - 1) * (0.5 + random.random())
+                logger.warning("Project %s attempt %s failed (%s); retrying in %.1fs", project["id"], attempt, e, delay)
+                await asyncio.sleep(delay)
+
+    async def _write(self, project: dict, claim_token: str, update_data: dict) -> bool:
+        update_data["last_update_date"] = datetime.now(timezone.utc).isoformat()
+        update_data["claim_token"] = None
+        try:
+            await update_claimed_project(project["id"], claim_token, update_data)
+            return True
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            # The lease expired and another worker re-claimed the project, or it was deleted.
+            self.stats["lost_claims"] += 1
+            logger.warning("Project %s is no longer claimed by this worker; result dropped", project["id"])
+            return False
+
+    async def _finish(self, project: dict, claim_token: str, generation: Generation, attempts: int):
+        if await self._write(project, claim_token, {
+            "status": "finished",
+            "article": generation.text,
+            "errors": None,
+            "attempts": attempts,
+            "generation": {
+                "model": generation.model,
+                "prompt_tokens": generation.prompt_tokens,
+                "completion_tokens": generation.completion_tokens,
+            },
+        }):
+            self.stats["finished"] += 1
+
+    async def _fail(self, project: dict, claim_token: str, error: str, attempts: int = 0):
+        if await self._write(project, claim_token, {"status": "failed", "errors": error, "attempts": attempts}):
+            self.stats["failed"] += 1
+
+
+scheduler: Optional[GenerationScheduler] = None
+
+
+def start_scheduler():
+    global scheduler
+    scheduler = GenerationScheduler.from_settings()
+    scheduler.start()
+
+
+def pause_scheduler():
+    if scheduler is not None:
+        scheduler.pause()
+
+
+async def stop_scheduler(grace: float = 0):
+    global scheduler
+    if scheduler is not None:
+        await scheduler.stop(grace)
+        scheduler = None
+
+
+def notify_scheduler():
+    if scheduler is not None:
+        scheduler.notify()
+
+
+def scheduler_stats() -> dict:
+    if scheduler is None or not scheduler.providers:
+        return {"running": False}
+    return {
+        "running": bool(scheduler._tasks),
+        "workers": scheduler.workers,
+        "providers": {
+            name: {"model": provider.model, "concurrency": provider.concurrency, "rpm": provider.requests_per_minute}
+            for name, provider in scheduler.providers.items()
+        },
+        **scheduler.stats,
+        "cache": scheduler.cache.stats() if scheduler.cache is not None else None,
+        "prompts": compiled_prompts.stats(),
+    }
+
+
+def generation_cache_stats() -> dict:
+    stats = {"prompts": compiled_prompts.stats()}
+    if scheduler is not None and scheduler.cache is not None:
+        stats["generation"] = scheduler.cache.stats()
+    return stats
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.crud.changes import TOMBSTONES
+from app.crud.keywords import reindex_clients
+from app.crud.repository import REPOSITORIES
+from app.db.locks import acquire_lease
+from app.db.mongo import MongoDB
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = settings.cascade_batch_size
+SWEEP_INTERVAL = settings.orphan_sweep_interval_seconds
+# A running job's claim expires this long after its last batch; then another worker takes it over.
+JOB_LEASE_SECONDS = settings.cascade_job_lease_seconds
+
+# Children removed with their parent: parent collection -> [(child collection, reference field)].
+CASCADES = {
+    "clients": [("projects", "client_id"), ("gmb", "client_id")],
+    "websites": [("projects", "website_id")],
+}
+
+JOBS = "jobs"
+
+# Strong references to running tasks; asyncio only keeps weak ones.
+_tasks = set()
+
+
+class LeaseLost(Exception):
+    """Another worker took over the job after this one's lease expired."""
+
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def job_out(job: dict) -> dict:
+    job["id"] = str(job.pop("_id"))
+    return job
+
+
+async def create_cascade_job(parent: str, parent_ids: List[str]) -> str:
+    """Record a cascade delete for `parent_ids` and start it in the background."""
+    job = {
+        "type": "cascade_delete",
+        "parent": parent,
+        "parent_ids": parent_ids,
+        "status": "queued",
+        "progress": {child: 0 for child, _ in CASCADES[parent]},
+        "created_at": now(),
+        "finished_at": None,
+        "error": None,
+    }
+    result = await MongoDB.get_db()[JOBS].insert_one(job)
+    job_id = str(result.inserted_id)
+    spawn(run_cascade_job(job_id))
+    return job_id
+
+
+def spawn(coro):
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def delete_in_batches(collection: str, query: dict, on_batch=None) -> int:
+    """Delete everything matching `query` `BATCH_SIZE` documents at a time."""
+    db = MongoDB.get_db()
+    repository = REPOSITORIES[collection]
+    deleted = 0
+    while True:
+        docs = await db[collection].find(query, {"_id": 1, "client_id": 1}).limit(BATCH_SIZE).to_list(length=BATCH_SIZE)
+        if not docs:
+            return deleted
+        deleted += await repository.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        if collection == "projects":
+            await reindex_clients(doc.get("client_id") for doc in docs)
+        if on_batch is not None:
+            await on_batch(deleted)
+        # Let request handlers run between batches.
+        await asyncio.sleep(0)
+
+
+def claimable() -> dict:
+    """Jobs no worker is running: queued, or running under a lease that expired (its worker died)."""
+    return {"$or": [
+        {"status": "queued"},
+        {"status": "running", "lease_until": {"$lt": now()}},
+        # Started before jobs had leases.
+        {"status": "running", "lease_until": None},
+    ]}
+
+
+async def run_cascade_job(job_id: str):
+    """Claim the job and run it; does nothing when another worker holds it.
+
+    The claim records an owner token and a lease that every batch renews.
+    Progress and the final status are written only while the token still
+    matches, so a worker that lost its lease stops instead of racing the
+    one that took over (the deletes themselves are idempotent).
+    """
+    jobs = MongoDB.get_db()[JOBS]
+    owner = uuid.uuid4().hex
+    job = await jobs.find_one_and_update(
+        {"_id": ObjectId(job_id), **claimable()},
+        {"$set": {
+            "status": "running",
+            "owner": owner,
+            "lease_until": now() + timedelta(seconds=JOB_LEASE_SECONDS),
+            "started_at": now(),
+        }},
+        return_document=ReturnDocument.AFTER,
+    )
+    if job is None:
+        return
+    held = {"_id": job["_id"], "owner": owner}
+
+    try:
+        for child, field in CASCADES[job["parent"]]:
+            async def report(deleted, child=child):
+                result = await jobs.update_one(held, {"$set": {
+                    f"progress.{child}": deleted,
+                    "lease_until": now() + timedelta(seconds=JOB_LEASE_SECONDS),
+                }})
+                if result.matched_count == 0:
+                    raise LeaseLost()
+
+            await delete_in_batches(child, {field: {"$in": job["parent_ids"]}}, report)
+        await jobs.update_one(held, {"$set": {"status": "done", "finished_at": now()}})
+    except asyncio.CancelledError:
+        # Left as "running"; once the lease expires the worker running the background jobs picks it up.
+        raise
+    except LeaseLost:
+        logger.warning("Cascade delete job %s was taken over by another worker", job_id)
+    except Exception as e:
+        logger.exception("Cascade delete job %s failed", job_id)
+        await jobs.update_one(held, {"$set": {"status": "failed", "error": str(e), "finished_at": now()}})
+
+
+async def get_job(job_id: str):
+    if not ObjectId.is_valid(job_id):
+        return None
+    job = await MongoDB.get_db()[JOBS].find_one({"_id": ObjectId(job_id)})
+    return job_out(job) if job else None
+
+
+async def resume_jobs():
+    """Restart cascade jobs interrupted by a shutdown or crash; jobs another worker holds are left to it."""
+    async for job in MongoDB.get_db()[JOBS].find(claimable(), {"_id": 1}):
+        spawn(run_cascade_job(str(job["_id"])))
+
+
+async def resume_periodically():
+    """Take over jobs whose worker died while this one kept running."""
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS)
+        try:
+            await resume_jobs()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Resuming cascade jobs failed")
+
+
+async def sweep_orphans() -> dict:
+    """Delete children of parents that were deleted, e.g. left behind by an interrupted cascade.
+
+    Only parents with a delete tombstone count: a child whose reference
+    never resolved (references are not checked on write) is not an orphan
+    of a delete and is left alone.
+    """
+    db = MongoDB.get_db()
+    removed = {}
+    for parent, children in CASCADES.items():
+        deleted = await db[TOMBSTONES].distinct("doc_id", {"collection": parent})
+        for child, field in children:
+            count = 0
+            for start in range(0, len(deleted), BATCH_SIZE):
+                count += await delete_in_batches(child, {field: {"$in": deleted[start:start + BATCH_SIZE]}})
+            removed[f"{child}.{field}"] = count
+    logger.info("Orphan sweep removed %s", removed)
+    return removed
+
+
+async def sweep_periodically():
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        try:
+            if await acquire_lease("orphan_sweep", SWEEP_INTERVAL):
+                await sweep_orphans()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Orphan sweep failed")
+
+
+async def stop_jobs():
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
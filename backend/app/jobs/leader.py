@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import uuid
+from typing import Optional, Set
+
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.db.locks import acquire_lease, release_lease
+from app.generation.scheduler import start_scheduler, stop_scheduler
+from app.jobs.cascade import resume_jobs, resume_periodically, sweep_periodically
+
+logger = logging.getLogger(__name__)
+
+LEASE = "background_jobs"
+# This worker's claim on the lease; a new one per process.
+HOLDER = uuid.uuid4().hex
+
+_task: Optional[asyncio.Task] = None
+_jobs: Set[asyncio.Task] = set()
+
+
+async def start_singletons():
+    """The deployment's one-at-a-time jobs: the generation scheduler, cascade job resumption, the orphan sweep."""
+    await resume_jobs()
+    _jobs.update((asyncio.create_task(resume_periodically()), asyncio.create_task(sweep_periodically())))
+    start_scheduler()
+
+
+async def stop_singletons():
+    await stop_scheduler(settings.shutdown_grace_seconds)
+    for task in _jobs:
+        task.cancel()
+    await asyncio.gather(*_jobs, return_exceptions=True)
+    _jobs.clear()
+
+
+async def lead():
+    """Run the singleton jobs in whichever worker holds the `background_jobs` lease.
+
+    Every worker keeps trying to take the lease, and the one holding it
+    renews it every third of `background_lease_seconds`. It starts the jobs
+    when it takes the lease and stops them once a renewal fails, so two
+    workers do not run them side by side; a worker that dies hands them
+    over when its lease expires, one that shuts down releases it at once.
+    """
+    leading = False
+    try:
+        while True:
+            try:
+                held = await acquire_lease(LEASE, settings.background_lease_seconds, HOLDER)
+            except PyMongoError as e:
+                logger.warning("Renewing the background jobs lease failed: %s", e)
+                held = False
+            if held and not leading:
+                leading = True
+                logger.info("Running the background jobs in this worker")
+                await start_singletons()
+            elif leading and not held:
+                leading = False
+                logger.warning("Lost the background jobs lease; stopping them in this worker")
+                await stop_singletons()
+            await asyncio.sleep(settings.background_lease_seconds / 3)
+    finally:
+        if leading:
+            await stop_singletons()
+            await release_lease(LEASE, HOLDER)
+
+
+def start_leading():
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(lead())
+
+
+async def stop_leading():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
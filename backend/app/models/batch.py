@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+MAX_BATCH_REQUESTS = 50
+
+class BatchRequest(BaseModel):
+    # Reads only: sub-requests run concurrently, so writes in one batch would race each other.
+    method: Literal["GET"] = "GET"
+    # Path and query string, e.g. "/projects/{id}?fields=summary".
+    path: str = Field(..., pattern=r"^/")
+    headers: Optional[Dict[str, str]] = None
+
+class BatchIn(BaseModel):
+    requests: List[BatchRequest] = Field(..., min_length=1, max_length=MAX_BATCH_REQUESTS)
+
+class BatchItemResult(BaseModel):
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+class BatchResult(BaseModel):
+    responses: List[BatchItemResult]
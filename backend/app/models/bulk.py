@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+MAX_BULK_OPERATIONS = 1000
+
+class BulkOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    data: Optional[dict] = None
+
+class BulkItemResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[str] = None
+    error: Optional[object] = None
+
+class BulkResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    results: List[BulkItemResult]
+    # Background cascade delete started for deleted clients/websites.
+    job_id: Optional[str] = None
@@ -1,6 +1,9 @@
 from pydantic import BaseModel, HttpUrl
 from typing import Optional, List
 
+from app.models.patch import KeywordsPatchIn
+from app.models.stamps import Stamped
+
 class ClientIn(BaseModel):
     name: str
     link: HttpUrl
@@ -27,5 +30,36 @@ class ClientIn(BaseModel):
     status: Optional[str] = None
     errors: Optional[str] = None
 
-class ClientOut(ClientIn):
-    id: str
\ No newline at end of file
+class ClientOut(ClientIn, Stamped):
+    id: str
+
+class ClientUpdateIn(BaseModel):
+    name: Optional[str] = None
+    link: Optional[HttpUrl] = None
+    about_descriptions: Optional[str] = None
+    services: Optional[str] = None
+    google_my_business_ids: Optional[str] = None
+    client_related_information: Optional[str] = None
+    tone_for_blogs: Optional[str] = None
+    tone_for_articles: Optional[str] = None
+    chatgpt_prompt: Optional[str] = None
+    deepseek_prompt: Optional[str] = None
+    keywords: Optional[List[str]] = None
+    date: Optional[str] = None
+    last_update_date: Optional[str] = None
+    amazon_about_id: Optional[str] = None
+    amazon_services_id: Optional[str] = None
+    amazon_google_my_business_descriptions: Optional[str] = None
+    amazon_google_my_business_id: Optional[str] = None
+    amazon_tone_for_blogs: Optional[str] = None
+    amazon_tone_for_articles: Optional[str] = None
+    amazon_project_id: Optional[str] = None
+    status: Optional[str] = None
+    errors: Optional[str] = None
+
+class ClientPatchIn(ClientUpdateIn, KeywordsPatchIn):
+    pass
+
+CLIENT_FIELD_PRESETS = {
+    "summary": ["name", "link", "status", "date", "last_update_date"],
+}
\ No newline at end of file
@@ -0,0 +1,42 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+
+FULL = "full"
+
+
+def resolve_fields(model: Type[BaseModel], presets: Dict[str, List[str]], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Turn a `fields=` value into a sorted tuple of field names, or None for the full document.
+
+    `fields` is either a preset name (`summary`, `full`, ...) or a comma-separated
+    list of field names of `model`.
+    """
+    if not fields or fields == FULL:
+        return None
+    if fields in presets:
+        return tuple(sorted(presets[fields]))
+
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    names.discard("id")
+    unknown = names - set(model.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(sorted(names))
+
+
+def projection(fields: Optional[Tuple[str, ...]], *required: str) -> Optional[dict]:
+    if fields is None:
+        return None
+    return {name: 1 for name in (*fields, *required)}
+
+
+@lru_cache(maxsize=256)
+def partial_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Build (once per field set) a response model holding only `fields` plus `id` and `version`."""
+    definitions = {name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    definitions["id"] = (str, ...)
+    if "version" in model.model_fields:
+        definitions["version"] = (model.model_fields["version"].annotation, model.model_fields["version"])
+    return create_model(f"{model.__name__}[{','.join(fields)}]", **definitions)
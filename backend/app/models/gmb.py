@@ -1,6 +1,9 @@
 from pydantic import BaseModel, HttpUrl
 from typing import Optional
 
+from app.models.patch import PatchIn
+from app.models.stamps import Stamped
+
 class GmbIn(BaseModel):
     name: str
     client_id: str
@@ -11,9 +14,13 @@ class GmbIn(BaseModel):
     last_update_date: Optional[str] = None
     status: Optional[str] = None
 
-class GmbOut(GmbIn):
+class GmbOut(GmbIn, Stamped):
     id: str
 
+GMB_FIELD_PRESETS = {
+    "summary": ["name", "client_id", "status", "date", "last_update_date"],
+}
+
 
 class GmbUpdateIn(BaseModel):
     name: Optional[str] = None
@@ -22,5 +29,8 @@ class GmbUpdateIn(BaseModel):
     last_update_date: Optional[str] = None
     status: Optional[str] = None
 
+class GmbPatchIn(GmbUpdateIn, PatchIn):
+    pass
+
 class GmbUpdateOut(GmbUpdateIn):
     id: str
\ No newline at end of file
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class KeywordCount(BaseModel):
+    keyword: str
+    project_count: int
+    # The client's own keyword list has it too.
+    client: bool = False
+
+class ProjectRef(BaseModel):
+    id: str
+    name: Optional[str] = None
+
+class SharedKeyword(BaseModel):
+    keyword: str
+    project_count: int
+    projects: List[ProjectRef]
+
+class UnusedKeywords(BaseModel):
+    keywords: List[str]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    # `ids=` lookups: the requested ids that were not found.
+    missing: Optional[List[str]] = None
+
+
+class ChangePage(BaseModel):
+    """One page of a `/{collection}/changes` feed: upserts carry the document, deletes only the id."""
+    items: List[dict]
+    since: str
+    more: bool = False
@@ -0,0 +1,32 @@
+from fastapi import HTTPException
+from pydantic import BaseModel
+from typing import List, Optional, Type
+
+# Body-only keys of a PATCH request; everything else is a document field to `$set`.
+PATCH_CONTROLS = {"version", "add_keywords", "remove_keywords"}
+
+
+class PatchIn(BaseModel):
+    # Apply only if the document is still at this version (like an `If-Match` ETag).
+    version: Optional[int] = None
+
+
+class KeywordsPatchIn(PatchIn):
+    # Atomic edits of `keywords`; cannot be combined with `keywords` itself.
+    add_keywords: Optional[List[str]] = None
+    remove_keywords: Optional[List[str]] = None
+
+
+def patch_fields(patch: BaseModel, model: Type[BaseModel]) -> dict:
+    """The document fields the client actually sent, checked against the full `model`.
+
+    Unsent fields are left out instead of becoming None; sending null for a
+    field `model` requires is rejected.
+    """
+    fields = {key: value for key, value in patch.model_dump(exclude_unset=True).items() if key not in PATCH_CONTROLS}
+    nulled = sorted(key for key, value in fields.items() if value is None and model.model_fields[key].is_required())
+    if nulled:
+        raise HTTPException(status_code=422, detail=f"Fields cannot be null: {', '.join(nulled)}")
+    if "keywords" in fields and (getattr(patch, "add_keywords", None) or getattr(patch, "remove_keywords", None)):
+        raise HTTPException(status_code=400, detail="Send either keywords or add_keywords/remove_keywords, not both")
+    return fields
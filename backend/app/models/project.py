@@ -1,6 +1,9 @@
 from pydantic import BaseModel, HttpUrl
 from typing import Optional, List
 
+from app.models.patch import KeywordsPatchIn
+from app.models.stamps import Stamped
+
 class ProjectIn(BaseModel):
     name: str
     client_id: str
@@ -9,16 +12,23 @@ class ProjectIn(BaseModel):
     about: str
     length: int
     keywords: List[str]
-    # article: Optional[str]
 
     # Hidden fields
     date: Optional[str] = None
     last_update_date: Optional[str] = None
     status: Optional[str] = None
+    # Generation: provider to use ("chatgpt", "deepseek"), its output and last error
+    provider: Optional[str] = None
+    article: Optional[str] = None
+    errors: Optional[str] = None
 
-class ProjectOut(ProjectIn):
+class ProjectOut(ProjectIn, Stamped):
     id: str
 
+PROJECT_FIELD_PRESETS = {
+    "summary": ["name", "client_id", "project_type", "status", "date", "last_update_date"],
+}
+
 class ProjectUpdateIn(BaseModel):
     name: Optional[str] = None
     client_id: Optional[str] = None
@@ -30,6 +40,11 @@ class ProjectUpdateIn(BaseModel):
     status: Optional[str] = None
     date: Optional[str] = None
     last_update_date: Optional[str] = None
+    provider: Optional[str] = None
+
+
+class ProjectPatchIn(ProjectUpdateIn, KeywordsPatchIn):
+    pass
 
 
 class ProjectUpdateOut(ProjectUpdateIn):
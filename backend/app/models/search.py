@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+MAX_SEARCH_OFFSET = 1000
+
+class SearchHit(BaseModel):
+    collection: Literal["clients", "projects"]
+    id: str
+    score: float
+    name: Optional[str] = None
+    client_id: Optional[str] = None
+    project_type: Optional[str] = None
+    status: Optional[str] = None
+    date: Optional[str] = None
+    last_update_date: Optional[str] = None
+
+class SearchResults(BaseModel):
+    items: List[SearchHit]
+    next_offset: Optional[int] = None
+    backend: str
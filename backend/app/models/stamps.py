@@ -0,0 +1,11 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+class Stamped(BaseModel):
+    # Set by the server on every write: creation and last write time (UTC) and the change sequence number.
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    seq: Optional[int] = None
+    # Bumped by every update; send it back as a PATCH `version` (or use the ETag) to update only that version.
+    version: Optional[int] = None
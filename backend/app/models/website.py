@@ -1,6 +1,9 @@
 from pydantic import BaseModel, HttpUrl
 from typing import Optional
 
+from app.models.patch import PatchIn
+from app.models.stamps import Stamped
+
 class WebsiteIn(BaseModel):
     domain: HttpUrl
 
@@ -9,6 +12,19 @@ class WebsiteIn(BaseModel):
     last_update_date: Optional[str] = None
     status: Optional[str] = None
 
-class WebsiteOut(WebsiteIn):
+class WebsiteOut(WebsiteIn, Stamped):
     id: str
 
+class WebsiteUpdateIn(BaseModel):
+    domain: Optional[HttpUrl] = None
+    date: Optional[str] = None
+    last_update_date: Optional[str] = None
+    status: Optional[str] = None
+
+class WebsitePatchIn(WebsiteUpdateIn, PatchIn):
+    pass
+
+WEBSITE_FIELD_PRESETS = {
+    "summary": ["domain", "status", "date", "last_update_date"],
+}
+
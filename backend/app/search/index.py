@@ -0,0 +1,172 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+# The last query term, if at least this long, also matches up to MAX_EXPANSIONS indexed terms
+# it is a prefix of ("roof" -> "roofing"), at PREFIX_FACTOR of the score.
+MIN_PREFIX = 3
+PREFIX_FACTOR = 0.5
+MAX_EXPANSIONS = 20
+
+# BM25 term-frequency saturation.
+K1 = 1.2
+
+
+def tokenize(text) -> List[str]:
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(item) for item in text)
+    return [token for token in TOKEN.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+def saturate(weight: float) -> float:
+    return weight * (K1 + 1) / (weight + K1)
+
+
+class InvertedIndex:
+    """Weighted term -> document postings for one collection.
+
+    A document's weight for a term is the sum, over its searchable fields, of
+    the field weight times the term's count in that field; queries rank by a
+    BM25-style score (saturated weight times inverse document frequency).
+
+    Field weights are small integers, so a term's postings fall into a few
+    bands of equal weight. `search` scores documents band by band and skips
+    whatever can no longer reach the top `limit`, so common terms in a query
+    cost little when rarer ones decide the ranking.
+    Documents may belong to a `group` (their client), which `search` can
+    be restricted to.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._bands: Dict[str, Dict[float, Set[str]]] = {}
+        self._terms: List[str] = []
+        self._docs: Dict[str, Tuple[dict, Tuple[str, ...], Optional[str]]] = {}
+        self._groups: Dict[str, Set[str]] = {}
+
+    def add(self, doc_id: str, doc: dict, summary: dict, group: Optional[str] = None, bulk: bool = False):
+        """Index `doc`, replacing any earlier version of it.
+
+        With `bulk`, new terms are appended unsorted instead of inserted in
+        place; `sort_terms` must run once the bulk load is done, before the
+        index is searched or documents are removed from it.
+        """
+        self.remove(doc_id)
+        counts = Counter()
+        for field, weight in self.weights.items():
+            for token in tokenize(doc.get(field)):
+                counts[token] += weight
+        for term, weight in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._bands[term] = {}
+                if bulk:
+                    self._terms.append(term)
+                else:
+                    insort(self._terms, term)
+            postings[doc_id] = score = saturate(weight)
+            self._bands[term].setdefault(score, set()).add(doc_id)
+        self._docs[doc_id] = (summary, tuple(counts), group)
+        if group is not None:
+            self._groups.setdefault(group, set()).add(doc_id)
+
+    def sort_terms(self):
+        self._terms.sort()
+
+    def remove(self, doc_id: str):
+        entry = self._docs.pop(doc_id, None)
+        if entry is None:
+            return
+        _, terms, group = entry
+        for term in terms:
+            postings, bands = self._postings[term], self._bands[term]
+            score = postings.pop(doc_id)
+            bands[score].discard(doc_id)
+            if not bands[score]:
+                del bands[score]
+            if not postings:
+                del self._postings[term], self._bands[term]
+                del self._terms[bisect_left(self._terms, term)]
+        if group is not None:
+            members = self._groups[group]
+            members.discard(doc_id)
+            if not members:
+                del self._groups[group]
+
+    def _expand(self, query: str) -> Dict[str, float]:
+        """Indexed terms the query matches, with their factor: 1 for exact, PREFIX_FACTOR for completions of the last term."""
+        terms = tokenize(query)
+        factors = {term: 1.0 for term in terms if term in self._postings}
+        if terms and len(terms[-1]) >= MIN_PREFIX:
+            position = bisect_left(self._terms, terms[-1])
+            for candidate in self._terms[position:position + MAX_EXPANSIONS + 1]:
+                if not candidate.startswith(terms[-1]):
+                    break
+                factors.setdefault(candidate, PREFIX_FACTOR)
+        return factors
+
+    def search(self, query: str, limit: int, group: Optional[str] = None) -> List[Tuple[str, float, dict]]:
+        """The best `limit` documents for `query` (any term may match), as `(id, score, summary)`, best first."""
+        total = len(self._docs)
+        coefficients = {}
+        for term, factor in self._expand(query).items():
+            matches = len(self._postings[term])
+            coefficients[term] = factor * math.log(1 + (total - matches + 0.5) / (matches + 0.5))
+        if not coefficients or limit <= 0:
+            return []
+
+        def score(doc_id: str) -> float:
+            return sum(coefficient * self._postings[term].get(doc_id, 0) for term, coefficient in coefficients.items())
+
+        if group is not None:
+            candidates: Iterable[str] = self._groups.get(group, ())
+            best = [item for item in heapq.nlargest(limit, ((score(doc_id), doc_id) for doc_id in candidates)) if item[0] > 0]
+        else:
+            best = self._top(coefficients, score, limit)
+        return [(doc_id, value, self._docs[doc_id][0]) for value, doc_id in best]
+
+    def _top(self, coefficients: Dict[str, float], score, limit: int) -> List[Tuple[float, str]]:
+        # MaxScore, a term at a time: terms go from the largest possible contribution down, each
+        # one's bands from the heaviest. A document not seen yet has none of the earlier terms, so
+        # it scores at most its band here plus the best of every later term; once that cannot beat
+        # the current last hit, the rest of the term is skipped.
+        best = {term: coefficients[term] * max(self._bands[term]) for term in coefficients}
+        terms = sorted(coefficients, key=best.get, reverse=True)
+        heap: List[Tuple[float, str]] = []
+        seen = set()
+        later = sum(best.values())
+        for term in terms:
+            later -= best[term]
+            for band in sorted(self._bands[term], reverse=True):
+                ceiling = coefficients[term] * band + later
+                if len(heap) >= limit and ceiling <= heap[0][0]:
+                    break
+                for doc_id in self._bands[term][band]:
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    item = (score(doc_id), doc_id)
+                    if len(heap) < limit:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+                        # Documents that would only tie the last hit are left out, like ties in a Mongo text sort.
+                        if ceiling <= heap[0][0]:
+                            break
+        return sorted(heap, reverse=True)
+
+    def stats(self) -> dict:
+        return {"documents": len(self._docs), "terms": len(self._terms)}
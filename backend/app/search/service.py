@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.crud.events import OPERATIONS
+from app.db.indexes import SEARCH_WEIGHTS
+from app.db.mongo import MongoDB
+from app.search.index import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLLECTIONS = tuple(SEARCH_WEIGHTS)
+
+# Returned with every hit, when the document has them.
+HIT_FIELDS = ("name", "client_id", "project_type", "status", "date", "last_update_date")
+
+# Documents indexed between yields to the event loop while building.
+BUILD_CHUNK = 1000
+
+# What a write event must carry for the index to apply it without reading the document back.
+DOCUMENT_FIELDS = tuple(sorted({field for weights in SEARCH_WEIGHTS.values() for field in weights} | set(HIT_FIELDS)))
+
+
+def projection(collection: str) -> dict:
+    return {field: 1 for field in (*SEARCH_WEIGHTS[collection], *HIT_FIELDS)}
+
+
+def summary(doc: dict) -> dict:
+    return {field: doc[field] for field in HIT_FIELDS if doc.get(field) is not None}
+
+
+def group(collection: str, doc_id: str, doc: dict) -> Optional[str]:
+    """The client a document belongs to, which `client_id` searches are restricted to."""
+    return doc_id if collection == "clients" else doc.get("client_id")
+
+
+def client_filter(collection: str, client_id: str) -> Optional[dict]:
+    """Clients match their own id, projects their `client_id`; None if nothing in `collection` can match."""
+    if collection == "clients":
+        return {"_id": ObjectId(client_id)} if ObjectId.is_valid(client_id) else None
+    return {"client_id": client_id}
+
+
+class SearchIndex:
+    """In-process inverted index over the searchable collections (SEARCH_BACKEND=memory).
+
+    Built from Mongo in the background at startup; until it is ready,
+    searches go to the text indexes. It follows writes through the change
+    stream when one runs (writes from every worker), otherwise through this
+    process's own writes only, like the document cache. A write that does not
+    carry the searchable fields makes it read that document back; a delete
+    by query it cannot attribute makes it rebuild.
+    """
+
+    def __init__(self):
+        self.indexes: Optional[Dict[str, InvertedIndex]] = None
+        self.builds = 0
+        self._build: Optional[asyncio.Task] = None
+        self._pending: Optional[set] = None
+        self._tasks = set()
+
+    @property
+    def ready(self) -> bool:
+        return self.indexes is not None
+
+    def start(self):
+        self.rebuild()
+
+    def rebuild(self):
+        if self._build is None or self._build.done():
+            self._build = asyncio.create_task(self.build())
+
+    async def build(self):
+        self._pending = set()
+        try:
+            db = MongoDB.get_db()
+            indexes = {}
+            for collection in SEARCH_COLLECTIONS:
+                index = indexes[collection] = InvertedIndex(SEARCH_WEIGHTS[collection])
+                count = 0
+                async for doc in db[collection].find({}, projection(collection)):
+                    doc_id = str(doc["_id"])
+                    index.add(doc_id, doc, summary(doc), group(collection, doc_id, doc), bulk=True)
+                    count += 1
+                    if count % BUILD_CHUNK == 0:
+                        await asyncio.sleep(0)
+                index.sort_terms()
+            self.indexes = indexes
+            self.builds += 1
+            logger.info("Search index built", extra={name: index.stats() for name, index in indexes.items()})
+        except Exception:
+            logger.exception("Search index build failed")
+            return
+        finally:
+            pending, self._pending = self._pending, None
+        # Writes seen while building may be missing from the snapshot that was read.
+        for collection, doc_id in pending:
+            await self._refresh(collection, doc_id)
+
+    async def _refresh(self, collection: str, doc_id: str):
+        doc = await MongoDB.get_db()[collection].find_one({"_id": ObjectId(doc_id)}, projection(collection))
+        if self.indexes is None:
+            return
+        if doc is None:
+            self.indexes[collection].remove(doc_id)
+        else:
+            self.indexes[collection].add(doc_id, doc, summary(doc), group(collection, doc_id, doc))
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def apply_write(self, collection: str, op: str, doc_id: Optional[str], doc: Optional[dict] = None):
+        """`app.crud.events` write handler."""
+        if collection not in SEARCH_WEIGHTS:
+            return
+        if doc_id is None:
+            self.rebuild()
+            return
+        if self._pending is not None:
+            self._pending.add((collection, doc_id))
+        if self.indexes is None:
+            return
+        if op == "delete":
+            self.indexes[collection].remove(doc_id)
+        elif doc is not None and all(field in doc for field in SEARCH_WEIGHTS[collection]):
+            self.indexes[collection].add(doc_id, doc, summary(doc), group(collection, doc_id, doc))
+        else:
+            self._spawn(self._refresh(collection, doc_id))
+
+    def apply_change(self, change: dict):
+        """Change stream handler."""
+        self.apply_write(
+            change["ns"]["coll"],
+            OPERATIONS[change["operationType"]],
+            str(change["documentKey"]["_id"]),
+            change.get("fullDocument"),
+        )
+
+    def search(self, query: str, collections: Iterable[str], client_id: Optional[str], limit: int) -> List[dict]:
+        hits = [
+            {"collection": collection, "id": doc_id, "score": score, **doc}
+            for collection in collections
+            for doc_id, score, doc in self.indexes[collection].search(query, limit, client_id)
+        ]
+        hits.sort(key=lambda hit: (-hit["score"], hit["collection"], hit["id"]))
+        return hits[:limit]
+
+    async def stop(self):
+        for task in [self._build, *self._tasks]:
+            if task is not None and not task.done():
+                task.cancel()
+        await asyncio.gather(*[task for task in [self._build, *self._tasks] if task is not None], return_exceptions=True)
+        self._build = None
+
+    def stats(self) -> dict:
+        collections = {name: index.stats() for name, index in self.indexes.items()} if self.indexes is not None else None
+        return {"ready": self.ready, "builds": self.builds, "collections": collections}
+
+
+search_index = SearchIndex()
+
+
+def memory_enabled() -> bool:
+    return settings.search_backend == "memory"
+
+
+async def mongo_search(query: str, collections: Iterable[str], client_id: Optional[str], limit: int) -> List[dict]:
+    """Query each collection's text index for its best `limit` hits and merge them by score."""
+    db = MongoDB.get_db()
+
+    async def one(collection: str) -> List[dict]:
+        match = {"$text": {"$search": query}}
+        if client_id is not None:
+            by_client = client_filter(collection, client_id)
+            if by_client is None:
+                return []
+            match.update(by_client)
+        cursor = (
+            db[collection]
+            .find(match, {**{field: 1 for field in HIT_FIELDS}, "score": {"$meta": "textScore"}})
+            .sort([("score", {"$meta": "textScore"})])
+            .limit(limit)
+        )
+        return [
+            {"collection": collection, "id": str(doc.pop("_id")), "score": doc.pop("score"), **summary(doc)}
+            async for doc in cursor
+        ]
+
+    results = await asyncio.gather(*(one(collection) for collection in collections))
+    hits = [hit for result in results for hit in result]
+    hits.sort(key=lambda hit: (-hit["score"], hit["collection"], hit["id"]))
+    return hits[:limit]
+
+
+async def search(query: str, collections: Iterable[str], client_id: Optional[str], limit: int, offset: int) -> dict:
+    """One page of ranked hits. Each backend ranks the top `offset + limit` hits, so deep offsets cost more."""
+    window = offset + limit + 1
+    if memory_enabled() and search_index.ready:
+        backend = "memory"
+        hits = search_index.search(query, collections, client_id, window)
+    else:
+        backend = "mongo"
+        hits = await mongo_search(query, collections, client_id, window)
+    more = len(hits) > offset + limit
+    return {
+        "items": hits[offset:offset + limit],
+        "next_offset": offset + limit if more else None,
+        "backend": backend,
+    }
+
+
+def start_search():
+    if memory_enabled():
+        search_index.start()
+
+
+async def stop_search():
+    await search_index.stop()
+
+
+def search_stats() -> dict:
+    return {"backend": settings.search_backend, "index": search_index.stats() if memory_enabled() else None}
@@ -0,0 +1,58 @@
+"""Production entry point: uvicorn with WORKERS worker processes.
+
+    python -m app.server                # WORKERS, HOST, PORT, SHUTDOWN_GRACE_SECONDS from Settings
+    python -m app.server --workers 4
+
+Each worker imports `app.main:app` and runs its own lifespan, so it has its
+own Motor client and pool. On SIGTERM the supervisor signals every worker;
+each one fails /readyz, closes SSE streams, stops taking connections and waits
+up to SHUTDOWN_GRACE_SECONDS for in-flight requests before shutting down.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+
+
+def worker_count(requested=None) -> int:
+    return max(1, requested or settings.workers)
+
+
+def run(workers: int, host: str, port: int):
+    # For the supervisor's own messages; workers set up logging again when they import the app.
+    setup_logging(settings.log_level, settings.log_format, settings.log_access)
+    multiproc_dir = None
+    if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        # Must be set before the workers import prometheus_client.
+        multiproc_dir = tempfile.mkdtemp(prefix="prometheus-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = multiproc_dir
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=host,
+            port=port,
+            workers=workers,
+            lifespan="on",
+            timeout_graceful_shutdown=settings.shutdown_grace_seconds,
+            # app.core.logging configures every logger, uvicorn's included, in each worker.
+            log_config=None,
+            access_log=settings.log_access,
+            proxy_headers=True,
+        )
+    finally:
+        if multiproc_dir:
+            shutil.rmtree(multiproc_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, help="default: WORKERS (2)")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    args = parser.parse_args()
+    run(worker_count(args.workers), args.host, args.port)
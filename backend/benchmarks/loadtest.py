@@ -0,0 +1,445 @@
+"""Load test every router at a fixed concurrency and record latency, throughput and RSS.
+
+Each scenario sends `--requests` requests with `--concurrency` in flight and
+reports p50/p95/p99 latency (full body read), throughput and error count.
+Results are written as JSON, tagged with the git commit, and `--compare`
+prints the p95 and throughput change against an earlier result file.
+
+Each scenario also records the Mongo reads the repositories sent and the
+ones coalesced into a read already in flight (from /admin/cache, so against
+a multi-worker server they describe only the worker that answered). The
+`coalesce.*` scenarios send identical requests, so comparing a run with
+`--no-coalescing` (READ_COALESCING=false for a server) against one without
+shows the drop in database reads:
+
+    cd backend && python -m benchmarks.loadtest --memory --scale 0.01 --only coalesce --no-coalescing --output before.json
+    cd backend && python -m benchmarks.loadtest --memory --scale 0.01 --only coalesce --compare before.json
+
+Against a running server (seed its database first, or pass --mongo-uri to
+seed it from here):
+
+    cd backend && python -m benchmarks.loadtest --url http://localhost:8000 --mongo-uri mongodb://localhost:27017
+
+In process, against MongoDB or the in-memory stand-in (mongomock-motor, a dev
+dependency). mongomock has no `$lookup` with `let` and no `$text`, so with
+--memory the `expand=client_name` scenarios are skipped, and so are the
+search ones unless SEARCH_BACKEND=memory:
+
+    cd backend && python -m benchmarks.loadtest --memory --scale 0.01 --compare benchmarks/results/<old>.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from os import getenv, makedirs, path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.seed import WORDS, seed
+
+RESULTS_DIR = path.join(path.dirname(__file__), "results")
+
+
+@dataclass
+class Scenario:
+    name: str
+    # (context, request number) -> (method, url, httpx request kwargs)
+    request: Callable[[dict, int], tuple]
+    expected: tuple = (200,)
+    # Runs before the scenario, e.g. to create the documents it deletes.
+    setup: Optional[Callable[[httpx.AsyncClient, dict, int], Awaitable[None]]] = None
+    stream: bool = False
+    in_process: bool = True
+    # Query features the route needs that mongomock lacks: "lookup" ($lookup with `let`), "text" ($text search).
+    needs: tuple = ()
+
+
+def pick(ctx: dict, collection: str) -> str:
+    return random.choice(ctx[collection])
+
+
+def new_client(i: int) -> dict:
+    return {
+        "name": f"Load client {i}", "link": f"https://load-{i}.example.com/", "about_descriptions": "about",
+        "services": "services", "google_my_business_ids": "gmb", "client_related_information": "info",
+        "tone_for_blogs": "friendly", "tone_for_articles": "formal", "chatgpt_prompt": "Write {article_topic}",
+        "deepseek_prompt": "Write {article_topic}", "keywords": ["load", "test"],
+    }
+
+
+def new_project(ctx: dict, i: int) -> dict:
+    return {
+        "name": f"Load project {i}", "client_id": pick(ctx, "clients"), "project_type": "blog",
+        "focus": "focus", "about": "about", "length": 800, "keywords": ["load"],
+    }
+
+
+def new_gmb(ctx: dict, i: int) -> dict:
+    return {"name": f"Load gmb {i}", "client_id": pick(ctx, "clients")}
+
+
+def new_website(i: int) -> dict:
+    return {"domain": f"https://load-site-{i}.example.com/"}
+
+
+def creates(collection: str, make: Callable[[dict, int], dict], key: str):
+    """Setup that creates `n` documents through the bulk route and stores their ids under `ctx[key]`."""
+    async def setup(client: httpx.AsyncClient, ctx: dict, n: int):
+        ids = []
+        for start in range(0, n, 1000):
+            operations = [{"op": "create", "data": make(ctx, i)} for i in range(start, min(n, start + 1000))]
+            response = await client.post(f"/{collection}/bulk", json=operations)
+            ids.extend(result["id"] for result in response.json()["results"])
+        ctx[key] = ids
+    return setup
+
+
+def cascade_jobs(client: httpx.AsyncClient, ctx: dict, n: int):
+    async def setup():
+        await creates("websites", lambda ctx, i: new_website(100_000 + i), "_job_websites")(client, ctx, n)
+        ctx["_jobs"] = [(await client.delete(f"/websites/{doc_id}")).json()["job_id"] for doc_id in ctx["_job_websites"]]
+    return setup()
+
+
+async def etag_of(client: httpx.AsyncClient, ctx: dict, collection: str, key: str):
+    doc_id = ctx[collection][0]
+    response = await client.get(f"/{collection}/{doc_id}")
+    ctx[key] = (doc_id, response.headers.get("etag", ""))
+
+
+SCENARIOS = [
+    Scenario("clients.list", lambda ctx, i: ("GET", "/clients/", {"params": {"limit": 100}})),
+    Scenario("clients.list.summary", lambda ctx, i: ("GET", "/clients/", {"params": {"limit": 1000, "fields": "summary"}})),
+    Scenario("clients.stream.names", lambda ctx, i: ("GET", "/clients/", {"params": {"stream": "true", "fields": "name"}})),
+    Scenario("clients.get", lambda ctx, i: ("GET", f"/clients/{pick(ctx, 'clients')}", {})),
+    Scenario(
+        "clients.get.not_modified",
+        lambda ctx, i: ("GET", f"/clients/{ctx['_etag'][0]}", {"headers": {"If-None-Match": ctx["_etag"][1]}}),
+        expected=(304,),
+        setup=lambda client, ctx, n: etag_of(client, ctx, "clients", "_etag"),
+    ),
+    Scenario("clients.create", lambda ctx, i: ("POST", "/clients/create", {"json": new_client(i)})),
+    Scenario("clients.update", lambda ctx, i: ("PUT", f"/clients/{pick(ctx, 'clients')}", {"json": new_client(i)})),
+    Scenario(
+        "clients.bulk",
+        lambda ctx, i: ("POST", "/clients/bulk", {"json": [{"op": "create", "data": new_client(i * 10 + k)} for k in range(10)]}),
+    ),
+    Scenario(
+        "clients.delete",
+        lambda ctx, i: ("DELETE", f"/clients/{ctx['_clients'][i]}", {}),
+        expected=(202,),
+        setup=creates("clients", lambda ctx, i: new_client(i), "_clients"),
+    ),
+    Scenario(
+        "projects.list.expand",
+        lambda ctx, i: ("GET", "/projects/", {"params": {"limit": 100, "expand": "client_name"}}),
+        needs=("lookup",),
+    ),
+    Scenario(
+        "projects.list.by_client",
+        lambda ctx, i: ("GET", "/projects/", {"params": {"client_id": pick(ctx, "clients"), "expand": "client_name"}}),
+        needs=("lookup",),
+    ),
+    Scenario("projects.list.summary", lambda ctx, i: ("GET", "/projects/", {"params": {"limit": 1000, "fields": "summary"}})),
+    Scenario("projects.stream.summary", lambda ctx, i: ("GET", "/projects/", {"params": {"stream": "true", "fields": "summary"}})),
+    Scenario("projects.get", lambda ctx, i: ("GET", f"/projects/{pick(ctx, 'projects')}", {})),
+    Scenario("projects.create", lambda ctx, i: ("POST", "/projects/create", {"json": new_project(ctx, i)})),
+    Scenario("projects.update", lambda ctx, i: ("PUT", f"/projects/{pick(ctx, 'projects')}", {"json": new_project(ctx, i)})),
+    Scenario("projects.generate", lambda ctx, i: ("POST", f"/projects/{pick(ctx, 'projects')}/generate", {}), expected=(202,)),
+    Scenario(
+        "projects.delete",
+        lambda ctx, i: ("DELETE", f"/projects/{ctx['_projects'][i]}", {}),
+        setup=creates("projects", new_project, "_projects"),
+    ),
+    Scenario(
+        "gmb.list.expand",
+        lambda ctx, i: ("GET", "/gmb/", {"params": {"limit": 100, "expand": "client_name"}}),
+        needs=("lookup",),
+    ),
+    Scenario("gmb.get", lambda ctx, i: ("GET", f"/gmb/{pick(ctx, 'gmb')}", {})),
+    Scenario("gmb.create", lambda ctx, i: ("POST", "/gmb/create", {"json": new_gmb(ctx, i)})),
+    Scenario("gmb.update", lambda ctx, i: ("PUT", f"/gmb/{pick(ctx, 'gmb')}", {"json": new_gmb(ctx, i)})),
+    Scenario(
+        "gmb.delete",
+        lambda ctx, i: ("DELETE", f"/gmb/{ctx['_gmb'][i]}", {}),
+        setup=creates("gmb", new_gmb, "_gmb"),
+    ),
+    Scenario("websites.list", lambda ctx, i: ("GET", "/websites/", {"params": {"limit": 100}})),
+    Scenario("websites.get", lambda ctx, i: ("GET", f"/websites/{pick(ctx, 'websites')}", {})),
+    Scenario("websites.create", lambda ctx, i: ("POST", "/websites/create", {"json": new_website(i)})),
+    Scenario("websites.update", lambda ctx, i: ("PUT", f"/websites/{pick(ctx, 'websites')}", {"json": new_website(i)})),
+    Scenario(
+        "websites.delete",
+        lambda ctx, i: ("DELETE", f"/websites/{ctx['_websites'][i]}", {}),
+        expected=(202,),
+        setup=creates("websites", lambda ctx, i: new_website(200_000 + i), "_websites"),
+    ),
+    Scenario("jobs.get", lambda ctx, i: ("GET", f"/jobs/{ctx['_jobs'][i % len(ctx['_jobs'])]}", {}), setup=cascade_jobs),
+    Scenario("search", lambda ctx, i: ("GET", "/search/", {"params": {"q": random.choice(WORDS)}}), needs=("text",)),
+    Scenario(
+        "search.terms",
+        lambda ctx, i: ("GET", "/search/", {"params": {"q": " ".join(random.sample(WORDS, 3))}}),
+        needs=("text",),
+    ),
+    Scenario("search.prefix", lambda ctx, i: ("GET", "/search/", {"params": {"q": random.choice(WORDS)[:3]}}), needs=("text",)),
+    Scenario(
+        "search.by_client",
+        lambda ctx, i: ("GET", "/search/", {"params": {"q": random.choice(WORDS), "client_id": pick(ctx, "clients")}}),
+        needs=("text",),
+    ),
+    # Every request identical, as when many clients poll the same page: concurrent ones share one query.
+    Scenario("coalesce.projects.list", lambda ctx, i: ("GET", "/projects/", {"params": {"limit": 100}})),
+    Scenario("coalesce.gmb.list", lambda ctx, i: ("GET", "/gmb/", {"params": {"limit": 100}})),
+    Scenario("coalesce.clients.get", lambda ctx, i: ("GET", f"/clients/{ctx['clients'][0]}", {"params": {"fields": "name"}})),
+    Scenario("admin.cache", lambda ctx, i: ("GET", "/admin/cache", {})),
+    Scenario("admin.generation", lambda ctx, i: ("GET", "/admin/generation", {})),
+    Scenario("metrics", lambda ctx, i: ("GET", "/metrics", {})),
+    # The response never ends, so only time to the first chunk is measured; ASGITransport cannot stream it.
+    Scenario("events.connect", lambda ctx, i: ("GET", "/events/", {}), stream=True, in_process=False),
+]
+
+
+def rss_mb(pid: str = "self") -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+async def coalescing_totals(client: httpx.AsyncClient) -> Optional[tuple]:
+    """(Mongo reads, collapsed reads) so far, summed over collections; None when the server does not report them."""
+    try:
+        response = await client.get("/admin/cache")
+        stats = response.json().get("coalescing")
+    except (httpx.HTTPError, ValueError):
+        return None
+    if response.status_code != 200 or stats is None:
+        return None
+    return sum(s["reads"] for s in stats.values()), sum(s["collapsed"] for s in stats.values())
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+async def send(client: httpx.AsyncClient, scenario: Scenario, ctx: dict, i: int) -> int:
+    method, url, kwargs = scenario.request(ctx, i)
+    if scenario.stream:
+        async with client.stream(method, url, **kwargs) as response:
+            async for _ in response.aiter_raw():
+                break
+            return response.status_code
+    response = await client.request(method, url, **kwargs)
+    return response.status_code
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: dict, requests: int, concurrency: int, pid: str) -> dict:
+    if scenario.setup is not None:
+        await scenario.setup(client, ctx, requests)
+
+    before = await coalescing_totals(client)
+    latencies, statuses = [], {}
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                status = await send(client, scenario, ctx, i)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = await coalescing_totals(client)
+    # The /admin/cache request itself reads nothing from the repositories.
+    db_reads, collapsed = (after[0] - before[0], after[1] - before[1]) if before and after else (None, None)
+
+    errors = sum(count for status, count in statuses.items() if status not in {str(code) for code in scenario.expected})
+    return {
+        "requests": requests,
+        "errors": errors,
+        "statuses": statuses,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "throughput_rps": requests / elapsed,
+        "rss_mb": rss_mb(pid),
+        "db_reads": db_reads,
+        "collapsed": collapsed,
+    }
+
+
+async def sample_ids(client: httpx.AsyncClient, collection: str, limit: int = 1000) -> List[str]:
+    response = await client.get(f"/{collection}/", params={"limit": limit, "fields": "status"})
+    response.raise_for_status()
+    return [doc["id"] for doc in response.json()["items"]]
+
+
+async def in_process_client(memory: bool, mongo_uri: Optional[str]):
+    from app.core.init_app import create_app
+    from app.db.indexes import ensure_indexes
+    from app.db.mongo import MongoDB
+
+    if memory:
+        try:
+            import mongomock.collection
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--memory needs mongomock-motor: pip install mongomock-motor")
+        # pymongo 4.11+ passes UpdateOne's `sort` to bulk writes, which mongomock 4.3 does not accept.
+        add_update = mongomock.collection.BulkOperationBuilder.add_update
+        mongomock.collection.BulkOperationBuilder.add_update = lambda self, *args, sort=None, **kwargs: add_update(
+            self, *args, **kwargs
+        )
+        MongoDB._client = AsyncMongoMockClient(tz_aware=True)
+        MongoDB._db = MongoDB._client["clients_db"]
+        await ensure_indexes(MongoDB._db)
+    else:
+        from app.core.config import settings
+        if mongo_uri:
+            settings.mongo_uri = mongo_uri
+        await MongoDB.connect()
+    app = create_app()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest"), MongoDB.get_db()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, dict], previous_path: str):
+    with open(previous_path) as f:
+        previous = json.load(f)["scenarios"]
+    print(f"\n{'scenario':<28}{'p95 before':>12}{'p95 after':>12}{'change':>9}{'rps change':>12}{'db reads':>16}")
+    for name, result in current.items():
+        if name not in previous:
+            continue
+        before = previous[name]
+        p95_change = (result["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0.0
+        rps_change = (result["throughput_rps"] / before["throughput_rps"] - 1) * 100 if before["throughput_rps"] else 0.0
+        reads = ""
+        if before.get("db_reads") is not None and result.get("db_reads") is not None:
+            reads = f"{before['db_reads']} -> {result['db_reads']}"
+        print(f"{name:<28}{before['p95_ms']:>12.2f}{result['p95_ms']:>12.2f}{p95_change:>8.1f}%{rps_change:>11.1f}%{reads:>16}")
+
+
+async def main(args):
+    random.seed(args.seed)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        db = None
+        if args.mongo_uri:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            db = AsyncIOMotorClient(args.mongo_uri)["clients_db"]
+    else:
+        client, db = await in_process_client(args.memory, args.mongo_uri)
+    pid = str(args.server_pid) if args.server_pid else "self"
+    if args.no_coalescing:
+        if args.url:
+            raise SystemExit("--no-coalescing applies in process; start the server with READ_COALESCING=false instead")
+        from app.core.config import settings
+        settings.read_coalescing = False
+
+    if db is not None and not args.no_seed:
+        started = time.perf_counter()
+        await seed(db, args.scale, args.seed)
+        print(f"seeded at scale {args.scale} in {time.perf_counter() - started:.1f}s")
+
+    unsupported = set()
+    if not args.url:
+        from app.search.service import memory_enabled, search_index
+        if args.memory:
+            unsupported = {"lookup"} if memory_enabled() else {"lookup", "text"}
+        if memory_enabled():
+            # No lifespan runs in process, so build the SEARCH_BACKEND=memory index here.
+            started = time.perf_counter()
+            await search_index.build()
+            print(f"search index built in {time.perf_counter() - started:.1f}s")
+
+    selected = [
+        scenario for scenario in SCENARIOS
+        if (args.url or scenario.in_process) and (not args.only or any(scenario.name.startswith(prefix) for prefix in args.only))
+    ]
+    skipped = [scenario.name for scenario in selected if unsupported & set(scenario.needs)]
+    selected = [scenario for scenario in selected if scenario.name not in skipped]
+    if skipped:
+        print(f"skipped on mongomock: {', '.join(skipped)}")
+
+    results = {}
+    async with client:
+        ctx = {collection: await sample_ids(client, collection) for collection in ("clients", "projects", "gmb", "websites")}
+        print(f"{'scenario':<28}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'rps':>9}{'errors':>8}{'rss MB':>9}{'reads':>8}{'shared':>8}")
+        for scenario in selected:
+            result = await run_scenario(client, scenario, ctx, args.requests, args.concurrency, pid)
+            results[scenario.name] = result
+            print(
+                f"{scenario.name:<28}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                f"{result['throughput_rps']:>9.1f}{result['errors']:>8}{result['rss_mb'] or 0:>9.1f}"
+                f"{'-' if result['db_reads'] is None else result['db_reads']:>8}"
+                f"{'-' if result['collapsed'] is None else result['collapsed']:>8}"
+            )
+
+    output = args.output
+    if output is None:
+        makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = path.join(RESULTS_DIR, f"loadtest-{git_commit() or 'unknown'}-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump({
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                "target": args.url or ("memory" if args.memory else "in-process"),
+                "scale": args.scale,
+                "seed": args.seed,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "read_coalescing": not args.no_coalescing if not args.url else None,
+            },
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if pid == "self" else None,
+            "scenarios": results,
+            "skipped": skipped,
+        }, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server; default is to run the app in process")
+    target.add_argument("--memory", action="store_true", help="in process, on mongomock-motor instead of MongoDB")
+    parser.add_argument("--mongo-uri", default=getenv("MONGO_URI"), help="database to seed (and to use in process)")
+    parser.add_argument("--no-seed", action="store_true", help="keep the existing data")
+    parser.add_argument("--scale", type=float, default=1.0, help="fraction of the full dataset to seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--only", nargs="+", help="scenario name prefixes to run")
+    parser.add_argument("--server-pid", type=int, help="read RSS from this process instead of the load generator")
+    parser.add_argument("--output", help="result file; default benchmarks/results/loadtest-<commit>-<time>.json")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--no-coalescing", action="store_true", help="in process, send every read to Mongo (READ_COALESCING=false)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,144 @@
+"""Fill a database with realistic, reproducible data for load tests.
+
+Client documents carry prompt and description fields of a few KB each, as in
+production. The same `--seed` always produces the same documents.
+
+    cd backend && MONGO_URI=mongodb://localhost:27017 python -m benchmarks.seed --scale 1
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from bson import ObjectId
+
+from app.db.indexes import ensure_indexes
+
+# Document counts at --scale 1.
+SIZES = {"clients": 10_000, "projects": 100_000, "gmb": 20_000, "websites": 5_000}
+STATUSES = ["new", "queued", "processing", "finished", "failed"]
+PROJECT_TYPES = ["blog", "article", "landing page"]
+WORDS = (
+    "local seo content marketing plumbing roofing dental clinic lawyer bakery fitness studio "
+    "repair service emergency affordable trusted family owned licensed insured free estimate "
+    "quality experience customers community downtown neighborhood professional team"
+).split()
+
+INSERT_BATCH = 1000
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def date(rng: random.Random) -> str:
+    return (datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(60 * 24 * 365))).isoformat()
+
+
+def client_doc(rng: random.Random, i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f"Client {i:05d} {text(rng, 2)}",
+        "link": f"https://client-{i}.example.com/",
+        "about_descriptions": text(rng, 300),
+        "services": text(rng, 150),
+        "google_my_business_ids": ",".join(f"gmb-{i}-{k}" for k in range(3)),
+        "client_related_information": text(rng, 300),
+        "tone_for_blogs": text(rng, 20),
+        "tone_for_articles": text(rng, 20),
+        "chatgpt_prompt": "Write about {article_topic} focusing on {focus}. " + text(rng, 600),
+        "deepseek_prompt": "Write about {article_topic} focusing on {focus}. " + text(rng, 600),
+        "keywords": [text(rng, 2) for _ in range(10)],
+        "date": date(rng),
+        "last_update_date": date(rng),
+        "status": rng.choice(STATUSES),
+        "version": 1,
+    }
+
+
+def project_doc(rng: random.Random, i: int, client_id: ObjectId, website_id: ObjectId) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f"Project {i:06d} {text(rng, 3)}",
+        "client_id": str(client_id),
+        "website_id": str(website_id),
+        "project_type": rng.choice(PROJECT_TYPES),
+        "focus": text(rng, 8),
+        "about": text(rng, 60),
+        "length": rng.choice([500, 800, 1200, 2000]),
+        "keywords": [text(rng, 2) for _ in range(5)],
+        "date": date(rng),
+        "last_update_date": date(rng),
+        "status": rng.choice(STATUSES),
+        "version": 1,
+    }
+
+
+def gmb_doc(rng: random.Random, i: int, client_id: ObjectId) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f"GMB {i:05d} {text(rng, 2)}",
+        "client_id": str(client_id),
+        "date": date(rng),
+        "last_update_date": date(rng),
+        "status": rng.choice(STATUSES),
+        "version": 1,
+    }
+
+
+def website_doc(rng: random.Random, i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "domain": f"https://site-{i}.example.com/",
+        "date": date(rng),
+        "last_update_date": date(rng),
+        "status": rng.choice(STATUSES),
+        "version": 1,
+    }
+
+
+async def insert(collection, docs: List[dict]):
+    for start in range(0, len(docs), INSERT_BATCH):
+        await collection.insert_many(docs[start:start + INSERT_BATCH], ordered=False)
+
+
+async def seed(db, scale: float = 1.0, seed: int = 42) -> Dict[str, List[str]]:
+    """Replace the four collections with generated data; returns the inserted ids per collection."""
+    rng = random.Random(seed)
+    counts = {name: max(1, int(size * scale)) for name, size in SIZES.items()}
+
+    clients = [client_doc(rng, i) for i in range(counts["clients"])]
+    websites = [website_doc(rng, i) for i in range(counts["websites"])]
+    projects = [
+        project_doc(rng, i, rng.choice(clients)["_id"], rng.choice(websites)["_id"])
+        for i in range(counts["projects"])
+    ]
+    gmbs = [gmb_doc(rng, i, rng.choice(clients)["_id"]) for i in range(counts["gmb"])]
+
+    docs = {"clients": clients, "projects": projects, "gmb": gmbs, "websites": websites}
+    for name in (*docs, "tombstones", "jobs"):
+        await db[name].drop()
+    for name, collection_docs in docs.items():
+        await insert(db[name], collection_docs)
+    await ensure_indexes(db)
+    return {name: [str(doc["_id"]) for doc in collection_docs] for name, collection_docs in docs.items()}
+
+
+if __name__ == "__main__":
+    import asyncio
+    from os import getenv
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    async def main():
+        client = AsyncIOMotorClient(args.mongo_uri)
+        ids = await seed(client["clients_db"], args.scale, args.seed)
+        print(", ".join(f"{name}: {len(values)}" for name, values in ids.items()))
+
+    asyncio.run(main())
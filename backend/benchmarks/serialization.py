@@ -0,0 +1,97 @@
+"""Per-request CPU cost of serializing list and detail responses, before and after orjson.
+
+"before" reproduces the old route path: build `ClientOut(**doc)` (detail) or
+return the raw page (lists) and let FastAPI validate it against `response_model`
+and render it with `JSONResponse`. "after" is the current path in
+`app.api.responses`.
+
+    cd backend && python -m benchmarks.serialization --sizes 1000 10000
+"""
+import argparse
+import time
+from typing import List
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.responses import json_response, model_response
+from app.models.client import ClientOut
+from app.models.page import Page
+
+
+def make_client(i: int) -> dict:
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+    return {
+        "id": str(ObjectId()),
+        "name": f"Client {i}",
+        "link": f"https://client-{i}.example.com/",
+        "about_descriptions": text,
+        "services": text,
+        "google_my_business_ids": "gmb-1,gmb-2",
+        "client_related_information": text,
+        "tone_for_blogs": "friendly",
+        "tone_for_articles": "formal",
+        "chatgpt_prompt": text,
+        "deepseek_prompt": text,
+        "keywords": [f"keyword {k}" for k in range(10)],
+        "date": "2024-01-01T00:00:00",
+        "last_update_date": "2024-01-02T00:00:00",
+        "status": "finished",
+        "version": 3,
+    }
+
+
+# FastAPI builds these once per route.
+DETAIL_FIELD = create_model_field("Response_get_one", ClientOut, mode="serialization")
+LIST_FIELD = create_model_field("Response_get_all", Page[dict], mode="serialization")
+
+
+async def old_detail(doc: dict) -> bytes:
+    content = await serialize_response(field=DETAIL_FIELD, response_content=ClientOut(**doc))
+    return JSONResponse(content).body
+
+
+async def old_list(docs: List[dict]) -> bytes:
+    content = await serialize_response(field=LIST_FIELD, response_content={"items": docs, "next_cursor": None})
+    return JSONResponse(content).body
+
+
+async def new_detail(doc: dict) -> bytes:
+    return model_response(ClientOut, doc).body
+
+
+async def new_list(docs: List[dict]) -> bytes:
+    return json_response({"items": docs, "next_cursor": None}).body
+
+
+async def cpu_ms(fn, arg, repeat: int) -> float:
+    await fn(arg)
+    start = time.process_time()
+    for _ in range(repeat):
+        await fn(arg)
+    return (time.process_time() - start) * 1000 / repeat
+
+
+async def main(sizes: List[int], repeat: int):
+    doc = make_client(0)
+    print(f"{'case':<22}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    before = await cpu_ms(old_detail, doc, repeat * 100)
+    after = await cpu_ms(new_detail, doc, repeat * 100)
+    print(f"{'detail':<22}{before:>12.3f}{after:>12.3f}{before / after:>9.1f}x")
+    for size in sizes:
+        docs = [make_client(i) for i in range(size)]
+        before = await cpu_ms(old_list, docs, repeat)
+        after = await cpu_ms(new_list, docs, repeat)
+        print(f"{f'list of {size}':<22}{before:>12.3f}{after:>12.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
@@ -0,0 +1,107 @@
+"""Throughput of the production server (`python -m app.server`) at 1, 2, 4 and 8 worker processes.
+
+The database is seeded once, then for each worker count a fresh server is
+started, the serialization-heavy list scenarios from `benchmarks.loadtest`
+are run against it, and it is stopped with SIGTERM (exercising the drain).
+Needs a MongoDB that every worker can reach.
+
+    cd backend && python -m benchmarks.workers --mongo-uri mongodb://localhost:27017 --scale 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.loadtest import RESULTS_DIR, SCENARIOS, git_commit, run_scenario, sample_ids
+from benchmarks.seed import seed
+
+LIST_SCENARIOS = ("clients.list", "clients.list.summary", "projects.list.summary", "projects.stream.summary")
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/readyz")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def measure(workers: int, args) -> dict:
+    env = {**os.environ, "MONGO_URI": args.mongo_uri, "LOG_LEVEL": "WARNING", "GENERATION_WORKERS": "0"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--port", str(args.port)],
+        env=env,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+            await wait_ready(client, 60)
+            ctx = {collection: await sample_ids(client, collection) for collection in ("clients", "projects", "gmb", "websites")}
+            results = {}
+            for scenario in SCENARIOS:
+                if scenario.name in LIST_SCENARIOS:
+                    results[scenario.name] = await run_scenario(
+                        client, scenario, ctx, args.requests, args.concurrency, str(server.pid)
+                    )
+            return results
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=120)
+
+
+async def main(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    if not args.no_seed:
+        await seed(AsyncIOMotorClient(args.mongo_uri)["clients_db"], args.scale, args.seed)
+
+    runs = {}
+    print(f"{'workers':<9}{'scenario':<28}{'p50 ms':>9}{'p95 ms':>9}{'rps':>9}{'errors':>8}")
+    for workers in args.workers:
+        runs[str(workers)] = await measure(workers, args)
+        for name, result in runs[str(workers)].items():
+            print(f"{workers:<9}{name:<28}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['throughput_rps']:>9.1f}{result['errors']:>8}")
+
+    baseline = runs[str(args.workers[0])]
+    print(f"\nthroughput relative to {args.workers[0]} worker(s)")
+    for workers, results in runs.items():
+        ratios = [results[name]["throughput_rps"] / baseline[name]["throughput_rps"] for name in results if baseline[name]["throughput_rps"]]
+        print(f"{workers:>3} workers: {sum(ratios) / len(ratios):.2f}x")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = args.output or os.path.join(RESULTS_DIR, f"workers-{git_commit() or 'unknown'}-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump({
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "cpus": os.cpu_count(),
+            "config": {"scale": args.scale, "requests": args.requests, "concurrency": args.concurrency},
+            "workers": runs,
+        }, f, indent=2)
+    print(f"\nresults written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--output")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,22 @@
+import pytest
+from fastapi import HTTPException
+
+from app.crud.filters import build_filter
+
+
+def test_date_only_upper_bound_covers_the_whole_day():
+    query = build_filter("2024-05-01", "2024-05-31", status="done")
+    assert query == {"status": "done", "date": {"$gte": "2024-05-01", "$lt": "2024-06-01"}}
+    assert "2024-05-31T23:59:59Z" < query["date"]["$lt"]
+    assert build_filter(date_to="2024-12-31") == {"date": {"$lt": "2025-01-01"}}
+
+
+def test_date_time_upper_bound_is_inclusive():
+    assert build_filter(date_to="2024-05-31T12:00:00Z") == {"date": {"$lte": "2024-05-31T12:00:00Z"}}
+
+
+@pytest.mark.parametrize("bound", ["yesterday", "2024-13-01", "31/05/2024"])
+def test_malformed_bounds_are_400(bound):
+    with pytest.raises(HTTPException) as raised:
+        build_filter(date_to=bound)
+    assert raised.value.status_code == 400
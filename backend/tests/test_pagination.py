@@ -0,0 +1,26 @@
+import pytest
+
+from app.db.mongo import MongoDB
+
+
+def pages(client, **params):
+    names, cursor = [], None
+    while True:
+        page = client.get("/clients/", params={**params, "cursor": cursor} if cursor else params).json()
+        names.extend(item.get("name") for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return names
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_pages_walk_through_null_sort_values(client, order):
+    # Documents written before `name` was required: two nulls and one missing, among named ones.
+    docs = [{"name": "b"}, {"name": None}, {"name": "a"}, {}, {"name": None}, {"name": "c"}]
+    client.portal.call(MongoDB.get_db()["clients"].insert_many, docs)
+
+    names = pages(client, sort="name", order=order, limit=2)
+
+    # Nulls and missing values sort before every other value, as Mongo orders them.
+    nulls_first = [None, None, None, "a", "b", "c"]
+    assert names == (nulls_first if order == "asc" else nulls_first[::-1])
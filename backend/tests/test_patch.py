@@ -0,0 +1,48 @@
+from tests.conftest import requires_mongo
+
+CLIENT = {
+    "name": "Acme Roofing",
+    "link": "https://acme.example",
+    "about_descriptions": "about",
+    "services": "roofing",
+    "google_my_business_ids": "gmb",
+    "client_related_information": "info",
+    "tone_for_blogs": "friendly",
+    "tone_for_articles": "formal",
+    "chatgpt_prompt": "prompt",
+    "deepseek_prompt": "prompt",
+    "keywords": ["a", "b", "c"],
+}
+
+
+def test_responses_carry_the_version_patch_expects(client):
+    created = client.post("/clients/create", json=CLIENT).json()
+    assert created["version"] == 1
+    assert client.get(f"/clients/{created['id']}", params={"fields": "name"}).json()["version"] == 1
+
+    patched = client.patch(f"/clients/{created['id']}", json={"name": "Acme", "version": 1})
+    assert patched.status_code == 200
+    assert patched.json()["version"] == 2
+
+    stale = client.patch(f"/clients/{created['id']}", json={"name": "Other", "version": 1})
+    assert stale.status_code == 412
+    assert stale.headers["X-Current-Version"] == "2"
+
+
+@requires_mongo("mongomock does not evaluate $let/$filter in update pipelines")
+def test_add_and_remove_on_one_field_is_one_merge(client):
+    created = client.post("/clients/create", json=CLIENT).json()
+
+    patched = client.patch(
+        f"/clients/{created['id']}",
+        json={"add_keywords": ["d", "a", "d", "$e"], "remove_keywords": ["b"], "version": 1},
+    )
+    assert patched.status_code == 200
+    # Existing order kept, the removed value gone, new values appended once, "$e" taken literally.
+    assert patched.json()["keywords"] == ["a", "c", "d", "$e"]
+    assert patched.json()["version"] == 2
+    assert client.get(f"/clients/{created['id']}").json()["keywords"] == ["a", "c", "d", "$e"]
+
+    stale = client.patch(f"/clients/{created['id']}", json={"add_keywords": ["x"], "remove_keywords": ["a"], "version": 1})
+    assert stale.status_code == 412
+    assert client.get(f"/clients/{created['id']}").json()["keywords"] == ["a", "c", "d", "$e"]
@@ -1,8 +1,9 @@
-import api from "../services/api";
+import api, { fetchAllPages } from "../services/api";
 
 
 export const createClient = (data) => api.post("/clients/create", data);
-export const getClients = () => api.get("/clients");
+export const getClients = (params) => fetchAllPages("/clients/", params);
+export const getClientsByIds = (ids, params) => api.get("/clients/", { params: { ...params, ids: ids.join(",") } });
 export const getClientById = (id) => api.get(`/clients/${id}`);
-export const updateClient = (id, data) => api.put(`/clients/${id}`, data);
+export const updateClient = (id, data) => api.patch(`/clients/${id}`, data);
 export const deleteClient = (id) => api.delete(`/clients/${id}`);
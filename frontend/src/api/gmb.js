@@ -1,7 +1,8 @@
-import api from "../services/api";
+import api, { fetchAllPages } from "../services/api";
 
 export const createGmb = (data) => api.post("/gmb/create", data);
-export const getGmb = () => api.get("/gmb");
+export const getGmb = (params) => fetchAllPages("/gmb/", params);
+export const getGmbByIds = (ids, params) => api.get("/gmb/", { params: { ...params, ids: ids.join(",") } });
 export const getGmbById = (id) => api.get(`/gmb/${id}`);
-export const updateGmb = (id, data) => api.put(`/gmb/${id}`, data);
+export const updateGmb = (id, data) => api.patch(`/gmb/${id}`, data);
 export const deleteGmb = (id) => api.delete(`/gmb/${id}`);
@@ -1,7 +1,8 @@
-import api from "../services/api";
+import api, { fetchAllPages } from "../services/api";
 
 export const createProject = (data) => api.post("/projects/create", data);
-export const getProjects = () => api.get("/projects");
+export const getProjects = (params) => fetchAllPages("/projects/", params);
+export const getProjectsByIds = (ids, params) => api.get("/projects/", { params: { ...params, ids: ids.join(",") } });
 export const getProjectById = (id) => api.get(`/projects/${id}`);
-export const updateProject = (id, data) => api.put(`/projects/${id}`, data);
+export const updateProject = (id, data) => api.patch(`/projects/${id}`, data);
 export const deleteProject = (id) => api.delete(`/projects/${id}`);
@@ -1,7 +1,8 @@
-import api from "../services/api";
+import api, { fetchAllPages } from "../services/api";
 
 export const createWebsite = (data) => api.post("/websites/create", data);
-export const getWebsites = () => api.get("/websites");
+export const getWebsites = (params) => fetchAllPages("/websites/", params);
+export const getWebsitesByIds = (ids, params) => api.get("/websites/", { params: { ...params, ids: ids.join(",") } });
 export const getWebsiteById = (id) => api.get(`/websites/${id}`);
-export const updateWebsite = (id, data) => api.put(`/websites/${id}`, data);
+export const updateWebsite = (id, data) => api.patch(`/websites/${id}`, data);
 export const deleteWebsite = (id) => api.delete(`/websites/${id}`);
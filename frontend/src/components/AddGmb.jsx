@@ -21,7 +21,7 @@ const AddGMB = () => {
     const fetchClients = async () => {
       setIsLoading(true);
       try {
-        const response = await getClients();
+        const response = await getClients({ fields: "name" });
         const clientData = response.data;
 
         if (Array.isArray(clientData)) {
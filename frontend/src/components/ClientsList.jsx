@@ -21,7 +21,7 @@ const ClientsList = () => {
       try {
         const [clientsRes, projectsRes] = await Promise.all([
           getClients(),
-          getProjects(),
+          getProjects({ fields: "client_id" }),
         ]);
 
 
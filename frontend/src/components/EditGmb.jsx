@@ -24,7 +24,7 @@ const EditGMB = () => {
     const fetchData = async () => {
       try {
         const [clientRes, gmbRes] = await Promise.all([
-          getClients(),
+          getClients({ fields: "name" }),
           getGmbById(id),
         ]);
 
@@ -25,7 +25,7 @@ const EditProject = () => {
     const fetchData = async () => {
       try {
         const [clientRes, projectRes] = await Promise.all([
-          getClients(),
+          getClients({ fields: "name" }),
           getProjectById(id),
         ]);
 
@@ -1,54 +1,82 @@
-import { useState, useEffect, useMemo } from "react";
+import { useState, useEffect } from "react";
 import { getGmb, deleteGmb } from "../api/gmb.js";
 import { getClients } from "../api/client";
 import { useNavigate, useSearchParams } from "react-router-dom";
 import { toast, ToastContainer } from "react-toastify";
+import { subscribeEvents } from "../services/api";
 import {formatDate, cleanHtmlMarkers} from "../utils/index.js";
 
 const GMBList = () => {
   const [gmbs, setGmbs] = useState([]);
   const [clients, setClients] = useState([]);
   const [clientFilter, setClientFilter] = useState("");
+  const [reloadKey, setReloadKey] = useState(0);
   const [activeGmbId, setActiveGmbId] = useState(null);
   const navigate = useNavigate();
   const [searchParams] = useSearchParams();
 
   useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const [gmbRes, clientRes] = await Promise.all([
-          getGmb(),
-          getClients(),
-        ]);
-
-        const clientMap = new Map(
-          (clientRes.data || []).map((c) => [c.id, c.name])
-        );
-
-        const enriched = (gmbRes.data || []).map((g) => ({
-          ...g,
-          client_name: clientMap.get(g.client_id) || "Unknown Client",
-        }));
+    const clientIdFromUrl = searchParams.get("clientId");
+    if (clientIdFromUrl) {
+      setClientFilter(clientIdFromUrl);
+    }
+  }, [searchParams]);
 
-        setGmbs(enriched);
+  useEffect(() => {
+    const fetchClients = async () => {
+      try {
+        const clientRes = await getClients({ fields: "name" });
         setClients(clientRes.data || []);
+      } catch (err) {
+        toast.error("Failed to load data");
+        console.error(err);
+      }
+    };
+    fetchClients();
+  }, []);
 
-        const clientIdFromUrl = searchParams.get("clientId");
-        if (clientIdFromUrl) {
-          setClientFilter(clientIdFromUrl);
-        }
+  useEffect(() => {
+    const fetchData = async () => {
+      try {
+        const gmbRes = await getGmb({
+          client_id: clientFilter || undefined,
+          expand: "client_name",
+        });
+
+        setGmbs(
+          (gmbRes.data || []).map((g) => ({
+            ...g,
+            client_name: g.client_name || "Unknown Client",
+          }))
+        );
       } catch (err) {
         toast.error("Failed to load data");
         console.error(err);
       }
     };
     fetchData();
-  }, [searchParams]);
+  }, [clientFilter, reloadKey]);
 
-  const filteredData = useMemo(() => {
-    if (!clientFilter) return gmbs;
-    return gmbs.filter((g) => g.client_id === clientFilter);
-  }, [gmbs, clientFilter]);
+  // Keep statuses current from the server's event stream instead of re-polling the list.
+  useEffect(() => {
+    return subscribeEvents("gmb", { client_id: clientFilter || undefined }, (event) => {
+      if (event.op === "update") {
+        setGmbs((prev) =>
+          prev.map((g) =>
+            g.id === event.id && event.status !== undefined ? { ...g, status: event.status } : g
+          )
+        );
+      } else if (event.op === "delete") {
+        if (event.id) {
+          setGmbs((prev) => prev.filter((g) => g.id !== event.id));
+        } else {
+          setReloadKey((key) => key + 1);
+        }
+      } else {
+        setReloadKey((key) => key + 1);
+      }
+    });
+  }, [clientFilter]);
 
   const toggleGmbDetails = (gmbId) => {
     setActiveGmbId(activeGmbId === gmbId ? null : gmbId);
@@ -88,7 +116,7 @@ const GMBList = () => {
         </div>
 
         <ul className="space-y-4">
-          {filteredData.map((gmb) => (
+          {gmbs.map((gmb) => (
             <li
               key={gmb.id}
               className="border rounded-lg shadow-sm p-4 bg-white"
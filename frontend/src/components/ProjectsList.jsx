@@ -1,54 +1,82 @@
-import { useState, useEffect, useMemo } from "react";
+import { useState, useEffect } from "react";
 import { getProjects, deleteProject } from "../api/project";
 import { getClients } from "../api/client";
 import { useNavigate, useSearchParams, Link } from "react-router-dom";
 import { toast, ToastContainer } from "react-toastify";
+import { subscribeEvents } from "../services/api";
 import {formatDate, cleanHtmlMarkers} from "../utils/index.js";
 
 const ProjectsList = () => {
   const [projects, setProjects] = useState([]);
   const [clients, setClients] = useState([]);
   const [clientFilter, setClientFilter] = useState("");
+  const [reloadKey, setReloadKey] = useState(0);
   const [activeProjectId, setActiveProjectId] = useState(null);
   const navigate = useNavigate();
   const [searchParams] = useSearchParams();
 
   useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const [projectRes, clientRes] = await Promise.all([
-          getProjects(),
-          getClients(),
-        ]);
-
-        const clientMap = new Map(
-          (clientRes.data || []).map((c) => [c.id, c.name])
-        );
-
-        const enriched = (projectRes.data || []).map((p) => ({
-          ...p,
-          client_name: clientMap.get(p.client_id) || "Unknown Client",
-        }));
+    const clientIdFromUrl = searchParams.get("clientId");
+    if (clientIdFromUrl) {
+      setClientFilter(clientIdFromUrl);
+    }
+  }, [searchParams]);
 
-        setProjects(enriched);
+  useEffect(() => {
+    const fetchClients = async () => {
+      try {
+        const clientRes = await getClients({ fields: "name" });
         setClients(clientRes.data || []);
+      } catch (err) {
+        toast.error("Failed to load data");
+        console.error(err);
+      }
+    };
+    fetchClients();
+  }, []);
 
-        const clientIdFromUrl = searchParams.get("clientId");
-        if (clientIdFromUrl) {
-          setClientFilter(clientIdFromUrl);
-        }
+  useEffect(() => {
+    const fetchData = async () => {
+      try {
+        const projectRes = await getProjects({
+          client_id: clientFilter || undefined,
+          expand: "client_name",
+        });
+
+        setProjects(
+          (projectRes.data || []).map((p) => ({
+            ...p,
+            client_name: p.client_name || "Unknown Client",
+          }))
+        );
       } catch (err) {
         toast.error("Failed to load data");
         console.error(err);
       }
     };
     fetchData();
-  }, [searchParams]);
+  }, [clientFilter, reloadKey]);
 
-  const filteredData = useMemo(() => {
-    if (!clientFilter) return projects;
-    return projects.filter((p) => p.client_id === clientFilter);
-  }, [projects, clientFilter]);
+  // Keep statuses current from the server's event stream instead of re-polling the list.
+  useEffect(() => {
+    return subscribeEvents("projects", { client_id: clientFilter || undefined }, (event) => {
+      if (event.op === "update") {
+        setProjects((prev) =>
+          prev.map((p) =>
+            p.id === event.id && event.status !== undefined ? { ...p, status: event.status } : p
+          )
+        );
+      } else if (event.op === "delete") {
+        if (event.id) {
+          setProjects((prev) => prev.filter((p) => p.id !== event.id));
+        } else {
+          setReloadKey((key) => key + 1);
+        }
+      } else {
+        setReloadKey((key) => key + 1);
+      }
+    });
+  }, [clientFilter]);
 
   const toggleProjectDetails = (projectId) => {
     setActiveProjectId(activeProjectId === projectId ? null : projectId);
@@ -88,7 +116,7 @@ const ProjectsList = () => {
         </div>
 
         <ul className="space-y-4">
-          {filteredData.map((project) => (
+          {projects.map((project) => (
             <li
               key={project.id}
               className="border rounded-lg shadow-sm p-4 bg-white"
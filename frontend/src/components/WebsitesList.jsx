@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { getWebsites, createWebsite, updateWebsite, getWebsiteById, deleteWebsite } from "../api/websites";
+import { getWebsites, createWebsite, updateWebsite, deleteWebsite } from "../api/websites";
 import { toast, ToastContainer } from "react-toastify";
 import "react-toastify/dist/ReactToastify.css";
 import DataTable from "react-data-table-component";
@@ -32,11 +32,8 @@ const WebsiteList = () => {
 
   const updateStatus = async (id, status) => {
     try {
-      const existing = await getWebsiteById(id);
       const updatePayload = {
-        domain: existing.data.domain,
         status: status,
-        date: existing.data.date || new Date().toISOString(),
         last_update_date: new Date().toISOString(),
       };
 
@@ -8,4 +8,47 @@ const api = axios.create({
   },
 });
 
+// List endpoints are cursor-paginated; walk every page for views that need the full list.
+export const fetchAllPages = async (url, params = {}) => {
+  const items = [];
+  let cursor;
+  do {
+    const res = await api.get(url, { params: { ...params, limit: 1000, cursor } });
+    items.push(...res.data.items);
+    cursor = res.data.next_cursor;
+  } while (cursor);
+  return { data: items };
+};
+
+// Upserts and deletes in `collection` after the `since` token (omit it for everything); keep the returned `since` for the next call.
+export const fetchChanges = async (collection, since) => {
+  const items = [];
+  let res;
+  do {
+    res = await api.get(`/${collection}/changes`, { params: { since, limit: 1000 } });
+    items.push(...res.data.items);
+    since = res.data.since;
+  } while (res.data.more);
+  return { data: items, since };
+};
+
+// Several GET requests in one round trip: `requests` is a list of paths (with query strings); resolves to their responses in order.
+export const batch = async (requests) => {
+  const res = await api.post("/batch/", { requests: requests.map((path) => ({ path })) });
+  return res.data.responses;
+};
+
+// Server-Sent Events for writes to `collection`; returns a function that closes the stream.
+export const subscribeEvents = (collection, params, onEvent) => {
+  const query = new URLSearchParams({ collections: collection });
+  Object.entries(params || {}).forEach(([key, value]) => {
+    if (value !== undefined) query.set(key, value);
+  });
+  const source = new EventSource(`${api.defaults.baseURL}/events/?${query}`);
+  const handler = (e) => onEvent(JSON.parse(e.data));
+  source.addEventListener(collection, handler);
+  source.addEventListener("reset", handler);
+  return () => source.close();
+};
+
 export default api;